@@ -0,0 +1,266 @@
+# backend/agent/brand_matcher.py
+"""
+Local brand resolution engine (replaces the per-miss LLM call in match_brand_name).
+
+Resolution order:
+1. exact match on a normalized key (case / accents / spaces / punctuation ignored)
+2. Korean/English alias table (e.g. "샤넬" -> "Chanel", "ysl" -> "Yves Saint Laurent")
+3. trigram candidate lookup + edit-distance / containment ranking with a confidence score
+
+Only when nothing clears the confidence threshold does the caller fall back to the LLM.
+"""
+
+import os
+import re
+import unicodedata
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set
+
+try:
+    from Levenshtein import distance as edit_distance
+except ImportError:
+
+    def edit_distance(s1: str, s2: str) -> int:
+        if len(s1) < len(s2):
+            s1, s2 = s2, s1
+        previous = list(range(len(s2) + 1))
+        for i, c1 in enumerate(s1, 1):
+            current = [i]
+            for j, c2 in enumerate(s2, 1):
+                current.append(
+                    min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (c1 != c2))
+                )
+            previous = current
+        return previous[-1]
+
+
+BRAND_MATCH_MIN_CONFIDENCE = float(os.getenv("BRAND_MATCH_MIN_CONFIDENCE", "0.75"))
+# 1, 2위 후보 점수 차이가 이보다 작으면 모호한 입력으로 보고 확정하지 않음
+BRAND_MATCH_MIN_MARGIN = 0.05
+# 트라이그램으로 추린 뒤 편집 거리를 계산할 최대 후보 수
+MAX_CANDIDATES = 50
+# 문장 속 브랜드 언급 탐지(mentions)에서 제외할 일반 단어와 같은 브랜드 키
+# (영문 키는 단어 단위로만 매칭하지만, "fresh한 향"처럼 형용사로 쓰이는 단어는 따로 제외)
+MENTION_STOPWORDS = {
+    "clean", "클린",
+    "fresh", "프레시", "프레쉬",
+    "nest", "pure", "lush", "coach", "guess", "boss", "police", "replay", "mango", "rituals",
+}
+# 여러 단어 브랜드("Jo Malone London", "Dolce & Gabbana")를 찾기 위해 이어 붙여 볼 최대 단어 수
+MAX_MENTION_WORDS = 5
+_ASCII_WORD = re.compile(r"[a-z0-9]+")
+
+# 자주 쓰이는 한글/약칭 표기 -> 카탈로그 영문 브랜드명 (카탈로그에 없는 브랜드는 무시됨)
+BRAND_ALIASES: Dict[str, str] = {
+    "샤넬": "Chanel",
+    "디올": "Dior",
+    "크리스찬디올": "Dior",
+    "조말론": "Jo Malone London",
+    "조말론런던": "Jo Malone London",
+    "딥티크": "Diptyque",
+    "르라보": "Le Labo",
+    "바이레도": "Byredo",
+    "톰포드": "Tom Ford",
+    "에르메스": "Hermès",
+    "구찌": "Gucci",
+    "입생로랑": "Yves Saint Laurent",
+    "생로랑": "Yves Saint Laurent",
+    "ysl": "Yves Saint Laurent",
+    "메종마르지엘라": "Maison Margiela",
+    "마르지엘라": "Maison Margiela",
+    "레플리카": "Maison Margiela",
+    "프라다": "Prada",
+    "버버리": "Burberry",
+    "겔랑": "Guerlain",
+    "랑콤": "Lancôme",
+    "아쿠아디파르마": "Acqua di Parma",
+    "크리드": "Creed",
+    "킬리안": "Kilian",
+    "바이킬리안": "By Kilian",
+    "펜할리곤스": "Penhaligon's",
+    "불가리": "Bvlgari",
+    "아르마니": "Giorgio Armani",
+    "조르지오아르마니": "Giorgio Armani",
+    "지방시": "Givenchy",
+    "돌체앤가바나": "Dolce&Gabbana",
+    "디앤지": "Dolce&Gabbana",
+    "캘빈클라인": "Calvin Klein",
+    "ck": "Calvin Klein",
+    "메종프란시스커정": "Maison Francis Kurkdjian",
+    "mfk": "Maison Francis Kurkdjian",
+    "프레데릭말": "Frederic Malle",
+    "세르주루텐": "Serge Lutens",
+    "아닉구딸": "Goutal",
+    "구딸": "Goutal",
+    "클린": "Clean",
+    "논픽션": "Nonfiction",
+    "탬버린즈": "Tamburins",
+    "이솝": "Aesop",
+    "산타마리아노벨라": "Santa Maria Novella",
+    "몽블랑": "Montblanc",
+    "존바바토스": "John Varvatos",
+    "랄프로렌": "Ralph Lauren",
+    "베르사체": "Versace",
+    "마크제이콥스": "Marc Jacobs",
+    "끌로에": "Chloé",
+    "나르시소로드리게즈": "Narciso Rodriguez",
+    "에스티로더": "Estée Lauder",
+    "로에베": "Loewe",
+    "발렌티노": "Valentino",
+    "엑스니힐로": "Ex Nihilo",
+    "니샤네": "Nishane",
+    "파코라반": "Paco Rabanne",
+    "장폴고티에": "Jean Paul Gaultier",
+    "몰튼브라운": "Molton Brown",
+    "롤리타렘피카": "Lolita Lempicka",
+    "안나수이": "Anna Sui",
+    "랑방": "Lanvin",
+    "페라가모": "Salvatore Ferragamo",
+    "살바토레페라가모": "Salvatore Ferragamo",
+    "아틀리에코롱": "Atelier Cologne",
+    "메모파리": "Memo Paris",
+    "줄리엣해즈어건": "Juliette Has A Gun",
+    "에따리브르도랑쥬": "Etat Libre d'Orange",
+}
+
+
+def normalize_brand(text: str) -> str:
+    """대소문자/악센트/공백/구두점을 제거한 비교용 키 ("Hermès" -> "hermes", "Dolce & Gabbana" -> "dolceandgabbana")."""
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFKD", text.strip().lower().replace("&", " and "))
+    return "".join(ch for ch in text if ch.isalnum() and not unicodedata.combining(ch))
+
+
+def _ascii_word_keys(text: str) -> Set[str]:
+    """
+    원문의 영문/숫자 단어와 연속된 단어를 이어 붙인 키 집합.
+    한글/공백/구두점은 단어 경계로 취급합니다. ("tom ford랑 비슷한" -> {"tom", "ford", "tomford"})
+    """
+    text = unicodedata.normalize("NFKD", text.lower().replace("&", " and "))
+    words = _ASCII_WORD.findall("".join(ch for ch in text if not unicodedata.combining(ch)))
+    keys: Set[str] = set()
+    for i in range(len(words)):
+        for j in range(i + 1, min(i + MAX_MENTION_WORDS, len(words)) + 1):
+            keys.add("".join(words[i:j]))
+    return keys
+
+
+def _trigrams(key: str) -> Set[str]:
+    padded = f"##{key}#"
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+@dataclass(frozen=True)
+class BrandMatch:
+    brand: str
+    confidence: float
+    method: str  # exact | alias | fuzzy
+
+
+class BrandMatcher:
+    """
+    In-memory brand index built once from the catalog brand list.
+
+    Args:
+        brands: Catalog brand names (TB_PERFUME_BASIC_M.perfume_brand)
+        aliases: Alias -> catalog brand name
+    """
+
+    def __init__(self, brands: Iterable[str], aliases: Optional[Dict[str, str]] = None):
+        self.brands: List[str] = []
+        self._by_key: Dict[str, str] = {}
+        for brand in brands:
+            key = normalize_brand(brand)
+            if brand and key and key not in self._by_key:
+                self._by_key[key] = brand
+                self.brands.append(brand)
+
+        self._aliases: Dict[str, str] = {}
+        for alias, target in (BRAND_ALIASES if aliases is None else aliases).items():
+            brand = self._by_key.get(normalize_brand(target))
+            if brand:
+                self._aliases[normalize_brand(alias)] = brand
+
+        self._trigram_index: Dict[str, Set[str]] = defaultdict(set)
+        for key in self._by_key:
+            for gram in _trigrams(key):
+                self._trigram_index[gram].add(key)
+
+    def __len__(self) -> int:
+        return len(self.brands)
+
+    def _candidates(self, key: str) -> List[str]:
+        counts: Dict[str, int] = defaultdict(int)
+        for gram in _trigrams(key):
+            for candidate in self._trigram_index.get(gram, ()):
+                counts[candidate] += 1
+        return sorted(counts, key=counts.get, reverse=True)[:MAX_CANDIDATES]
+
+    @staticmethod
+    def _similarity(query: str, key: str) -> float:
+        edit = 1 - edit_distance(query, key) / max(len(query), len(key))
+        # "kurkdjian" -> "maisonfranciskurkdjian"처럼 브랜드명 일부만 입력한 경우
+        contain = 0.0
+        if len(query) >= 4 and query in key:
+            contain = 0.8 + 0.2 * len(query) / len(key)
+        return max(edit, contain)
+
+    def match(self, user_input: str, limit: int = 5) -> List[BrandMatch]:
+        """후보 브랜드를 confidence 내림차순으로 반환합니다."""
+        key = normalize_brand(user_input)
+        if not key:
+            return []
+        if key in self._by_key:
+            return [BrandMatch(self._by_key[key], 1.0, "exact")]
+        if key in self._aliases:
+            return [BrandMatch(self._aliases[key], 0.99, "alias")]
+
+        scored = [
+            BrandMatch(self._by_key[candidate], round(self._similarity(key, candidate), 4), "fuzzy")
+            for candidate in self._candidates(key)
+        ]
+        scored.sort(key=lambda m: m.confidence, reverse=True)
+        return scored[:limit]
+
+    def mentions(self, text: str) -> List[str]:
+        """
+        문장 안에 포함된 브랜드(정식 명칭/별칭)를 찾습니다. 예: "디올 쁘아종이랑 비슷한 거" -> ["Dior"]
+        - 영문 키: 단어 경계 기준 ("honestly" 안의 "nest"는 제외)
+        - 한글 키: 조사가 붙으므로 공백을 제거한 문장의 부분 문자열 기준
+        """
+        key = normalize_brand(text)
+        if not key:
+            return []
+        word_keys = _ascii_word_keys(text)
+        stop_keys = {normalize_brand(word) for word in MENTION_STOPWORDS}
+        found: List[str] = []
+        for table in (self._by_key, self._aliases):
+            for brand_key, brand in table.items():
+                if brand_key in stop_keys or brand in found:
+                    continue
+                if brand_key.isascii():
+                    # 영문 2글자 이하 키는 일반 단어와 겹치기 쉬워 제외 (한글은 2글자부터 허용)
+                    hit = len(brand_key) >= 3 and brand_key in word_keys
+                else:
+                    hit = len(brand_key) >= 2 and brand_key in key
+                if hit:
+                    found.append(brand)
+        return found
+
+    def resolve(
+        self, user_input: str, min_confidence: float = BRAND_MATCH_MIN_CONFIDENCE
+    ) -> Optional[BrandMatch]:
+        """확신할 수 있는 브랜드 1개를 반환합니다. 임계값 미달이거나 모호하면 None."""
+        matches = self.match(user_input, limit=2)
+        if not matches or matches[0].confidence < min_confidence:
+            return None
+        best = matches[0]
+        if (
+            best.method == "fuzzy"
+            and len(matches) > 1
+            and best.confidence - matches[1].confidence < BRAND_MATCH_MIN_MARGIN
+        ):
+            return None
+        return best
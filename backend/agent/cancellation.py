@@ -0,0 +1,77 @@
+# backend/agent/cancellation.py
+"""
+Bookkeeping for work cancelled because the /chat client went away.
+
+Cancellation itself is plain asyncio: agent.sse cancels the graph run, LangGraph
+cancels the running node, and parallel_reco_node cancels its prep/section tasks
+(psycopg3 cancels in-flight queries server-side). This module only estimates
+what that saved: completed LLM calls feed a running average of input/output
+tokens per call site, and a cancelled call is credited with
+
+- not started: average input + output tokens
+- mid-stream:  average output tokens - tokens already generated
+"""
+
+import threading
+from collections import defaultdict
+from typing import Any, Dict, Optional
+
+
+class CancellationStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._completed: Dict[str, Dict[str, int]] = defaultdict(
+            lambda: {"calls": 0, "input_tokens": 0, "output_tokens": 0}
+        )
+        self._cancelled: Dict[str, Dict[str, int]] = defaultdict(
+            lambda: {"calls": 0, "not_started": 0, "est_tokens_saved": 0}
+        )
+        self.disconnects = 0
+
+    def observe_completed(self, label: str, usage: Optional[Dict[str, Any]]) -> None:
+        """정상 완료된 호출의 usage_metadata로 호출 지점별 평균 토큰 수를 갱신합니다."""
+        if not usage:
+            return
+        with self._lock:
+            entry = self._completed[label]
+            entry["calls"] += 1
+            entry["input_tokens"] += int(usage.get("input_tokens") or 0)
+            entry["output_tokens"] += int(usage.get("output_tokens") or 0)
+
+    def record_cancelled(self, label: str, generated_tokens: int = 0, started: bool = True) -> int:
+        """취소된 호출을 기록하고 절약된 토큰 추정치를 반환합니다 (완료 이력이 없으면 0)."""
+        with self._lock:
+            completed = self._completed.get(label)
+            saved = 0
+            if completed and completed["calls"]:
+                avg_in = completed["input_tokens"] / completed["calls"]
+                avg_out = completed["output_tokens"] / completed["calls"]
+                saved = avg_out - generated_tokens if started else avg_in + avg_out
+                saved = max(0, int(saved))
+            entry = self._cancelled[label]
+            entry["calls"] += 1
+            entry["not_started"] += 0 if started else 1
+            entry["est_tokens_saved"] += saved
+        return saved
+
+    def record_disconnect(self) -> None:
+        with self._lock:
+            self.disconnects += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "disconnects": self.disconnects,
+                "cancelled": {label: dict(entry) for label, entry in self._cancelled.items()},
+                "est_tokens_saved": sum(e["est_tokens_saved"] for e in self._cancelled.values()),
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._completed.clear()
+            self._cancelled.clear()
+            self.disconnects = 0
+
+
+# 프로세스 전역 통계 (graph.py / main.py에서 기록)
+cancellation_stats = CancellationStats()
@@ -0,0 +1,190 @@
+# backend/agent/catalog_vocab.py
+"""
+Catalog vocabulary service (brands, seasons, occasions, accords, genders, notes).
+
+One in-memory snapshot serves prompts, search and the brand/note matchers:
+- loaded once (single-flight for both threads and coroutines)
+- refreshed in the background once CATALOG_VOCAB_TTL has passed (stale-while-revalidate)
+- every snapshot carries a version and a content digest; subscribers are
+  notified only when the content actually changed
+- if a subscriber fails, the new version is not published and every subscriber
+  keeps (or is rolled back to) the previous snapshot
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+import traceback
+from dataclasses import dataclass, field, replace
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .cache_utils import AsyncSingleFlight
+
+CATALOG_VOCAB_TTL = float(os.getenv("CATALOG_VOCAB_TTL", "3600"))
+# 프롬프트에 넣는 어코드 개수 (기존 fetch_meta_data의 LIMIT 100 유지)
+PROMPT_ACCORD_LIMIT = 100
+# 성별은 DB 값(TB_PERFUME_GENDER_R: Feminine/Masculine/Unisex)이 아니라 hard_filters["gender"] 입력 어휘라
+# 고정값 유지 (DB 값을 프롬프트에 넣으면 "Feminine"이 유니섹스 필터로 떨어짐)
+DEFAULT_GENDERS = ("Women", "Men", "Unisex")
+
+VOCAB_FIELDS = ("brands", "seasons", "occasions", "accords", "notes")
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    version: int
+    digest: str
+    loaded_at: float
+    brands: Tuple[str, ...] = ()
+    seasons: Tuple[str, ...] = ()
+    occasions: Tuple[str, ...] = ()
+    accords: Tuple[str, ...] = ()
+    notes: Tuple[str, ...] = ()
+    genders: Tuple[str, ...] = field(default=DEFAULT_GENDERS)
+
+    def as_meta(self) -> Dict[str, str]:
+        """기존 fetch_meta_data() 형식 (프롬프트용 콤마 구분 문자열)."""
+        return {
+            "seasons": ", ".join(self.seasons),
+            "occasions": ", ".join(self.occasions),
+            "accords": ", ".join(self.accords[:PROMPT_ACCORD_LIMIT]),
+            "genders": ", ".join(self.genders),
+        }
+
+
+def _digest(values: Dict[str, Tuple[str, ...]]) -> str:
+    raw = json.dumps(values, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+
+class CatalogVocabulary:
+    """
+    Args:
+        loader: Blocking function returning {"brands": [...], "seasons": [...], ...}
+        ttl: Seconds before a background refresh is triggered (0 = never)
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[], Dict[str, List[str]]],
+        ttl: float = CATALOG_VOCAB_TTL,
+    ):
+        self._loader = loader
+        self.ttl = ttl
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._lock = threading.Lock()
+        self._singleflight = AsyncSingleFlight()
+        self._refresh_flag_lock = threading.Lock()
+        self._refreshing = False
+        self._subscribers: List[Callable[[CatalogSnapshot], None]] = []
+
+    # ---------- 구독 ----------
+    def subscribe(self, callback: Callable[[CatalogSnapshot], None]) -> None:
+        """새 버전이 적재될 때마다 callback(snapshot)을 호출합니다 (이미 적재돼 있으면 즉시 1회 호출)."""
+        self._subscribers.append(callback)
+        if self._snapshot is not None:
+            callback(self._snapshot)
+
+    # ---------- 적재 ----------
+    def refresh(self) -> CatalogSnapshot:
+        """loader를 실행해 스냅샷을 교체합니다. 내용이 같으면 버전을 올리지 않습니다."""
+        raw = self._loader()
+        values = {
+            name: tuple(sorted({str(v) for v in raw.get(name, []) if v}))
+            for name in VOCAB_FIELDS
+        }
+        digest = _digest(values)
+        previous = self._snapshot
+        if previous is not None and previous.digest == digest:
+            self._snapshot = CatalogSnapshot(
+                version=previous.version, digest=digest, loaded_at=time.monotonic(), **values
+            )
+            return self._snapshot
+
+        snapshot = CatalogSnapshot(
+            version=(previous.version + 1) if previous else 1,
+            digest=digest,
+            loaded_at=time.monotonic(),
+            **values,
+        )
+        # 구독자(매처/사전)를 먼저 갱신한 뒤 스냅샷을 공개해 조회 측이 항상 준비된 인덱스를 보도록 함
+        updated = []
+        for callback in self._subscribers:
+            try:
+                callback(snapshot)
+            except Exception as e:
+                print(f"⚠️ [CatalogVocab] 구독자 갱신 실패 (v{snapshot.version}): {e}")
+                traceback.print_exc()
+                if previous is not None:
+                    # 새 버전을 공개하지 않고, 이미 갱신된 구독자도 이전 스냅샷으로 되돌림 (다음 TTL에 재시도)
+                    self._notify(updated, previous)
+                    self._snapshot = replace(previous, loaded_at=time.monotonic())
+                    return self._snapshot
+            else:
+                updated.append(callback)
+        self._snapshot = snapshot
+        print(
+            f"✅ [CatalogVocab] v{snapshot.version} 적재 "
+            f"(브랜드 {len(snapshot.brands)}, 노트 {len(snapshot.notes)}, 어코드 {len(snapshot.accords)})"
+        )
+        return snapshot
+
+    @staticmethod
+    def _notify(callbacks: List[Callable[[CatalogSnapshot], None]], snapshot: CatalogSnapshot) -> None:
+        for callback in callbacks:
+            try:
+                callback(snapshot)
+            except Exception as e:
+                print(f"⚠️ [CatalogVocab] 구독자 복원 실패 (v{snapshot.version}): {e}")
+
+    def _load_once(self) -> CatalogSnapshot:
+        with self._lock:
+            if self._snapshot is None:
+                self.refresh()
+            return self._snapshot
+
+    def _maybe_refresh_in_background(self) -> None:
+        snapshot = self._snapshot
+        if not self.ttl or time.monotonic() - snapshot.loaded_at < self.ttl:
+            return
+        with self._refresh_flag_lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def _run():
+            try:
+                with self._lock:
+                    self.refresh()
+            except Exception as e:
+                # 실패해도 기존 스냅샷을 유지하고 다음 TTL에 재시도
+                self._snapshot = replace(self._snapshot, loaded_at=time.monotonic())
+                print(f"⚠️ [CatalogVocab] 갱신 실패 (기존 스냅샷 유지): {e}")
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=_run, name="catalog-vocab-refresh", daemon=True).start()
+
+    # ---------- 조회 ----------
+    def get(self) -> CatalogSnapshot:
+        """현재 스냅샷. 최초 호출만 블로킹 적재하고, 이후에는 메모리에서 반환합니다."""
+        if self._snapshot is None:
+            return self._load_once()
+        self._maybe_refresh_in_background()
+        return self._snapshot
+
+    async def get_async(self) -> CatalogSnapshot:
+        """get()의 비동기 버전. 최초 적재는 스레드에서 실행하고 동시 요청은 한 번만 적재합니다."""
+        if self._snapshot is None:
+            return await self._singleflight.do(
+                "catalog", lambda: asyncio.to_thread(self._load_once)
+            )
+        self._maybe_refresh_in_background()
+        return self._snapshot
+
+    @property
+    def version(self) -> int:
+        return self._snapshot.version if self._snapshot else 0
@@ -0,0 +1,127 @@
+# backend/agent/chat_history.py
+"""
+Bounded per-thread chat history cache.
+
+Only used to rebuild the conversation when the LangGraph checkpointer has no state
+for a thread (new process, evicted thread). Each thread keeps the last
+CHAT_HISTORY_WINDOW messages; the DB is read (with a LIMIT query) only on a cache
+miss, and new messages are appended in memory as they are logged.
+
+window_messages() bounds what goes into LLM prompts the same way for threads the
+checkpointer does hold: the last CHAT_CONTEXT_WINDOW messages plus a short,
+LLM-free summary of the earlier turns.
+"""
+
+import os
+import re
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, List
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+
+from .cache_utils import AsyncSingleFlight, LRUCache
+
+CHAT_HISTORY_WINDOW = int(os.getenv("CHAT_HISTORY_WINDOW", "20"))
+CHAT_HISTORY_CACHE_THREADS = int(os.getenv("CHAT_HISTORY_CACHE_THREADS", "2048"))
+CHAT_HISTORY_CACHE_TTL = float(os.getenv("CHAT_HISTORY_CACHE_TTL", "1800"))
+# LLM 프롬프트에 넣는 대화 이력 길이 (체크포인터에 스레드 전체가 있어도 최근 N개 + 요약만 전달, 0 = 전체)
+CHAT_CONTEXT_WINDOW = int(os.getenv("CHAT_CONTEXT_WINDOW", str(CHAT_HISTORY_WINDOW)))
+# 요약에 남기는 이전 사용자 요청 수 / 요청당 글자 수
+CONTEXT_SUMMARY_MAX_REQUESTS = 5
+CONTEXT_SUMMARY_REQUEST_CHARS = 80
+SAVE_TAG_PATTERN = re.compile(r"\[\[SAVE:\d+:([^\]]+)\]\]")
+
+
+class ChatHistoryCache:
+    """
+    Args:
+        loader: async (thread_id, limit) -> last `limit` messages, oldest first
+        window: Messages kept per thread
+        max_threads: Threads kept in the LRU
+        ttl: Seconds a cached thread stays valid
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[str, int], Awaitable[List[Dict[str, Any]]]],
+        window: int = CHAT_HISTORY_WINDOW,
+        max_threads: int = CHAT_HISTORY_CACHE_THREADS,
+        ttl: float = CHAT_HISTORY_CACHE_TTL,
+    ):
+        self._loader = loader
+        self.window = max(1, window)
+        self._threads = LRUCache(maxsize=max_threads, ttl=ttl)
+        self._singleflight = AsyncSingleFlight()
+
+    async def get(self, thread_id: str) -> List[Dict[str, Any]]:
+        """최근 window개 메시지 (오래된 순). 캐시 미스일 때만 DB를 조회합니다."""
+        history = self._threads.get(thread_id)
+        if history is None:
+
+            async def _load():
+                rows = await self._loader(thread_id, self.window)
+                loaded = deque(
+                    ({"role": r["role"], "text": r["text"]} for r in rows),
+                    maxlen=self.window,
+                )
+                self._threads.set(thread_id, loaded)
+                return loaded
+
+            history = await self._singleflight.do(thread_id, _load)
+        return list(history)
+
+    def append(self, thread_id: str, role: str, text: str) -> None:
+        """캐시된 스레드에만 추가합니다 (미캐시 스레드는 다음 조회 때 DB에서 적재)."""
+        history = self._threads.get(thread_id)
+        if history is not None:
+            history.append({"role": role, "text": text})
+
+    def invalidate(self, thread_id: str) -> None:
+        self._threads.pop(thread_id)
+
+
+def to_langchain_messages(history: List[Dict[str, Any]]) -> List[BaseMessage]:
+    return [
+        HumanMessage(content=m["text"]) if m["role"] == "user" else AIMessage(content=m["text"])
+        for m in history
+    ]
+
+
+def _text(message: BaseMessage) -> str:
+    return message.content if isinstance(message.content, str) else ""
+
+
+def _summarize(earlier: List[BaseMessage]) -> SystemMessage:
+    requests = [
+        _text(m).strip().replace("\n", " ")[:CONTEXT_SUMMARY_REQUEST_CHARS]
+        for m in earlier
+        if isinstance(m, HumanMessage) and _text(m).strip()
+    ][-CONTEXT_SUMMARY_MAX_REQUESTS:]
+    perfumes: List[str] = []
+    for m in earlier:
+        if isinstance(m, AIMessage):
+            perfumes.extend(p for p in SAVE_TAG_PATTERN.findall(_text(m)) if p not in perfumes)
+
+    lines = [f"[이전 대화 요약] 앞선 메시지 {len(earlier)}개는 생략되었습니다."]
+    if requests:
+        lines.append("- 이전 사용자 요청: " + " / ".join(requests))
+    if perfumes:
+        lines.append("- 이미 추천한 향수: " + ", ".join(perfumes))
+    return SystemMessage(content="\n".join(lines))
+
+
+def window_messages(
+    messages: List[BaseMessage], window: int = CHAT_CONTEXT_WINDOW
+) -> List[BaseMessage]:
+    """
+    LLM 프롬프트용 대화 이력: 최근 window개 메시지 + 잘린 앞부분 요약(SystemMessage 1개).
+    요약은 LLM 호출 없이 이전 사용자 요청과 추천된 향수(SAVE 태그)만 추리며,
+    남기는 구간은 답변이 아니라 사용자 메시지부터 시작하도록 맞춥니다.
+    """
+    messages = list(messages)
+    if window <= 0 or len(messages) <= window:
+        return messages
+    start = len(messages) - window
+    while start < len(messages) - 1 and not isinstance(messages[start], HumanMessage):
+        start += 1
+    return [_summarize(messages[:start])] + messages[start:]
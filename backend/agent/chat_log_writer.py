@@ -0,0 +1,206 @@
+# backend/agent/chat_log_writer.py
+"""
+Write-behind persistence for chat messages.
+
+stream_generator enqueues messages and returns immediately; a single background
+worker drains the queue in FIFO order (so a thread's user/assistant messages keep
+their order), writes them in batches, retries failed batches with backoff and is
+flushed on application shutdown. Readers can wait for one thread's pending writes
+(flush(thread_id)) without waiting for the rest of the queue.
+
+Each entry is stamped with its own (strictly increasing) time at enqueue, so
+messages written in one batch transaction do not share a single CREATED_DT.
+"""
+
+import asyncio
+import os
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, List, Optional
+
+CHAT_LOG_BATCH_SIZE = int(os.getenv("CHAT_LOG_BATCH_SIZE", "50"))
+CHAT_LOG_FLUSH_INTERVAL = float(os.getenv("CHAT_LOG_FLUSH_INTERVAL", "0.2"))
+CHAT_LOG_MAX_RETRIES = int(os.getenv("CHAT_LOG_MAX_RETRIES", "3"))
+CHAT_LOG_MAX_QUEUE = int(os.getenv("CHAT_LOG_MAX_QUEUE", "10000"))
+# 조회 API가 해당 스레드의 미기록 메시지를 기다리는 최대 시간 (초과 시 DB 기록만으로 응답)
+CHAT_LOG_READ_FLUSH_TIMEOUT = float(os.getenv("CHAT_LOG_READ_FLUSH_TIMEOUT", "1.0"))
+
+
+@dataclass
+class ChatLogEntry:
+    thread_id: str
+    member_id: int
+    role: str
+    message: str
+    meta: Optional[dict] = None
+    seq: int = 0  # 큐에 들어간 순서 (flush 대기 기준)
+    created_at: Optional[datetime] = None  # enqueue 시각 (DB CREATED_DT로 그대로 기록)
+
+
+class ChatLogWriter:
+    """
+    Args:
+        write_batch: Async function persisting a list of entries in one transaction
+        batch_size: Max entries per write
+        flush_interval: Seconds to wait for more entries before writing a partial batch
+        max_retries: Retries per batch before falling back to per-entry writes
+        retry_backoff: Base backoff in seconds (doubled on each retry)
+        max_queue: Queue bound; when full, enqueue() waits for space (backpressure)
+    """
+
+    def __init__(
+        self,
+        write_batch: Callable[[List[ChatLogEntry]], Awaitable[None]],
+        batch_size: int = CHAT_LOG_BATCH_SIZE,
+        flush_interval: float = CHAT_LOG_FLUSH_INTERVAL,
+        max_retries: int = CHAT_LOG_MAX_RETRIES,
+        retry_backoff: float = 0.5,
+        max_queue: int = CHAT_LOG_MAX_QUEUE,
+    ):
+        self._write_batch = write_batch
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.max_queue = max_queue
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._progress: Optional[asyncio.Condition] = None
+        # 큐에 넣은 마지막 순번 / 처리(기록 또는 유실)가 끝난 마지막 순번 / 스레드별 마지막 순번
+        self._enqueued_seq = 0
+        self._done_seq = 0
+        self._last_seq_by_thread: Dict[str, int] = {}
+        self._last_created_at: Optional[datetime] = None
+        self.written = 0
+        self.dropped = 0
+
+    def _ensure_worker(self) -> asyncio.Queue:
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done() or self._worker.get_loop() is not loop:
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+            self._progress = asyncio.Condition()
+            # 이전 루프의 미처리 항목은 더 이상 기록되지 않으므로 대기 기준에서 제외
+            self._done_seq = self._enqueued_seq
+            self._last_seq_by_thread.clear()
+            self._worker = loop.create_task(self._run(self._queue), name="chat-log-writer")
+        return self._queue
+
+    async def enqueue(
+        self, thread_id: str, member_id: int, role: str, message: str, meta: dict = None
+    ) -> None:
+        """
+        메시지를 큐에 넣고 바로 반환합니다. 큐가 가득 차면 자리가 날 때까지 기다립니다(backpressure).
+        (직접 기록하면 앞서 대기 중인 메시지를 앞질러 스레드 내 순서가 깨지므로 항상 큐를 거칩니다)
+        """
+        entry = ChatLogEntry(thread_id, member_id, role, message, meta)
+        queue = self._ensure_worker()
+        await queue.put(entry)
+        # put 완료 직후(다른 작업으로 전환되기 전)에 순번/시각을 매겨 큐 순서와 일치시킴
+        self._enqueued_seq += 1
+        entry.seq = self._enqueued_seq
+        entry.created_at = self._next_timestamp()
+        self._last_seq_by_thread[thread_id] = entry.seq
+
+    def _next_timestamp(self) -> datetime:
+        # 같은 마이크로초에 들어오거나 시계가 뒤로 가도 enqueue 순서대로 증가하도록 보정
+        now = datetime.now(timezone.utc)
+        if self._last_created_at is not None and now <= self._last_created_at:
+            now = self._last_created_at + timedelta(microseconds=1)
+        self._last_created_at = now
+        return now
+
+    async def _run(self, queue: asyncio.Queue) -> None:
+        while True:
+            batch = [await queue.get()]
+            try:
+                deadline = asyncio.get_running_loop().time() + self.flush_interval
+                while len(batch) < self.batch_size:
+                    timeout = deadline - asyncio.get_running_loop().time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+                await self._write_with_retry(batch)
+            finally:
+                for _ in batch:
+                    queue.task_done()
+                await self._mark_done(batch)
+
+    async def _mark_done(self, batch: List[ChatLogEntry]) -> None:
+        # FIFO 처리이므로 배치의 마지막 순번까지는 모두 처리 완료
+        self._done_seq = max(self._done_seq, batch[-1].seq)
+        for entry in batch:
+            if self._last_seq_by_thread.get(entry.thread_id) == entry.seq:
+                del self._last_seq_by_thread[entry.thread_id]
+        async with self._progress:
+            self._progress.notify_all()
+
+    async def _write_with_retry(self, batch: List[ChatLogEntry]) -> None:
+        for attempt in range(self.max_retries + 1):
+            try:
+                await self._write_batch(batch)
+                self.written += len(batch)
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if attempt < self.max_retries:
+                    print(f"⚠️ [ChatLogWriter] 배치 저장 실패 ({attempt + 1}회), 재시도: {e}")
+                    await asyncio.sleep(self.retry_backoff * (2**attempt))
+                    continue
+                print(f"❌ [ChatLogWriter] 배치 저장 최종 실패: {e}")
+
+        if len(batch) == 1:
+            self.dropped += 1
+            return
+        # 문제 있는 메시지 하나 때문에 배치 전체가 유실되지 않도록 건별로 저장
+        for entry in batch:
+            try:
+                await self._write_batch([entry])
+                self.written += 1
+            except Exception as e:
+                self.dropped += 1
+                print(f"❌ [ChatLogWriter] 메시지 유실 (thread={entry.thread_id}): {e}")
+
+    async def flush(self, thread_id: Optional[str] = None, timeout: Optional[float] = None) -> bool:
+        """
+        호출 시점까지 큐에 들어간 메시지가 기록될 때까지 기다립니다.
+        thread_id를 주면 해당 스레드의 메시지만 기다리며, 이후에 들어온 메시지는 기다리지 않습니다.
+        Returns: 제시간에 완료되면 True, timeout 초과 시 False
+        """
+        if self._worker is None or self._worker.done():
+            return True
+        if thread_id is None:
+            target = self._enqueued_seq
+        else:
+            target = self._last_seq_by_thread.get(thread_id, 0)
+        if self._done_seq >= target:
+            return True
+
+        progress = self._progress
+
+        async def _wait():
+            async with progress:
+                await progress.wait_for(lambda: self._done_seq >= target)
+
+        try:
+            await asyncio.wait_for(_wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def close(self, timeout: float = 10.0) -> None:
+        """종료 시 호출: 남은 메시지를 flush하고 워커를 정리합니다."""
+        if self._worker is None:
+            return
+        if not await self.flush(timeout=timeout):
+            print(f"⚠️ [ChatLogWriter] 종료 flush 시간 초과: {self._queue.qsize()}건 미기록")
+        self._worker.cancel()
+        try:
+            await self._worker
+        except (asyncio.CancelledError, Exception):
+            pass
+        self._worker = None
+        self._queue = None
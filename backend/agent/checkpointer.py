@@ -0,0 +1,390 @@
+# backend/agent/checkpointer.py
+"""
+Bounded LangGraph checkpointer with an optional durable store.
+
+BoundedMemorySaver extends InMemorySaver with:
+- per-thread history pruning (only the last CHECKPOINT_HISTORY_PER_THREAD checkpoints are kept)
+- LRU eviction of whole threads once CHECKPOINT_MAX_THREADS / CHECKPOINT_MAX_BYTES is exceeded
+- an optional durable store (local SQLite file or recom_db Postgres) that receives the latest
+  checkpoint of every thread (write-through). Evicted or unknown threads are restored from it,
+  and a newer checkpoint written by another worker is picked up on the next read.
+
+CHECKPOINT_BACKEND: memory (default) | sqlite | postgres
+"""
+
+import asyncio
+import os
+import sqlite3
+import threading
+from collections import OrderedDict, defaultdict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+
+from langgraph.checkpoint.memory import InMemorySaver
+
+CHECKPOINT_BACKEND = os.getenv("CHECKPOINT_BACKEND", "memory").strip().lower()
+CHECKPOINT_MAX_THREADS = int(os.getenv("CHECKPOINT_MAX_THREADS", "1000"))
+CHECKPOINT_MAX_BYTES = int(os.getenv("CHECKPOINT_MAX_BYTES", str(256 * 1024 * 1024)))
+CHECKPOINT_HISTORY_PER_THREAD = int(os.getenv("CHECKPOINT_HISTORY_PER_THREAD", "10"))
+CHECKPOINT_SQLITE_PATH = os.getenv(
+    "CHECKPOINT_SQLITE_PATH", os.path.join(os.getcwd(), ".cache", "checkpoints.sqlite3")
+)
+CHECKPOINT_TABLE = "TB_CHAT_CHECKPOINT_T"
+
+# (checkpoint_id, checkpoint_type, checkpoint_bytes, metadata_type, metadata_bytes, parent_id)
+StoredCheckpoint = Tuple[str, str, bytes, str, bytes, Optional[str]]
+
+
+# ==========================================
+# 1. 영구 저장소 (스레드별 최신 체크포인트 1건)
+# ==========================================
+class SqliteCheckpointStore:
+    """로컬 SQLite 파일 (같은 호스트의 여러 워커가 공유)."""
+
+    def __init__(self, path: str = CHECKPOINT_SQLITE_PATH):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS {CHECKPOINT_TABLE} (
+                thread_id TEXT NOT NULL,
+                checkpoint_ns TEXT NOT NULL,
+                checkpoint_id TEXT NOT NULL,
+                checkpoint_type TEXT NOT NULL,
+                checkpoint BLOB NOT NULL,
+                metadata_type TEXT NOT NULL,
+                metadata BLOB NOT NULL,
+                parent_id TEXT,
+                PRIMARY KEY (thread_id, checkpoint_ns)
+            )
+            """
+        )
+        self._conn.commit()
+
+    def save(self, thread_id: str, checkpoint_ns: str, row: StoredCheckpoint) -> None:
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {CHECKPOINT_TABLE} VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (thread_id, checkpoint_ns, *row),
+            )
+            self._conn.commit()
+
+    def load(self, thread_id: str, checkpoint_ns: str) -> Optional[StoredCheckpoint]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT checkpoint_id, checkpoint_type, checkpoint, metadata_type, metadata, parent_id "
+                f"FROM {CHECKPOINT_TABLE} WHERE thread_id = ? AND checkpoint_ns = ?",
+                (thread_id, checkpoint_ns),
+            ).fetchone()
+        return tuple(row) if row else None
+
+    def latest_id(self, thread_id: str, checkpoint_ns: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT checkpoint_id FROM {CHECKPOINT_TABLE} WHERE thread_id = ? AND checkpoint_ns = ?",
+                (thread_id, checkpoint_ns),
+            ).fetchone()
+        return row[0] if row else None
+
+    def delete(self, thread_id: str) -> None:
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {CHECKPOINT_TABLE} WHERE thread_id = ?", (thread_id,))
+            self._conn.commit()
+
+
+class PostgresCheckpointStore:
+    """recom_db 테이블 (여러 호스트의 워커가 스레드를 공유)."""
+
+    def __init__(self, get_conn: Callable[[], Any], release_conn: Callable[[Any], None]):
+        self._get_conn = get_conn
+        self._release_conn = release_conn
+        self._execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS {CHECKPOINT_TABLE} (
+                THREAD_ID VARCHAR(255) NOT NULL,
+                CHECKPOINT_NS VARCHAR(255) NOT NULL,
+                CHECKPOINT_ID VARCHAR(64) NOT NULL,
+                CHECKPOINT_TYPE VARCHAR(32) NOT NULL,
+                CHECKPOINT BYTEA NOT NULL,
+                METADATA_TYPE VARCHAR(32) NOT NULL,
+                METADATA BYTEA NOT NULL,
+                PARENT_ID VARCHAR(64),
+                UPDATED_DT TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (THREAD_ID, CHECKPOINT_NS)
+            )
+            """,
+            None,
+        )
+
+    def _execute(self, sql: str, params, fetch: bool = False):
+        conn = self._get_conn()
+        cur = conn.cursor()
+        try:
+            cur.execute(sql, params)
+            row = cur.fetchone() if fetch else None
+            conn.commit()
+            return row
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cur.close()
+            self._release_conn(conn)
+
+    def save(self, thread_id: str, checkpoint_ns: str, row: StoredCheckpoint) -> None:
+        checkpoint_id, ctype, cbytes, mtype, mbytes, parent_id = row
+        self._execute(
+            f"""
+            INSERT INTO {CHECKPOINT_TABLE}
+                (THREAD_ID, CHECKPOINT_NS, CHECKPOINT_ID, CHECKPOINT_TYPE, CHECKPOINT, METADATA_TYPE, METADATA, PARENT_ID, UPDATED_DT)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, CURRENT_TIMESTAMP)
+            ON CONFLICT (THREAD_ID, CHECKPOINT_NS) DO UPDATE SET
+                CHECKPOINT_ID = EXCLUDED.CHECKPOINT_ID,
+                CHECKPOINT_TYPE = EXCLUDED.CHECKPOINT_TYPE,
+                CHECKPOINT = EXCLUDED.CHECKPOINT,
+                METADATA_TYPE = EXCLUDED.METADATA_TYPE,
+                METADATA = EXCLUDED.METADATA,
+                PARENT_ID = EXCLUDED.PARENT_ID,
+                UPDATED_DT = CURRENT_TIMESTAMP
+            """,
+            (thread_id, checkpoint_ns, checkpoint_id, ctype, cbytes, mtype, mbytes, parent_id),
+        )
+
+    def load(self, thread_id: str, checkpoint_ns: str) -> Optional[StoredCheckpoint]:
+        row = self._execute(
+            f"SELECT CHECKPOINT_ID, CHECKPOINT_TYPE, CHECKPOINT, METADATA_TYPE, METADATA, PARENT_ID "
+            f"FROM {CHECKPOINT_TABLE} WHERE THREAD_ID = %s AND CHECKPOINT_NS = %s",
+            (thread_id, checkpoint_ns),
+            fetch=True,
+        )
+        if not row:
+            return None
+        checkpoint_id, ctype, cbytes, mtype, mbytes, parent_id = row
+        return checkpoint_id, ctype, bytes(cbytes), mtype, bytes(mbytes), parent_id
+
+    def latest_id(self, thread_id: str, checkpoint_ns: str) -> Optional[str]:
+        row = self._execute(
+            f"SELECT CHECKPOINT_ID FROM {CHECKPOINT_TABLE} WHERE THREAD_ID = %s AND CHECKPOINT_NS = %s",
+            (thread_id, checkpoint_ns),
+            fetch=True,
+        )
+        return row[0] if row else None
+
+    def delete(self, thread_id: str) -> None:
+        self._execute(f"DELETE FROM {CHECKPOINT_TABLE} WHERE THREAD_ID = %s", (thread_id,))
+
+
+# ==========================================
+# 2. 메모리 상한이 있는 체크포인터
+# ==========================================
+class BoundedMemorySaver(InMemorySaver):
+    """
+    Args:
+        max_threads: Threads kept in memory (LRU)
+        max_bytes: Approximate serialized bytes kept in memory across all threads
+        history_per_thread: Checkpoints kept per thread/namespace
+        store: Optional durable store for write-through / restore
+    """
+
+    def __init__(
+        self,
+        max_threads: int = CHECKPOINT_MAX_THREADS,
+        max_bytes: int = CHECKPOINT_MAX_BYTES,
+        history_per_thread: int = CHECKPOINT_HISTORY_PER_THREAD,
+        store=None,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.max_threads = max(1, max_threads)
+        self.max_bytes = max_bytes
+        self.history_per_thread = max(1, history_per_thread)
+        self.store = store
+        self._lock = threading.RLock()
+        self._lru: "OrderedDict[str, int]" = OrderedDict()  # thread_id -> bytes
+        self._blob_keys: Dict[str, Set[tuple]] = defaultdict(set)
+        self._write_keys: Dict[str, Set[tuple]] = defaultdict(set)
+        self.evictions = 0
+
+    # ---------- 용량 관리 ----------
+    def _thread_bytes(self, thread_id: str) -> int:
+        size = sum(len(self.blobs[k][1]) for k in self._blob_keys.get(thread_id, ()) if k in self.blobs)
+        for checkpoints in self.storage.get(thread_id, {}).values():
+            for checkpoint, metadata, _parent in checkpoints.values():
+                size += len(checkpoint[1]) + len(metadata[1])
+        return size
+
+    def _prune_history(self, thread_id: str, checkpoint_ns: str) -> None:
+        checkpoints = self.storage[thread_id][checkpoint_ns]
+        if len(checkpoints) <= self.history_per_thread:
+            return
+        ordered = sorted(checkpoints)
+        for checkpoint_id in ordered[: -self.history_per_thread]:
+            del checkpoints[checkpoint_id]
+            self.writes.pop((thread_id, checkpoint_ns, checkpoint_id), None)
+            self._write_keys[thread_id].discard((thread_id, checkpoint_ns, checkpoint_id))
+
+        # 남은 체크포인트가 참조하지 않는 채널 버전 blob 정리
+        referenced = set()
+        for checkpoint, _metadata, _parent in checkpoints.values():
+            versions = self.serde.loads_typed(checkpoint)["channel_versions"]
+            referenced.update((thread_id, checkpoint_ns, ch, v) for ch, v in versions.items())
+        for key in [k for k in self._blob_keys[thread_id] if k[1] == checkpoint_ns and k not in referenced]:
+            self.blobs.pop(key, None)
+            self._blob_keys[thread_id].discard(key)
+
+    def _drop_thread_memory(self, thread_id: str) -> None:
+        self.storage.pop(thread_id, None)
+        for key in self._blob_keys.pop(thread_id, ()):
+            self.blobs.pop(key, None)
+        for key in self._write_keys.pop(thread_id, ()):
+            self.writes.pop(key, None)
+        self._lru.pop(thread_id, None)
+
+    def _touch(self, thread_id: str, recompute: bool = False) -> None:
+        if recompute or thread_id not in self._lru:
+            self._lru[thread_id] = self._thread_bytes(thread_id)
+        self._lru.move_to_end(thread_id)
+        total = sum(self._lru.values())
+        while len(self._lru) > 1 and (len(self._lru) > self.max_threads or total > self.max_bytes):
+            evicted, size = next(iter(self._lru.items()))
+            if evicted == thread_id:
+                break
+            self._drop_thread_memory(evicted)
+            total -= size
+            self.evictions += 1
+
+    # ---------- 영구 저장소 연동 ----------
+    def _restore(self, thread_id: str, checkpoint_ns: str) -> bool:
+        row = self.store.load(thread_id, checkpoint_ns)
+        if not row:
+            return False
+        _checkpoint_id, ctype, cbytes, mtype, mbytes, parent_id = row
+        checkpoint = self.serde.loads_typed((ctype, cbytes))
+        metadata = self.serde.loads_typed((mtype, mbytes))
+        config = {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": parent_id,
+            }
+        }
+        self._put_memory(config, checkpoint, metadata, checkpoint["channel_versions"])
+        return True
+
+    def _sync_from_store(self, thread_id: str, checkpoint_ns: str) -> None:
+        """메모리에 없거나 다른 워커가 더 최신 체크포인트를 썼으면 저장소에서 복원합니다."""
+        latest = self.store.latest_id(thread_id, checkpoint_ns)
+        if not latest:
+            return
+        in_memory = self.storage.get(thread_id, {}).get(checkpoint_ns, {})
+        if latest not in in_memory and (not in_memory or latest > max(in_memory)):
+            self._restore(thread_id, checkpoint_ns)
+
+    # ---------- BaseCheckpointSaver 구현 ----------
+    def _put_memory(self, config, checkpoint, metadata, new_versions):
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        result = super().put(config, checkpoint, metadata, new_versions)
+        self._blob_keys[thread_id].update(
+            (thread_id, checkpoint_ns, k, v) for k, v in new_versions.items()
+        )
+        self._prune_history(thread_id, checkpoint_ns)
+        self._touch(thread_id, recompute=True)
+        return result
+
+    def get_tuple(self, config):
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        with self._lock:
+            if self.store is not None:
+                self._sync_from_store(thread_id, checkpoint_ns)
+            if thread_id not in self.storage:
+                return None
+            result = super().get_tuple(config)
+            self._touch(thread_id)
+            return result
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        with self._lock:
+            result = self._put_memory(config, checkpoint, metadata, new_versions)
+        if self.store is not None:
+            ctype, cbytes = self.serde.dumps_typed(checkpoint)
+            mtype, mbytes = self.serde.dumps_typed(metadata)
+            self.store.save(
+                config["configurable"]["thread_id"],
+                config["configurable"]["checkpoint_ns"],
+                (
+                    checkpoint["id"],
+                    ctype,
+                    cbytes,
+                    mtype,
+                    mbytes,
+                    config["configurable"].get("checkpoint_id"),
+                ),
+            )
+        return result
+
+    def put_writes(self, config, writes, task_id, task_path=""):
+        thread_id = config["configurable"]["thread_id"]
+        with self._lock:
+            super().put_writes(config, writes, task_id, task_path)
+            self._write_keys[thread_id].add(
+                (
+                    thread_id,
+                    config["configurable"].get("checkpoint_ns", ""),
+                    config["configurable"]["checkpoint_id"],
+                )
+            )
+
+    def list(self, config, *, filter=None, before=None, limit=None):
+        with self._lock:
+            items = list(super().list(config, filter=filter, before=before, limit=limit))
+        yield from items
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock:
+            self._drop_thread_memory(thread_id)
+        if self.store is not None:
+            self.store.delete(thread_id)
+
+    # 영구 저장소 I/O가 있으면 이벤트 루프를 막지 않도록 스레드에서 실행
+    async def aget_tuple(self, config):
+        if self.store is None:
+            return self.get_tuple(config)
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        if self.store is None:
+            return self.put(config, checkpoint, metadata, new_versions)
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        if self.store is None:
+            return self.delete_thread(thread_id)
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "threads": len(self._lru),
+                "bytes": sum(self._lru.values()),
+                "evictions": self.evictions,
+            }
+
+
+def create_checkpointer(backend: str = CHECKPOINT_BACKEND) -> BoundedMemorySaver:
+    """CHECKPOINT_BACKEND 설정에 맞는 체크포인터를 생성합니다. 저장소 초기화 실패 시 메모리 전용으로 동작합니다."""
+    store = None
+    try:
+        if backend == "sqlite":
+            store = SqliteCheckpointStore()
+        elif backend == "postgres":
+            from .database import get_recom_db_connection, release_recom_db_connection
+
+            store = PostgresCheckpointStore(get_recom_db_connection, release_recom_db_connection)
+    except Exception as e:
+        print(f"⚠️ [Checkpointer] {backend} 저장소 초기화 실패 -> 메모리 전용: {e}")
+        store = None
+    return BoundedMemorySaver(store=store)
@@ -3,21 +3,52 @@ import os
 import traceback
 import json
 import asyncio
+import time
 from typing import List, Dict, Any, Optional
+import threading
 import psycopg2
 from psycopg2 import pool  # [최적화] 커넥션 풀 도입
 from psycopg2.extras import RealDictCursor
 from dotenv import load_dotenv
 from openai import OpenAI, AsyncOpenAI  # [최적화] 비동기 클라이언트 추가
 
-# 오탈자 보정 라이브러리
+# [최적화] 임베딩/번역 결과 2단 캐시 (LRU + SQLite)
+from .embedding_cache import embedding_cache
+
+# [최적화] 향수별 리뷰 centroid (오프라인 배치로 생성)
+from .review_centroids import (
+    CENTROID_SCORE_SQL,
+    centroid_index,
+    to_pgvector_literal,
+)
+
+# [최적화] 비동기 DB 드라이버 (psycopg3 + psycopg_pool). 미설치 시 스레드 오프로딩으로 대체
 try:
-    from Levenshtein import distance
+    from psycopg.conninfo import make_conninfo
+    from psycopg.rows import dict_row
+    from psycopg_pool import AsyncConnectionPool
 except ImportError:
+    AsyncConnectionPool = None
+
+# [최적화] 로컬 브랜드 매칭 엔진 (정규화 키 + 별칭 + 트라이그램/편집 거리)
+from .brand_matcher import BrandMatcher
+from .cache_utils import LRUCache
+from .tracing import record_db_query
+
+# [최적화] 인메모리 노트 사전 (완전 일치 해시 + 대칭 삭제 인덱스)
+from .note_index import NoteDictionary
+
+# [최적화] 카탈로그 어휘 스냅샷 (TTL + 백그라운드 갱신 + 버전 관리)
+from .catalog_vocab import CatalogSnapshot, CatalogVocabulary
 
-    def distance(s1, s2):
-        return 0 if s1 == s2 else 100
+# [최적화] info 라우터용 인메모리 향수 이름 인덱스
+from .info_router import PerfumeNameIndex
 
+# [최적화] 채팅 메시지 write-behind 저장 (큐 + 배치 + 재시도)
+from .chat_log_writer import ChatLogWriter
+
+# [최적화] 스레드별 최근 대화 캐시 (체크포인터에 상태가 없을 때만 사용)
+from .chat_history import ChatHistoryCache
 
 load_dotenv()
 
@@ -32,14 +63,44 @@ DB_CONFIG = {
     "port": os.getenv("DB_PORT", "5432"),
 }
 
+
+
+class _LazyThreadedPool:
+    """첫 getconn() 시점에 ThreadedConnectionPool을 생성합니다 (import 시 DB 연결 방지)."""
+
+    def __init__(self, minconn: int, maxconn: int, **config):
+        self._args = (minconn, maxconn)
+        self._config = config
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self):
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = pool.ThreadedConnectionPool(*self._args, **self._config)
+        return self._pool
+
+    def getconn(self):
+        return self._get_pool().getconn()
+
+    def putconn(self, conn):
+        self._get_pool().putconn(conn)
+
+    def closeall(self):
+        if self._pool is not None:
+            self._pool.closeall()
+            self._pool = None
+
+
 # [최적화] 병렬 처리를 위한 커넥션 풀 생성 (최소 1개, 최대 20개 유지)
-perfume_db_pool = pool.ThreadedConnectionPool(1, 20, **DB_CONFIG)
+perfume_db_pool = _LazyThreadedPool(1, 20, **DB_CONFIG)
 
 RECOM_DB_CONFIG = {
     **DB_CONFIG,
     "dbname": os.getenv("RECOM_DB_NAME", "recom_db"),
 }
-recom_db_pool = pool.ThreadedConnectionPool(1, 20, **RECOM_DB_CONFIG)
+recom_db_pool = _LazyThreadedPool(1, 20, **RECOM_DB_CONFIG)
 
 # ============ 추가 ============
 MEMBER_DB_CONFIG = {
@@ -49,13 +110,33 @@ MEMBER_DB_CONFIG = {
 # ============ 추가 ============
 
 # [최적화] 회원 DB 풀 추가 (로그인/프로필 병목 해결)
-member_db_pool = pool.ThreadedConnectionPool(1, 20, **MEMBER_DB_CONFIG)
+member_db_pool = _LazyThreadedPool(1, 20, **MEMBER_DB_CONFIG)
 
 # [최적화] 동기/비동기 OpenAI 클라이언트 이원화
 client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 async_client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
 BRAND_CACHE = []
+_brand_matcher: Optional[BrandMatcher] = None
+# [최적화] LLM 브랜드 매칭은 최후의 수단 + 결과 메모이제이션 (미매칭도 ""로 저장)
+BRAND_LLM_FALLBACK = os.getenv("BRAND_LLM_FALLBACK", "true").lower() == "true"
+BRAND_LLM_CANDIDATES = 20
+_brand_llm_memo = LRUCache(maxsize=1024)
+
+# [최적화] 리랭킹 점수 계산 방식
+# - centroid: 향수별 리뷰 centroid와 벡터 연산 1회 (pgvector, 실패 시 NumPy 인메모리 fallback)
+# - exact: 기존 방식 (후보의 모든 리뷰와 비교하여 MAX 유사도 사용, 검증용)
+RERANK_MODE = os.getenv("RERANK_MODE", "centroid").strip().lower()
+_centroid_sql_available = True
+# centroid 테이블/pgvector가 없는 DB에서만 SQL 경로를 끕니다 (일시적인 풀/타임아웃 오류는 해당 호출만 fallback)
+# 42P01 undefined_table, 42883 undefined_function, 42704 undefined_object (vector 타입 없음)
+_CENTROID_MISSING_SQLSTATES = {"42P01", "42883", "42704"}
+
+
+def _is_missing_object_error(error: Exception) -> bool:
+    # psycopg2는 pgcode, psycopg3는 sqlstate에 SQLSTATE 코드를 담습니다
+    code = getattr(error, "pgcode", None) or getattr(error, "sqlstate", None)
+    return code in _CENTROID_MISSING_SQLSTATES
 
 
 # [함수 수정] 풀에서 연결 가져오기 및 반납 로직
@@ -83,286 +164,654 @@ def release_member_db_connection(conn):
     member_db_pool.putconn(conn)
 # ======================================
 
-# [최적화] 비동기 임베딩 생성 (API 블로킹 방지)
-async def get_embedding_async(text: str) -> List[float]:
+
+# ==========================================
+# 0-1. 공통 쿼리 실행기 (동기 / 비동기)
+# ==========================================
+# [최적화] 비동기 경로(채팅 스트림, 에이전트 노드/도구)는 이벤트 루프를 막지 않도록
+# psycopg3 AsyncConnectionPool을 사용합니다. SQL은 %s 플레이스홀더를 그대로 공유하므로
+# 동기 함수(라우터용)와 비동기 함수가 같은 쿼리 빌더를 사용합니다.
+# - ASYNC_DB_DRIVER=psycopg: psycopg3 비동기 풀 (기본값, 미설치 시 자동으로 thread)
+# - ASYNC_DB_DRIVER=thread: 기존 psycopg2 풀을 asyncio.to_thread로 실행
+ASYNC_DB_DRIVER = os.getenv("ASYNC_DB_DRIVER", "psycopg").strip().lower()
+ASYNC_DB_MIN_SIZE = int(os.getenv("ASYNC_DB_MIN_SIZE", "1"))
+ASYNC_DB_MAX_SIZE = int(os.getenv("ASYNC_DB_MAX_SIZE", "20"))
+
+_SYNC_POOLS = {
+    "perfume": (get_db_connection, release_db_connection),
+    "recom": (get_recom_db_connection, release_recom_db_connection),
+    "member": (get_member_db_connection, release_member_db_connection),
+}
+_DB_CONFIGS = {
+    "perfume": DB_CONFIG,
+    "recom": RECOM_DB_CONFIG,
+    "member": MEMBER_DB_CONFIG,
+}
+# (이벤트 루프, 풀) - 풀은 생성된 루프에서만 사용할 수 있음
+_async_pools: Dict[str, Any] = {}
+_async_pool_futures: Dict[str, asyncio.Future] = {}
+
+
+def _use_async_driver() -> bool:
+    return AsyncConnectionPool is not None and ASYNC_DB_DRIVER == "psycopg"
+
+
+def _fetch_result(cur, fetch: Optional[str], dict_rows: bool):
+    if fetch == "all":
+        rows = cur.fetchall()
+        return [dict(r) for r in rows] if dict_rows else rows
+    if fetch == "one":
+        row = cur.fetchone()
+        return dict(row) if dict_rows and row is not None else row
+    return None
+
+
+def _run_sync(db: str, statements, fetch: Optional[str] = None, dict_rows: bool = False, commit: bool = False):
+    """statements([(sql, params), ...])를 한 트랜잭션에서 실행하고 마지막 문장의 결과를 반환합니다."""
+    get_conn, release_conn = _SYNC_POOLS[db]
+    conn = get_conn()
+    cur = conn.cursor(cursor_factory=RealDictCursor) if dict_rows else conn.cursor()
     try:
-        if not text:
-            return []
-        response = await async_client.embeddings.create(
-            input=text.replace("\n", " "), model="text-embedding-3-small"
-        )
-        return response.data[0].embedding
-    except Exception as e:
-        print(f"⚠️ Embedding Error: {e}")
+        for sql, params in statements:
+            cur.execute(sql, params)
+        result = _fetch_result(cur, fetch, dict_rows)
+        if commit:
+            conn.commit()
+        return result
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+        release_conn(conn)
+
+
+async def _open_async_pool(db: str):
+    config = _DB_CONFIGS[db]
+    async_pool = AsyncConnectionPool(
+        make_conninfo(**config),
+        min_size=ASYNC_DB_MIN_SIZE,
+        max_size=ASYNC_DB_MAX_SIZE,
+        open=False,
+        name=f"{db}_async_pool",
+    )
+    await async_pool.open()
+    print(f"✅ [DB] 비동기 커넥션 풀 생성: {config['dbname']}")
+    return async_pool
+
+
+async def get_async_pool(db: str):
+    """DB별 비동기 풀을 최초 사용 시점에 한 번만 생성합니다 (동시 요청은 같은 생성 작업을 기다림)."""
+    loop = asyncio.get_running_loop()
+    entry = _async_pools.get(db)
+    if entry and entry[0] is loop:
+        return entry[1]
+
+    future = _async_pool_futures.get(db)
+    if future is None or future.get_loop() is not loop:
+        future = asyncio.ensure_future(_open_async_pool(db))
+        _async_pool_futures[db] = future
+    try:
+        async_pool = await asyncio.shield(future)
+    except Exception:
+        if _async_pool_futures.get(db) is future:
+            del _async_pool_futures[db]
+        raise
+    _async_pools[db] = (loop, async_pool)
+    return async_pool
+
+
+async def close_async_pools() -> None:
+    """앱 종료 시 비동기 풀을 정리합니다 (main.py lifespan)."""
+    pools = list(_async_pools.values())
+    _async_pools.clear()
+    _async_pool_futures.clear()
+    for _loop, async_pool in pools:
+        try:
+            await async_pool.close()
+        except Exception as e:
+            print(f"⚠️ [DB] 비동기 풀 종료 실패: {e}")
+
+
+async def _run_async(db: str, statements, fetch: Optional[str] = None, dict_rows: bool = False, commit: bool = False):
+    """_run_sync의 비동기 버전. 성공 시 커밋, 예외 시 롤백은 풀 컨텍스트가 처리합니다."""
+    started = time.perf_counter()
+    try:
+        if not _use_async_driver():
+            return await asyncio.to_thread(_run_sync, db, statements, fetch, dict_rows, commit)
+
+        async_pool = await get_async_pool(db)
+        async with async_pool.connection() as conn:
+            cursor_kwargs = {"row_factory": dict_row} if dict_rows else {}
+            async with conn.cursor(**cursor_kwargs) as cur:
+                for sql, params in statements:
+                    await cur.execute(sql, params)
+                if fetch == "all":
+                    return await cur.fetchall()
+                if fetch == "one":
+                    return await cur.fetchone()
+                return None
+    finally:
+        # 커넥션 대기 시간 포함 (풀 고갈도 trace에서 보이도록)
+        record_db_query(db, time.perf_counter() - started)
+
+EMBEDDING_MODEL = "text-embedding-3-small"
+EMBEDDING_NAMESPACE = f"embedding:{EMBEDDING_MODEL}"
+
+STYLIZE_MODEL = "gpt-4o-mini"
+STYLIZE_SYSTEM_PROMPT = "You are a Perfume Data Analyst. Transform the Korean logic into a sensory description..."
+# 프롬프트가 바뀌면 캐시가 자동으로 분리되도록 버전을 네임스페이스에 포함
+STYLIZE_NAMESPACE = f"stylize:{STYLIZE_MODEL}:v1"
+
+
+# [최적화] 비동기 임베딩 생성 (API 블로킹 방지 + 캐시 + 동일 요청 single-flight)
+async def get_embedding_async(text: str) -> List[float]:
+    if not text:
         return []
 
+    async def _compute() -> List[float]:
+        try:
+            response = await async_client.embeddings.create(
+                input=text.replace("\n", " "), model=EMBEDDING_MODEL
+            )
+            return response.data[0].embedding
+        except Exception as e:
+            print(f"⚠️ Embedding Error: {e}")
+            return []
+
+    return await embedding_cache.get_or_compute(EMBEDDING_NAMESPACE, text, _compute)
+
+
+# [최적화] 배치 임베딩: 캐시에 없는 텍스트만 모아 embeddings 요청 1회로 처리
+async def get_embeddings_async(texts: List[str]) -> List[List[float]]:
+    results: List[Optional[List[float]]] = [
+        embedding_cache.get(EMBEDDING_NAMESPACE, t) if t else [] for t in texts
+    ]
+    missing = list(dict.fromkeys(t for t, r in zip(texts, results) if r is None))
+    if missing:
+        try:
+            response = await async_client.embeddings.create(
+                input=[t.replace("\n", " ") for t in missing], model=EMBEDDING_MODEL
+            )
+            computed = {
+                missing[item.index]: item.embedding for item in response.data
+            }
+        except Exception as e:
+            print(f"⚠️ Batch Embedding Error: {e}")
+            computed = {}
+        for text, vector in computed.items():
+            embedding_cache.set(EMBEDDING_NAMESPACE, text, vector)
+        results = [
+            computed.get(t, []) if r is None else r for t, r in zip(texts, results)
+        ]
+    return results
+
 
 # 기존 동기 함수 (필요 시 유지)
 def get_embedding(text: str) -> List[float]:
-    try:
-        if not text:
-            return []
-        return (
-            client.embeddings.create(
-                input=text.replace("\n", " "), model="text-embedding-3-small"
+    if not text:
+        return []
+
+    def _compute() -> List[float]:
+        try:
+            return (
+                client.embeddings.create(
+                    input=text.replace("\n", " "), model=EMBEDDING_MODEL
+                )
+                .data[0]
+                .embedding
             )
-            .data[0]
-            .embedding
+        except Exception as e:
+            print(f"⚠️ Sync Embedding Error: {e}")
+            return []
+
+    return embedding_cache.get_or_compute_sync(EMBEDDING_NAMESPACE, text, _compute)
+
+
+# [최적화] 리랭킹용 감각 묘사 번역 (동일 query_text는 캐시에서 재사용)
+async def stylize_query_async(query_text: str) -> str:
+    if not query_text:
+        return ""
+
+    async def _compute() -> str:
+        translation = await async_client.chat.completions.create(
+            model=STYLIZE_MODEL,
+            messages=[
+                {"role": "system", "content": STYLIZE_SYSTEM_PROMPT},
+                {"role": "user", "content": query_text},
+            ],
+            temperature=0,
         )
-    except Exception as e:
-        print(f"⚠️ Sync Embedding Error: {e}")
-        return []
+        return translation.choices[0].message.content.strip()
+
+    return await embedding_cache.get_or_compute(STYLIZE_NAMESPACE, query_text, _compute)
 
 
 # ==========================================
 # 1. 브랜드 및 메타데이터 관리
 # ==========================================
+# [최적화] 카탈로그 어휘(브랜드/시즌/상황/어코드/노트)는 catalog_vocab 스냅샷 하나로 관리
+CATALOG_VOCAB_SQL = {
+    "brands": "SELECT DISTINCT perfume_brand FROM TB_PERFUME_BASIC_M",
+    "seasons": "SELECT DISTINCT season FROM TB_PERFUME_SEASON_R",
+    "occasions": "SELECT DISTINCT occasion FROM TB_PERFUME_OCA_R",
+    "accords": "SELECT DISTINCT accord FROM TB_PERFUME_ACCORD_R",
+    "notes": "SELECT DISTINCT note FROM TB_PERFUME_NOTES_M",
+}
+
+
+def _load_catalog_vocabulary() -> Dict[str, List[str]]:
+    return {
+        name: [r[0] for r in _run_sync("perfume", [(sql, None)], fetch="all") if r[0]]
+        for name, sql in CATALOG_VOCAB_SQL.items()
+    }
+
+
+catalog_vocab = CatalogVocabulary(_load_catalog_vocabulary)
+
+
+def _on_catalog_update(snapshot: CatalogSnapshot) -> None:
+    """새 어휘 버전이 적재되면 브랜드 매처와 노트 사전을 함께 교체합니다."""
+    global BRAND_CACHE, _brand_matcher
+    _brand_matcher = BrandMatcher(snapshot.brands)
+    BRAND_CACHE = list(snapshot.brands)
+    note_dictionary.load(snapshot.notes)
+
+
+# 노트 사전은 카탈로그 스냅샷에서 채워지고 갱신도 카탈로그 구독으로 받음
+note_dictionary = NoteDictionary(lambda: catalog_vocab.get().notes)
+catalog_vocab.subscribe(_on_catalog_update)
+
+
 def get_all_brands() -> List[str]:
-    global BRAND_CACHE
-    if BRAND_CACHE:
-        return BRAND_CACHE
+    return list(catalog_vocab.get().brands)
 
-    conn = get_db_connection()
-    cur = conn.cursor()
-    try:
-        cur.execute("SELECT DISTINCT perfume_brand FROM TB_PERFUME_BASIC_M")
-        BRAND_CACHE = [r[0] for r in cur.fetchall() if r[0]]
-        return BRAND_CACHE
-    finally:
-        cur.close()
-        release_db_connection(conn)
+
+async def get_all_brands_async() -> List[str]:
+    return list((await catalog_vocab.get_async()).brands)
+
+
+def get_brand_matcher() -> BrandMatcher:
+    catalog_vocab.get()
+    return _brand_matcher
+
+
+async def find_brand_mentions_async(text: str) -> List[str]:
+    """문장에 언급된 카탈로그 브랜드 목록 (IntentRouter용, 최초 1회만 카탈로그 적재)."""
+    await catalog_vocab.get_async()
+    return _brand_matcher.mentions(text)
+
+
+# [최적화] 향수 이름/한글명/검색 키워드 인덱스 (info 서브그래프 로컬 라우팅용, TTL마다 백그라운드 갱신)
+PERFUME_NAME_INDEX_SQL = """
+    SELECT p.perfume_id, p.perfume_brand, p.perfume_name, n.name_kr, n.search_keywords
+    FROM TB_PERFUME_BASIC_M p
+    LEFT JOIN TB_PERFUME_NAME_KR n ON p.perfume_id = n.perfume_id
+"""
+
+
+def _load_perfume_names() -> List[Dict[str, Any]]:
+    return _run_sync("perfume", [(PERFUME_NAME_INDEX_SQL, None)], fetch="all", dict_rows=True)
+
+
+perfume_name_index = PerfumeNameIndex(_load_perfume_names)
+
+
+async def get_perfume_name_index_async() -> PerfumeNameIndex:
+    """최초 적재만 스레드에서 수행하고, 이후에는 DB 없이 인메모리 인덱스를 바로 반환합니다."""
+    if not perfume_name_index.is_loaded:
+        await asyncio.to_thread(perfume_name_index.ensure_loaded)
+    else:
+        perfume_name_index.ensure_loaded()
+    return perfume_name_index
+
+
+def _brand_llm_messages(user_input: str, candidates: List[str]):
+    # [최적화] 전체 브랜드 목록 대신 로컬 매처가 추린 상위 후보만 전달
+    return [
+        {
+            "role": "system",
+            "content": "You are a Brand Matcher. Return ONLY the exact brand name or 'None'.",
+        },
+        {
+            "role": "user",
+            "content": f"List: [{', '.join(candidates)}]\nInput: {user_input}",
+        },
+    ]
+
+
+def _local_brand_match(matcher: BrandMatcher, user_input: str):
+    """(확정된 브랜드명 | None, LLM에 넘길 후보 목록)"""
+    best = matcher.resolve(user_input)
+    if best:
+        return best.brand, []
+    candidates = [m.brand for m in matcher.match(user_input, limit=BRAND_LLM_CANDIDATES)]
+    # 로컬 후보가 하나도 없으면 (한글 표기 "펜디", 약칭 등 trigram이 겹치지 않는 입력)
+    # 기존처럼 전체 브랜드 목록을 LLM에 넘겨 매칭 (결과는 메모이제이션)
+    if not candidates:
+        candidates = list(matcher.brands)
+    return None, candidates
+
+
+def _accept_llm_brand(user_input: str, matched: Optional[str], candidates: List[str]) -> str:
+    matched = (matched or "").strip()
+    result = matched if matched in candidates else ""
+    _brand_llm_memo.set(user_input.strip().lower(), result)
+    return result or user_input
 
 
 def match_brand_name(user_input: str) -> str:
     if not user_input:
         return user_input
-    all_brands = get_all_brands()
-    for b in all_brands:
-        if b.lower() == user_input.lower():
-            return b
+    brand, candidates = _local_brand_match(get_brand_matcher(), user_input)
+    if brand:
+        return brand
+
+    memo = _brand_llm_memo.get(user_input.strip().lower())
+    if memo is not None:
+        return memo or user_input
+    if not BRAND_LLM_FALLBACK or not candidates:
+        return user_input
 
     try:
-        brands_str = ", ".join(all_brands)
         response = client.chat.completions.create(
             model="gpt-4o-mini",
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are a Brand Matcher. Return ONLY the exact brand name or 'None'.",
-                },
-                {
-                    "role": "user",
-                    "content": f"List: [{brands_str}]\nInput: {user_input}",
-                },
-            ],
+            messages=_brand_llm_messages(user_input, candidates),
+            temperature=0,
+        )
+        return _accept_llm_brand(
+            user_input, response.choices[0].message.content, candidates
+        )
+    except Exception:
+        return user_input
+
+
+async def match_brand_name_async(user_input: str) -> str:
+    """match_brand_name의 비동기 버전. 로컬 매칭은 이벤트 루프에서 바로 처리합니다."""
+    if not user_input:
+        return user_input
+    await catalog_vocab.get_async()
+    brand, candidates = _local_brand_match(_brand_matcher, user_input)
+    if brand:
+        return brand
+
+    memo = _brand_llm_memo.get(user_input.strip().lower())
+    if memo is not None:
+        return memo or user_input
+    if not BRAND_LLM_FALLBACK or not candidates:
+        return user_input
+
+    try:
+        response = await async_client.chat.completions.create(
+            model="gpt-4o-mini",
+            messages=_brand_llm_messages(user_input, candidates),
             temperature=0,
         )
-        matched = response.choices[0].message.content.strip()
-        if matched and matched != "None" and matched in all_brands:
-            return matched
+        return _accept_llm_brand(
+            user_input, response.choices[0].message.content, candidates
+        )
     except Exception:
-        pass
-    return user_input
+        return user_input
 
 
 def fetch_meta_data() -> Dict[str, str]:
-    meta = {}
-    conn = None
     try:
-        conn = get_db_connection()
-        cur = conn.cursor()
-        cur.execute("SELECT DISTINCT season FROM TB_PERFUME_SEASON_R")
-        meta["seasons"] = ", ".join([str(r[0]) for r in cur.fetchall() if r[0]])
-        cur.execute("SELECT DISTINCT occasion FROM TB_PERFUME_OCA_R")
-        meta["occasions"] = ", ".join([str(r[0]) for r in cur.fetchall() if r[0]])
-        cur.execute("SELECT DISTINCT accord FROM TB_PERFUME_ACCORD_R LIMIT 100")
-        meta["accords"] = ", ".join([str(r[0]) for r in cur.fetchall() if r[0]])
-        meta["genders"] = "Women, Men, Unisex"
+        return catalog_vocab.get().as_meta()
     except Exception:
-        meta = {}
-    finally:
-        if conn:
-            cur.close()
-            release_db_connection(conn)
-    return meta
+        return {}
 
 
 # ==========================================
 # 2. 검색 엔진 (Connection Pool 적용)
 # ==========================================
-def search_perfumes(
+def _build_search_query(
     hard_filters: Dict[str, Any],
     strategy_filters: Dict[str, List[str]],
-    exclude_ids: List[int] = None,
-    limit: int = 20,
-) -> List[Dict[str, Any]]:
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-    try:
-        sql = """
-            SELECT DISTINCT m.perfume_id as id, m.perfume_brand as brand, m.perfume_name as name, m.img_link as image_url,
-            (SELECT STRING_AGG(DISTINCT accord, ', ') FROM TB_PERFUME_ACCORD_R WHERE perfume_id = m.perfume_id) as accords,
-            (SELECT gender FROM TB_PERFUME_GENDER_R WHERE perfume_id = m.perfume_id LIMIT 1) as gender,
-            (SELECT STRING_AGG(DISTINCT n.note, ', ') FROM TB_PERFUME_NOTES_M n WHERE n.perfume_id = m.perfume_id AND UPPER(n.type) = 'TOP') as top_notes,
-            (SELECT STRING_AGG(DISTINCT n.note, ', ') FROM TB_PERFUME_NOTES_M n WHERE n.perfume_id = m.perfume_id AND UPPER(n.type) = 'MIDDLE') as middle_notes,
-            (SELECT STRING_AGG(DISTINCT n.note, ', ') FROM TB_PERFUME_NOTES_M n WHERE n.perfume_id = m.perfume_id AND UPPER(n.type) = 'BASE') as base_notes
-            FROM TB_PERFUME_BASIC_M m
-        """
-        params, where_clauses = [], []
-
-        if exclude_ids:
+    exclude_ids: Optional[List[int]],
+    limit: int,
+    brand_name: Optional[str] = None,
+):
+    """search_perfumes / search_perfumes_async 공용 SQL 빌더. brand_name은 보정된 브랜드명입니다."""
+    sql = """
+        SELECT DISTINCT m.perfume_id as id, m.perfume_brand as brand, m.perfume_name as name, m.img_link as image_url,
+        (SELECT STRING_AGG(DISTINCT accord, ', ') FROM TB_PERFUME_ACCORD_R WHERE perfume_id = m.perfume_id) as accords,
+        (SELECT gender FROM TB_PERFUME_GENDER_R WHERE perfume_id = m.perfume_id LIMIT 1) as gender,
+        (SELECT STRING_AGG(DISTINCT n.note, ', ') FROM TB_PERFUME_NOTES_M n WHERE n.perfume_id = m.perfume_id AND UPPER(n.type) = 'TOP') as top_notes,
+        (SELECT STRING_AGG(DISTINCT n.note, ', ') FROM TB_PERFUME_NOTES_M n WHERE n.perfume_id = m.perfume_id AND UPPER(n.type) = 'MIDDLE') as middle_notes,
+        (SELECT STRING_AGG(DISTINCT n.note, ', ') FROM TB_PERFUME_NOTES_M n WHERE n.perfume_id = m.perfume_id AND UPPER(n.type) = 'BASE') as base_notes
+        FROM TB_PERFUME_BASIC_M m
+    """
+    params, where_clauses = [], []
+
+    if exclude_ids:
+        where_clauses.append(
+            f"m.perfume_id NOT IN ({','.join(['%s']*len(exclude_ids))})"
+        )
+        params.extend(exclude_ids)
+
+    if hard_filters.get("gender"):
+        g = hard_filters["gender"].lower()
+
+        if g in ["women", "female"]:
+            # 여성용 요청 시: 여성용 + 유니섹스 포함
             where_clauses.append(
-                f"m.perfume_id NOT IN ({','.join(['%s']*len(exclude_ids))})"
+                "m.perfume_id IN (SELECT perfume_id FROM TB_PERFUME_GENDER_R WHERE gender IN (%s, %s))"
             )
-            params.extend(exclude_ids)
+            params.extend(["Feminine", "Unisex"])  # 여기서 값을 추가합니다.
 
-        if hard_filters.get("gender"):
-            g = hard_filters["gender"].lower()
+        elif g in ["men", "male"]:
+            # 남성용 요청 시: 남성용 + 유니섹스 포함
+            where_clauses.append(
+                "m.perfume_id IN (SELECT perfume_id FROM TB_PERFUME_GENDER_R WHERE gender IN (%s, %s))"
+            )
+            params.extend(["Masculine", "Unisex"])  # 여기서 값을 추가합니다.
 
-            if g in ["women", "female"]:
-                # 여성용 요청 시: 여성용 + 유니섹스 포함
-                where_clauses.append(
-                    "m.perfume_id IN (SELECT perfume_id FROM TB_PERFUME_GENDER_R WHERE gender IN (%s, %s))"
-                )
-                params.extend(["Feminine", "Unisex"])  # 여기서 값을 추가합니다.
+        else:
+            # 유니섹스 요청 시: 오직 'Unisex'만 검색
+            where_clauses.append(
+                "m.perfume_id IN (SELECT perfume_id FROM TB_PERFUME_GENDER_R WHERE gender = %s)"
+            )
+            params.append("Unisex")  # 여기서 값을 추가합니다.
+
+    if hard_filters.get("brand"):
+        where_clauses.append("m.perfume_brand ILIKE %s")
+        params.append(brand_name or hard_filters["brand"])
+
+    hard_meta_map = {
+        "season": ("TB_PERFUME_SEASON_R", "season"),
+        "occasion": ("TB_PERFUME_OCA_R", "occasion"),
+        "accord": ("TB_PERFUME_ACCORD_R", "accord"),
+        "note": ("TB_PERFUME_NOTES_M", "note"),
+    }
+    for k, (t, c) in hard_meta_map.items():
+        if hard_filters.get(k):
+            where_clauses.append(
+                f"m.perfume_id IN (SELECT perfume_id FROM {t} WHERE {c} ILIKE %s)"
+            )
+            params.append(hard_filters[k])
+
+    strategy_map = {
+        "accord": ("TB_PERFUME_ACCORD_R", "accord"),
+        "season": ("TB_PERFUME_SEASON_R", "season"),
+        "occasion": ("TB_PERFUME_OCA_R", "occasion"),
+        "note": ("TB_PERFUME_NOTES_M", "note"),
+    }
+    for k, vals in strategy_filters.items():
+        if not vals or k == "gender":
+            continue
+        mapping = strategy_map.get(k.lower())
+        if mapping:
+            t, c = mapping
+            clauses = [
+                f"m.perfume_id IN (SELECT perfume_id FROM {t} WHERE {c} ILIKE %s)"
+                for v in vals
+            ]
+            params.extend(vals)
+            where_clauses.append(f"({' OR '.join(clauses)})")
+
+    if where_clauses:
+        sql += " WHERE " + " AND ".join(where_clauses)
+    sql += f" LIMIT {limit}"
+    return sql, params
 
-            elif g in ["men", "male"]:
-                # 남성용 요청 시: 남성용 + 유니섹스 포함
-                where_clauses.append(
-                    "m.perfume_id IN (SELECT perfume_id FROM TB_PERFUME_GENDER_R WHERE gender IN (%s, %s))"
-                )
-                params.extend(["Masculine", "Unisex"])  # 여기서 값을 추가합니다.
 
-            else:
-                # 유니섹스 요청 시: 오직 'Unisex'만 검색
-                where_clauses.append(
-                    "m.perfume_id IN (SELECT perfume_id FROM TB_PERFUME_GENDER_R WHERE gender = %s)"
-                )
-                params.append("Unisex")  # 여기서 값을 추가합니다.
-
-        if hard_filters.get("brand"):
-            where_clauses.append("m.perfume_brand ILIKE %s")
-            params.append(match_brand_name(hard_filters["brand"]))
-
-        hard_meta_map = {
-            "season": ("TB_PERFUME_SEASON_R", "season"),
-            "occasion": ("TB_PERFUME_OCA_R", "occasion"),
-            "accord": ("TB_PERFUME_ACCORD_R", "accord"),
-            "note": ("TB_PERFUME_NOTES_M", "note"),
-        }
-        for k, (t, c) in hard_meta_map.items():
-            if hard_filters.get(k):
-                where_clauses.append(
-                    f"m.perfume_id IN (SELECT perfume_id FROM {t} WHERE {c} ILIKE %s)"
-                )
-                params.append(hard_filters[k])
-
-        strategy_map = {
-            "accord": ("TB_PERFUME_ACCORD_R", "accord"),
-            "season": ("TB_PERFUME_SEASON_R", "season"),
-            "occasion": ("TB_PERFUME_OCA_R", "occasion"),
-            "note": ("TB_PERFUME_NOTES_M", "note"),
-        }
-        for k, vals in strategy_filters.items():
-            if not vals or k == "gender":
-                continue
-            mapping = strategy_map.get(k.lower())
-            if mapping:
-                t, c = mapping
-                clauses = [
-                    f"m.perfume_id IN (SELECT perfume_id FROM {t} WHERE {c} ILIKE %s)"
-                    for v in vals
-                ]
-                params.extend(vals)
-                where_clauses.append(f"({' OR '.join(clauses)})")
-
-        if where_clauses:
-            sql += " WHERE " + " AND ".join(where_clauses)
-        sql += f" LIMIT {limit}"
-        cur.execute(sql, params)
-        return [dict(row) for row in cur.fetchall()]
-    finally:
-        cur.close()
-        release_db_connection(conn)
+def search_perfumes(
+    hard_filters: Dict[str, Any],
+    strategy_filters: Dict[str, List[str]],
+    exclude_ids: List[int] = None,
+    limit: int = 20,
+) -> List[Dict[str, Any]]:
+    brand_name = match_brand_name(hard_filters["brand"]) if hard_filters.get("brand") else None
+    query = _build_search_query(hard_filters, strategy_filters, exclude_ids, limit, brand_name)
+    return _run_sync("perfume", [query], fetch="all", dict_rows=True)
+
+
+# [최적화] 비동기 검색 (이벤트 루프 블로킹 없이 DB 조회)
+async def search_perfumes_async(
+    hard_filters: Dict[str, Any],
+    strategy_filters: Dict[str, List[str]],
+    exclude_ids: List[int] = None,
+    limit: int = 20,
+) -> List[Dict[str, Any]]:
+    brand_name = None
+    if hard_filters.get("brand"):
+        brand_name = await match_brand_name_async(hard_filters["brand"])
+    query = _build_search_query(hard_filters, strategy_filters, exclude_ids, limit, brand_name)
+    return await _run_async("perfume", [query], fetch="all", dict_rows=True)
 
 
 # ==========================================
 # 3. 비동기 리랭킹 엔진
 # ==========================================
+async def _score_by_centroid(query_vector, candidate_ids) -> Optional[Dict[int, Any]]:
+    """centroid 테이블로 점수 계산 (후보당 벡터 연산 1회). 불가능하면 NumPy 인덱스, 그것도 없으면 None."""
+    global _centroid_sql_available
+    if _centroid_sql_available:
+        try:
+            placeholders = ",".join(["%s"] * len(candidate_ids))
+            rows = await _run_async(
+                "perfume",
+                [(
+                    CENTROID_SCORE_SQL.format(placeholders=placeholders),
+                    [to_pgvector_literal(query_vector)] + candidate_ids,
+                )],
+                fetch="all",
+                dict_rows=True,
+            )
+            return {row["perfume_id"]: row for row in rows}
+        except Exception as e:
+            if _is_missing_object_error(e):
+                _centroid_sql_available = False
+                print(f"⚠️ [Rerank] centroid SQL 사용 불가 -> NumPy fallback 전환: {e}")
+            else:
+                print(f"⚠️ [Rerank] centroid SQL 실패 -> 이번 요청만 NumPy fallback: {e}")
+    return centroid_index.score(query_vector, candidate_ids)
+
+
+async def _score_by_reviews_exact(query_vector, candidate_ids) -> Dict[int, Any]:
+    """기존 방식: 후보 향수의 모든 리뷰와 비교하여 최대 유사도 + 가장 가까운 리뷰를 사용합니다."""
+    placeholders = ",".join(["%s"] * len(candidate_ids))
+    sql = f"""
+        SELECT m.perfume_id, MAX(1 - (e.embedding <=> %s::vector)) as similarity_score,
+        (ARRAY_AGG(m.content ORDER BY (e.embedding <=> %s::vector) ASC))[1] as best_review
+        FROM TB_PERFUME_REVIEW_M m
+        JOIN TB_REVIEW_EMBEDDING_M e ON m.review_id = e.review_id
+        WHERE m.perfume_id IN ({placeholders})
+        GROUP BY m.perfume_id
+        ORDER BY similarity_score DESC
+    """
+    # pgvector 텍스트 리터럴은 psycopg2/psycopg3 모두에서 %s::vector로 캐스팅됩니다
+    vector_literal = to_pgvector_literal(query_vector)
+    rows = await _run_async(
+        "perfume",
+        [(sql, [vector_literal, vector_literal] + candidate_ids)],
+        fetch="all",
+        dict_rows=True,
+    )
+    return {row["perfume_id"]: row for row in rows}
+
+
+async def build_query_vector_async(query_text: str) -> List[float]:
+    """리랭킹용 쿼리 벡터 (감각 묘사 번역 -> 임베딩). 전략당 한 번만 계산해 재사용합니다."""
+    if not query_text:
+        return []
+    stylized_query = await stylize_query_async(query_text)
+    return await get_embedding_async(stylized_query)
+
+
 async def rerank_perfumes_async(
-    candidates: List[Dict[str, Any]], query_text: str, top_k: int = 5
+    candidates: List[Dict[str, Any]],
+    query_text: str,
+    top_k: int = 5,
+    query_vector: Optional[List[float]] = None,
 ) -> List[Dict[str, Any]]:
-    if not candidates or not query_text:
+    if not candidates or not (query_text or query_vector):
         return candidates[:top_k]
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-    try:
-        # [최적화] 비동기 번역 및 스타일링
-        system_prompt = "You are a Perfume Data Analyst. Transform the Korean logic into a sensory description..."
-        translation = await async_client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": query_text},
-            ],
-            temperature=0,
+
+    # [최적화] 미리 계산된 벡터가 있으면 번역/임베딩을 건너뛰고 유사도 쿼리만 실행
+    if not query_vector:
+        query_vector = await build_query_vector_async(query_text)
+    if not query_vector:
+        return candidates[:top_k]
+
+    candidate_ids = [p["id"] for p in candidates]
+    scores = None
+    if RERANK_MODE == "centroid":
+        scores = await _score_by_centroid(query_vector, candidate_ids)
+    if scores is None:
+        scores = await _score_by_reviews_exact(query_vector, candidate_ids)
+
+    reranked = []
+    for p in candidates:
+        sc = scores.get(
+            p["id"], {"similarity_score": 0, "best_review": "관련 리뷰 없음"}
         )
-        stylized_query = translation.choices[0].message.content.strip()
-        query_vector = await get_embedding_async(stylized_query)
-        if not query_vector:
-            return candidates[:top_k]
-
-        candidate_ids = [p["id"] for p in candidates]
-        placeholders = ",".join(["%s"] * len(candidate_ids))
-        sql = f"""
-            SELECT m.perfume_id, MAX(1 - (e.embedding <=> %s::vector)) as similarity_score,
-            (ARRAY_AGG(m.content ORDER BY (e.embedding <=> %s::vector) ASC))[1] as best_review
-            FROM TB_PERFUME_REVIEW_M m
-            JOIN TB_REVIEW_EMBEDDING_M e ON m.review_id = e.review_id
-            WHERE m.perfume_id IN ({placeholders})
-            GROUP BY m.perfume_id
-            ORDER BY similarity_score DESC
-        """
-        cur.execute(sql, [query_vector, query_vector] + candidate_ids)
-        scores = {row["perfume_id"]: row for row in cur.fetchall()}
-
-        reranked = []
-        for p in candidates:
-            sc = scores.get(
-                p["id"], {"similarity_score": 0, "best_review": "관련 리뷰 없음"}
-            )
-            p.update(
-                {
-                    "review_score": sc["similarity_score"],
-                    "best_review": sc["best_review"],
-                }
-            )
-            reranked.append(p)
-        reranked.sort(key=lambda x: x.get("review_score", 0), reverse=True)
-        return reranked[:top_k]
-    finally:
-        cur.close()
-        release_db_connection(conn)
+        p.update(
+            {
+                "review_score": sc["similarity_score"],
+                "best_review": sc["best_review"],
+            }
+        )
+        reranked.append(p)
+    reranked.sort(key=lambda x: x.get("review_score", 0), reverse=True)
+    return reranked[:top_k]
 
 
 # ==========================================
 # 4. 추천 로그 및 저장 (Connection Pool 적용)
 # ==========================================
+RECOM_LOG_SQL = "INSERT INTO TB_MEMBER_RECOM_RESULT_T (MEMBER_ID, PERFUME_ID, PERFUME_NAME, RECOM_TYPE, RECOM_REASON, INTEREST_YN) VALUES (%s, %s, %s, 'GENERAL', %s, 'N')"
+
+
+def _recommendation_log_statements(member_id, perfumes, reason):
+    return [
+        (RECOM_LOG_SQL, (member_id, p.get("id"), p.get("name"), reason))
+        for p in perfumes
+    ]
+
+
 def save_recommendation_log(
     member_id: int, perfumes: List[Dict[str, Any]], reason: str
 ):
     if not member_id or not perfumes:
         return
-    conn = get_recom_db_connection()
-    try:
-        cur = conn.cursor()
-        sql = "INSERT INTO TB_MEMBER_RECOM_RESULT_T (MEMBER_ID, PERFUME_ID, PERFUME_NAME, RECOM_TYPE, RECOM_REASON, INTEREST_YN) VALUES (%s, %s, %s, 'GENERAL', %s, 'N')"
-        for p in perfumes:
-            cur.execute(sql, (member_id, p.get("id"), p.get("name"), reason))
-        conn.commit()
-    finally:
-        cur.close()
-        release_recom_db_connection(conn)
+    _run_sync(
+        "recom",
+        _recommendation_log_statements(member_id, perfumes, reason),
+        commit=True,
+    )
+
+
+async def save_recommendation_log_async(
+    member_id: int, perfumes: List[Dict[str, Any]], reason: str
+):
+    if not member_id or not perfumes:
+        return
+    await _run_async(
+        "recom",
+        _recommendation_log_statements(member_id, perfumes, reason),
+        commit=True,
+    )
 
 
 def add_my_perfume(member_id: int, perfume_id: int, perfume_name: str):
@@ -389,17 +838,15 @@ def add_my_perfume(member_id: int, perfume_id: int, perfume_name: str):
 # ==========================================
 # 5. 채팅 시스템 (Connection Pool 적용)
 # ==========================================
-def save_chat_message(
-    thread_id: str, member_id: int, role: str, message: str, meta: dict = None
+def _chat_message_statements(
+    thread_id: str, member_id: int, role: str, message: str, meta: dict = None, created_at=None
 ):
-    conn = get_recom_db_connection()
-    try:
-        cur = conn.cursor()
-        title_snippet = message[:30] + "..." if len(message) > 30 else message
+    title_snippet = message[:30] + "..." if len(message) > 30 else message
+    return [
         # ================================================================
         # [수정] 스레드가 이미 존재할 때, 로그인한 사용자라면(member_id > 0) 소유권을 가져오도록 수정
         # ================================================================
-        cur.execute(
+        (
             """
             INSERT INTO TB_CHAT_THREAD_T (THREAD_ID, MEMBER_ID, TITLE, LAST_CHAT_DT) 
             VALUES (%s, %s, %s, CURRENT_TIMESTAMP)
@@ -416,117 +863,391 @@ def save_chat_message(
                 END
             """,
             (thread_id, member_id, title_snippet),
-        )
+        ),
         # ================================================================
         # [수정 종료]
         # ================================================================
-        cur.execute(
-            "INSERT INTO TB_CHAT_MESSAGE_T (THREAD_ID, MEMBER_ID, ROLE, MESSAGE, META_DATA) VALUES (%s, %s, %s, %s, %s)",
+        # [최적화] CREATED_DT를 메시지별로 명시 (배치 트랜잭션에서도 CURRENT_TIMESTAMP 하나로 묶이지 않도록)
+        # created_at이 없으면 clock_timestamp()로 문장 실행 시각을 기록
+        (
+            "INSERT INTO TB_CHAT_MESSAGE_T (THREAD_ID, MEMBER_ID, ROLE, MESSAGE, META_DATA, CREATED_DT) "
+            "VALUES (%s, %s, %s, %s, %s, COALESCE(%s::timestamptz, clock_timestamp()))",
             (
                 thread_id,
                 member_id,
                 role,
                 message,
                 json.dumps(meta, ensure_ascii=False) if meta else None,
+                created_at,
             ),
+        ),
+    ]
+
+
+def save_chat_message(
+    thread_id: str, member_id: int, role: str, message: str, meta: dict = None
+):
+    _run_sync(
+        "recom",
+        _chat_message_statements(thread_id, member_id, role, message, meta),
+        commit=True,
+    )
+
+
+async def save_chat_message_async(
+    thread_id: str, member_id: int, role: str, message: str, meta: dict = None
+):
+    await _run_async(
+        "recom",
+        _chat_message_statements(thread_id, member_id, role, message, meta),
+        commit=True,
+    )
+
+
+async def save_chat_messages_batch_async(entries) -> None:
+    """ChatLogWriter용: 여러 메시지를 한 트랜잭션으로 저장합니다 (입력 순서 유지)."""
+    statements = []
+    for e in entries:
+        statements.extend(
+            _chat_message_statements(
+                e.thread_id, e.member_id, e.role, e.message, e.meta, e.created_at
+            )
         )
-        conn.commit()
-    finally:
-        cur.close()
-        release_recom_db_connection(conn)
+    await _run_async("recom", statements, commit=True)
 
 
-def get_chat_history(thread_id: str) -> List[Dict[str, Any]]:
-    conn = get_recom_db_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
+# 프로세스 전역 writer (main.py stream_generator에서 사용, 종료 시 lifespan에서 flush)
+chat_log_writer = ChatLogWriter(save_chat_messages_batch_async)
+
+
+# [최적화] CREATED_DT가 같은 메시지의 정렬 보조 키: 컬럼명을 가정하지 않고 실제 PK 컬럼을 카탈로그에서 확인
+# (단일 컬럼 PK가 없거나 조회에 실패하면 CREATED_DT만으로 정렬)
+CHAT_MESSAGE_PK_SQL = """
+    SELECT a.attname
+    FROM pg_index i
+    JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = ANY(i.indkey)
+    WHERE i.indrelid = 'tb_chat_message_t'::regclass AND i.indisprimary
+"""
+_UNRESOLVED = object()
+_chat_message_pk: Any = _UNRESOLVED
+
+
+def _set_chat_message_pk(rows) -> Optional[str]:
+    global _chat_message_pk
+    # 복합 PK는 보조 키로 쓰지 않음
+    _chat_message_pk = '"' + rows[0][0].replace('"', '""') + '"' if len(rows) == 1 else None
+    print(f"✅ [DB] TB_CHAT_MESSAGE_T 정렬 보조 키: {_chat_message_pk or '없음 (CREATED_DT만 사용)'}")
+    return _chat_message_pk
+
+
+def get_chat_message_pk() -> Optional[str]:
+    if _chat_message_pk is not _UNRESOLVED:
+        return _chat_message_pk
     try:
-        cur.execute(
-            "SELECT ROLE as role, MESSAGE as text, META_DATA as metadata FROM TB_CHAT_MESSAGE_T WHERE THREAD_ID = %s ORDER BY CREATED_DT ASC",
-            (thread_id,),
+        return _set_chat_message_pk(_run_sync("recom", [(CHAT_MESSAGE_PK_SQL, None)], fetch="all"))
+    except Exception as e:
+        # 실패는 캐시하지 않고 다음 조회에서 다시 확인
+        print(f"⚠️ [DB] 채팅 메시지 PK 조회 실패: {e}")
+        return None
+
+
+async def get_chat_message_pk_async() -> Optional[str]:
+    if _chat_message_pk is not _UNRESOLVED:
+        return _chat_message_pk
+    try:
+        return _set_chat_message_pk(
+            await _run_async("recom", [(CHAT_MESSAGE_PK_SQL, None)], fetch="all")
         )
-        return [dict(row) for row in cur.fetchall()]
-    finally:
-        cur.close()
-        release_recom_db_connection(conn)
+    except Exception as e:
+        print(f"⚠️ [DB] 채팅 메시지 PK 조회 실패: {e}")
+        return None
+
+
+def _message_order(sql: str, pk: Optional[str], **extra: str) -> str:
+    """{key_column}/{key_asc}/{key_desc} 자리에 PK 보조 정렬을 채웁니다 (PK가 없으면 빈 문자열)."""
+    return sql.format(
+        key_column=f", {pk}" if pk else "",
+        key_asc=f", {pk} ASC" if pk else "",
+        key_desc=f", {pk} DESC" if pk else "",
+        **extra,
+    )
+
+
+CHAT_HISTORY_SQL = "SELECT ROLE as role, MESSAGE as text, META_DATA as metadata FROM TB_CHAT_MESSAGE_T WHERE THREAD_ID = %s ORDER BY CREATED_DT ASC{key_asc}"
+CHAT_LIST_SQL = "SELECT THREAD_ID as thread_id, TITLE as title, LAST_CHAT_DT as last_chat_dt FROM TB_CHAT_THREAD_T WHERE MEMBER_ID = %s AND IS_DELETED = 'N' ORDER BY LAST_CHAT_DT DESC LIMIT 30"
+
+
+def get_chat_history(thread_id: str) -> List[Dict[str, Any]]:
+    sql = _message_order(CHAT_HISTORY_SQL, get_chat_message_pk())
+    return _run_sync("recom", [(sql, (thread_id,))], fetch="all", dict_rows=True)
+
+
+async def get_chat_history_async(thread_id: str) -> List[Dict[str, Any]]:
+    sql = _message_order(CHAT_HISTORY_SQL, await get_chat_message_pk_async())
+    return await _run_async("recom", [(sql, (thread_id,))], fetch="all", dict_rows=True)
+
+
+# [최적화] 최근 N개만 조회 (CREATED_DT 역순 LIMIT 후 다시 오래된 순으로 정렬)
+RECENT_CHAT_HISTORY_SQL = """
+    SELECT role, text, metadata FROM (
+        SELECT ROLE as role, MESSAGE as text, META_DATA as metadata, CREATED_DT{key_column}
+        FROM TB_CHAT_MESSAGE_T
+        WHERE THREAD_ID = %s
+        ORDER BY CREATED_DT DESC{key_desc}
+        LIMIT %s
+    ) recent
+    ORDER BY CREATED_DT ASC{key_asc}
+"""
+
+
+async def get_recent_chat_history_async(thread_id: str, limit: int) -> List[Dict[str, Any]]:
+    sql = _message_order(RECENT_CHAT_HISTORY_SQL, await get_chat_message_pk_async())
+    return await _run_async(
+        "recom",
+        [(sql, (thread_id, limit))],
+        fetch="all",
+        dict_rows=True,
+    )
+
+
+# 프로세스 전역 히스토리 캐시 (main.py stream_generator에서 사용)
+chat_history_cache = ChatHistoryCache(get_recent_chat_history_async)
+
+
+def _format_chat_list(rows) -> List[Dict[str, Any]]:
+    results = []
+    for r in rows:
+        res = dict(r)
+        if res["last_chat_dt"]:
+            res["last_chat_dt"] = res["last_chat_dt"].isoformat()
+        results.append(res)
+    return results
+
+
+# [최적화] Keyset 페이지네이션 (OFFSET 없이 마지막 행의 정렬 키 다음부터 조회)
+# - 방 목록: (LAST_CHAT_DT, THREAD_ID) 내림차순
+# - 메시지: (CREATED_DT, PK) 내림차순으로 읽고 페이지 안에서는 오래된 순으로 반환
+#   (PK는 get_chat_message_pk로 확인한 실제 컬럼, 단일 컬럼 PK가 없으면 CREATED_DT만 사용)
+CHAT_ROOMS_PAGE_SQL = """
+    SELECT THREAD_ID as thread_id, TITLE as title, LAST_CHAT_DT as last_chat_dt
+    FROM TB_CHAT_THREAD_T
+    WHERE MEMBER_ID = %s AND IS_DELETED = 'N' {keyset}
+    ORDER BY LAST_CHAT_DT DESC, THREAD_ID DESC
+    LIMIT %s
+"""
+CHAT_ROOMS_KEYSET = "AND (LAST_CHAT_DT, THREAD_ID) < (%s, %s)"
+
+CHAT_MESSAGES_PAGE_SQL = """
+    SELECT {id_column} as id, ROLE as role, MESSAGE as text, META_DATA as metadata, CREATED_DT as created_dt
+    FROM TB_CHAT_MESSAGE_T
+    WHERE THREAD_ID = %s {keyset}
+    ORDER BY CREATED_DT DESC{key_desc}
+    LIMIT %s
+"""
+CHAT_MESSAGES_KEYSET = "AND (CREATED_DT, {pk}) < (%s, %s)"
+CHAT_MESSAGES_KEYSET_NO_PK = "AND CREATED_DT < %s"
+# 커서만 주고 limit을 생략한 경우의 메시지 페이지 크기
+CHAT_HISTORY_PAGE_SIZE = 100
+
+# 위 쿼리의 정렬 순서와 동일한 복합 인덱스 ({key_desc}는 _message_order로 실제 PK를 채움)
+# 운영 테이블에 쓰기 잠금이 걸리지 않도록 CONCURRENTLY로 생성하며, 앱 시작 시가 아니라
+# 배포 전 scripts/create_chat_indexes.py로 한 번 실행합니다 (트랜잭션 밖, autocommit 필요).
+CHAT_INDEX_DDL = [
+    """
+    CREATE INDEX CONCURRENTLY IF NOT EXISTS IX_CHAT_THREAD_MEMBER_LAST_CHAT
+    ON TB_CHAT_THREAD_T (MEMBER_ID, LAST_CHAT_DT DESC, THREAD_ID DESC)
+    WHERE IS_DELETED = 'N'
+    """,
+    """
+    CREATE INDEX CONCURRENTLY IF NOT EXISTS IX_CHAT_MESSAGE_THREAD_CREATED
+    ON TB_CHAT_MESSAGE_T (THREAD_ID, CREATED_DT DESC{key_desc})
+    """,
+]
+
+
+def get_chat_index_ddl() -> List[str]:
+    """CHAT_INDEX_DDL에 실제 PK 보조 키를 채운 DDL 목록 (PK가 없으면 (THREAD_ID, CREATED_DT)만)."""
+    pk = get_chat_message_pk()
+    return [_message_order(ddl, pk) for ddl in CHAT_INDEX_DDL]
+
+
+def _keyset_page(rows, limit: int, sort_key: str, id_key: str):
+    """LIMIT+1로 읽은 행에서 다음 페이지 존재 여부와 커서 키를 계산합니다."""
+    has_more = len(rows) > limit
+    rows = [dict(r) for r in rows[:limit]]
+    next_key = (rows[-1][sort_key], rows[-1][id_key]) if has_more and rows else None
+    return rows, next_key
+
+
+async def get_user_chat_rooms_page_async(
+    member_id: int, limit: int = 30, after: Optional[tuple] = None
+) -> Dict[str, Any]:
+    """
+    방 목록 한 페이지.
+
+    Args:
+        after: 이전 페이지의 next_key (last_chat_dt, thread_id)
+    Returns:
+        {"rooms": [...], "next_key": (datetime, thread_id) | None, "last_modified": datetime | None}
+    """
+    if not member_id:
+        return {"rooms": [], "next_key": None, "last_modified": None}
+    params: List[Any] = [member_id]
+    keyset = ""
+    if after is not None:
+        keyset = CHAT_ROOMS_KEYSET
+        params.extend(after)
+    params.append(limit + 1)
+    rows = await _run_async(
+        "recom",
+        [(CHAT_ROOMS_PAGE_SQL.format(keyset=keyset), tuple(params))],
+        fetch="all",
+        dict_rows=True,
+    )
+    rooms, next_key = _keyset_page(rows, limit, "last_chat_dt", "thread_id")
+    last_modified = rooms[0]["last_chat_dt"] if rooms else None
+    return {
+        "rooms": _format_chat_list(rooms),
+        "next_key": next_key,
+        "last_modified": last_modified,
+    }
+
+
+async def get_chat_history_page_async(
+    thread_id: str, limit: int = CHAT_HISTORY_PAGE_SIZE, before: Optional[tuple] = None
+) -> Dict[str, Any]:
+    """
+    대화 기록 한 페이지 (커서 없으면 최신 페이지, 페이지 안에서는 오래된 순).
+
+    Args:
+        before: 이전 페이지의 next_key (created_dt, pk) - 이보다 오래된 메시지를 조회
+    Returns:
+        {"messages": [...], "next_key": (datetime, pk | None) | None, "last_modified": datetime | None}
+    """
+    pk = await get_chat_message_pk_async()
+    params: List[Any] = [thread_id]
+    keyset = ""
+    if before is not None:
+        if pk:
+            keyset = CHAT_MESSAGES_KEYSET.format(pk=pk)
+            params.extend(before)
+        else:
+            keyset = CHAT_MESSAGES_KEYSET_NO_PK
+            params.append(before[0])
+    params.append(limit + 1)
+    sql = _message_order(CHAT_MESSAGES_PAGE_SQL, pk, id_column=pk or "NULL", keyset=keyset)
+    rows = await _run_async(
+        "recom",
+        [(sql, tuple(params))],
+        fetch="all",
+        dict_rows=True,
+    )
+    messages, next_key = _keyset_page(rows, limit, "created_dt", "id")
+    last_modified = messages[0]["created_dt"] if messages else None
+    messages.reverse()
+    for m in messages:
+        if m["created_dt"]:
+            m["created_dt"] = m["created_dt"].isoformat()
+    return {"messages": messages, "next_key": next_key, "last_modified": last_modified}
 
 
 def get_user_chat_list(member_id: int) -> List[Dict[str, Any]]:
     if not member_id:
         return []
-    conn = get_recom_db_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-    try:
-        cur.execute(
-            "SELECT THREAD_ID as thread_id, TITLE as title, LAST_CHAT_DT as last_chat_dt FROM TB_CHAT_THREAD_T WHERE MEMBER_ID = %s AND IS_DELETED = 'N' ORDER BY LAST_CHAT_DT DESC LIMIT 30",
-            (member_id,),
-        )
-        rows = cur.fetchall()
-        results = []
-        for r in rows:
-            res = dict(r)
-            if res["last_chat_dt"]:
-                res["last_chat_dt"] = res["last_chat_dt"].isoformat()
-            results.append(res)
-        return results
-    finally:
-        cur.close()
-        release_recom_db_connection(conn)
+    rows = _run_sync(
+        "recom", [(CHAT_LIST_SQL, (member_id,))], fetch="all", dict_rows=True
+    )
+    return _format_chat_list(rows)
 
 
-def lookup_note_by_string(keyword: str) -> List[str]:
-    """사용자 입력 텍스트와 일치하거나 유사한 노트를 DB에서 찾습니다."""
-    conn = get_db_connection()
-    cur = conn.cursor()
-    keyword_clean = keyword.strip().lower()
-    found_notes = set()
+async def get_user_chat_list_async(member_id: int) -> List[Dict[str, Any]]:
+    if not member_id:
+        return []
+    rows = await _run_async(
+        "recom", [(CHAT_LIST_SQL, (member_id,))], fetch="all", dict_rows=True
+    )
+    return _format_chat_list(rows)
+
 
+def lookup_note_by_string(keyword: str) -> List[str]:
+    """사용자 입력 텍스트와 일치하거나 유사한 노트를 인메모리 노트 사전에서 찾습니다."""
     try:
-        # 1. 완전 일치 확인
-        cur.execute(
-            "SELECT note FROM TB_PERFUME_NOTES_M WHERE LOWER(note) = %s LIMIT 1",
-            (keyword_clean,),
-        )
-        row = cur.fetchone()
-        if row:
-            return [row[0]]
-
-        # 2. 유사도 기반 검색 (Levenshtein distance)
-        cur.execute("SELECT DISTINCT note FROM TB_PERFUME_NOTES_M")
-        all_notes = [r[0] for r in cur.fetchall() if r[0]]
-
-        for db_note in all_notes:
-            if len(keyword_clean) < 3:
-                if keyword_clean == db_note.lower():
-                    found_notes.add(db_note)
-                continue
-            if distance(keyword_clean, db_note.lower()) <= 2:
-                found_notes.add(db_note)
-
-        return list(found_notes)
+        return note_dictionary.lookup(keyword)
     except Exception as e:
         print(f"⚠️ Lookup String Note Error: {e}")
         return []
-    finally:
-        cur.close()
-        release_db_connection(conn)
 
 
-def lookup_note_by_vector(keyword: str) -> List[str]:
-    """벡터 검색을 통해 유사한 노트 후보군을 찾습니다."""
-    # 비동기가 아닌 동기식 도구에서 호출되므로 동기 방식으로 구현
-    conn = get_db_connection()
-    cur = conn.cursor()
+async def lookup_note_by_string_async(keyword: str) -> List[str]:
+    """최초 적재만 스레드에서 수행하고, 이후 조회는 DB 없이 이벤트 루프에서 바로 처리합니다."""
+    await catalog_vocab.get_async()
+    return lookup_note_by_string(keyword)
+
+
+# [최적화] 키워드 여러 개를 한 번의 pgvector 쿼리로 조회 (키워드별 top-k, LATERAL 조인)
+NOTE_VECTOR_BATCH_SQL = """
+    SELECT q.idx, n.note
+    FROM unnest(%s::text[]) WITH ORDINALITY AS q(vec, idx)
+    CROSS JOIN LATERAL (
+        SELECT note, embedding <=> q.vec::vector AS dist
+        FROM TB_NOTE_EMBEDDING_M
+        ORDER BY dist
+        LIMIT %s
+    ) n
+    ORDER BY q.idx, n.dist
+"""
+
+
+def _group_note_rows(keywords: List[str], rows) -> Dict[str, List[str]]:
+    results: Dict[str, List[str]] = {k: [] for k in keywords}
+    for idx, note in rows:
+        results[keywords[idx - 1]].append(note)
+    return results
+
+
+def lookup_note_by_vector(keyword: str, top_k: int = 10) -> List[str]:
+    """벡터 검색을 통해 유사한 노트 후보군을 찾습니다. (동기 버전, 라우터/스크립트용)"""
     try:
-        # get_embedding은 동기 함수 사용
         query_vector = get_embedding(keyword)
         if not query_vector:
             return []
-        sql = "SELECT note FROM TB_NOTE_EMBEDDING_M ORDER BY embedding <=> %s::vector LIMIT 10"
-        cur.execute(sql, (query_vector,))
-        return [r[0] for r in cur.fetchall()]
+        rows = _run_sync(
+            "perfume",
+            [(NOTE_VECTOR_BATCH_SQL, ([to_pgvector_literal(query_vector)], top_k))],
+            fetch="all",
+        )
+        return [note for _idx, note in rows]
     except Exception as e:
         print(f"⚠️ Lookup Vector Note Error: {e}")
         return []
-    finally:
-        cur.close()
-        release_db_connection(conn)
\ No newline at end of file
+
+
+async def lookup_notes_by_vector_async(
+    keywords: List[str], top_k: int = 10
+) -> Dict[str, List[str]]:
+    """
+    여러 키워드의 노트 후보를 한 번에 찾습니다.
+    임베딩 요청 1회(캐시 미스분만) + pgvector 쿼리 1회로 {keyword: [note, ...]}를 반환합니다.
+    """
+    unique = list(dict.fromkeys(k.strip() for k in keywords if k and k.strip()))
+    if not unique:
+        return {}
+    try:
+        vectors = await get_embeddings_async(unique)
+        searchable = [(k, v) for k, v in zip(unique, vectors) if v]
+        results: Dict[str, List[str]] = {k: [] for k in unique}
+        if not searchable:
+            return results
+        rows = await _run_async(
+            "perfume",
+            [(
+                NOTE_VECTOR_BATCH_SQL,
+                ([to_pgvector_literal(v) for _, v in searchable], top_k),
+            )],
+            fetch="all",
+        )
+        results.update(_group_note_rows([k for k, _ in searchable], rows))
+        return results
+    except Exception as e:
+        print(f"⚠️ Lookup Vector Note Batch Error: {e}")
+        return {k: [] for k in unique}
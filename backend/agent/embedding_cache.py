@@ -0,0 +1,174 @@
+# backend/agent/embedding_cache.py
+"""
+Two-tier cache for embeddings and other deterministic LLM outputs.
+
+Tier 1: in-process LRU (cache_utils.LRUCache)
+Tier 2: local SQLite file shared across restarts (and workers on the same host)
+
+Keys are (namespace, normalized text), where the namespace carries the model
+name, e.g. "embedding:text-embedding-3-small" or "stylize:gpt-4o-mini:v1".
+Concurrent identical requests are collapsed with AsyncSingleFlight.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional
+
+from .cache_utils import AsyncSingleFlight, LRUCache
+from .tracing import record_cache_lookup
+
+EMBEDDING_CACHE_PATH = os.getenv(
+    "EMBEDDING_CACHE_PATH", os.path.join(os.getcwd(), ".cache", "embedding_cache.sqlite3")
+)
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "4096"))
+
+
+def normalize_text(text: str) -> str:
+    """Unicode(NFKC) 정규화 + 공백 압축. 의미가 같은 입력이 같은 키를 갖도록 합니다."""
+    if not text:
+        return ""
+    return " ".join(unicodedata.normalize("NFKC", text).split())
+
+
+def make_key(namespace: str, text: str) -> str:
+    raw = f"{namespace}\x00{normalize_text(text)}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    LRU + SQLite cache for JSON-serializable values (vectors, translated text).
+
+    Args:
+        path: SQLite file path. Empty/None disables the persistent tier.
+        maxsize: Number of entries kept in the in-process LRU
+    """
+
+    def __init__(self, path: Optional[str] = EMBEDDING_CACHE_PATH, maxsize: int = EMBEDDING_CACHE_SIZE):
+        self.memory = LRUCache(maxsize=maxsize)
+        self._singleflight = AsyncSingleFlight()
+        self._db_lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self.path = path
+        if path:
+            self._open(path)
+
+    def _open(self, path: str) -> None:
+        try:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(path, check_same_thread=False, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS embedding_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    namespace TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+                """
+            )
+            conn.commit()
+            self._db = conn
+        except Exception as e:
+            print(f"⚠️ [EmbeddingCache] 영구 캐시 비활성화 ({path}): {e}")
+            self._db = None
+
+    # ---------- 조회/저장 ----------
+    def get(self, namespace: str, text: str) -> Optional[Any]:
+        value = self._lookup(namespace, text)
+        # namespace "embedding:<model>" → cache 라벨 "embedding"
+        record_cache_lookup(namespace.split(":", 1)[0], value is not None)
+        return value
+
+    def _lookup(self, namespace: str, text: str) -> Optional[Any]:
+        key = make_key(namespace, text)
+        value = self.memory.get(key)
+        if value is not None:
+            return value
+        if self._db is None:
+            return None
+        try:
+            with self._db_lock:
+                row = self._db.execute(
+                    "SELECT value FROM embedding_cache WHERE cache_key = ?", (key,)
+                ).fetchone()
+        except Exception as e:
+            print(f"⚠️ [EmbeddingCache] 조회 실패: {e}")
+            return None
+        if not row:
+            return None
+        value = json.loads(row[0])
+        self.memory.set(key, value)
+        return value
+
+    def set(self, namespace: str, text: str, value: Any) -> None:
+        if not value:
+            # 실패 결과([] / "")는 캐시하지 않음
+            return
+        key = make_key(namespace, text)
+        self.memory.set(key, value)
+        if self._db is None:
+            return
+        try:
+            with self._db_lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO embedding_cache (cache_key, namespace, value, created_at) VALUES (?, ?, ?, ?)",
+                    (key, namespace, json.dumps(value, ensure_ascii=False), time.time()),
+                )
+                self._db.commit()
+        except Exception as e:
+            print(f"⚠️ [EmbeddingCache] 저장 실패: {e}")
+
+    def get_many(self, namespace: str, texts: Iterable[str]) -> Dict[str, Any]:
+        """texts 중 캐시에 있는 항목만 {text: value}로 반환합니다."""
+        found = {}
+        for text in texts:
+            value = self.get(namespace, text)
+            if value is not None:
+                found[text] = value
+        return found
+
+    # ---------- 계산 + 캐시 ----------
+    async def get_or_compute(
+        self, namespace: str, text: str, compute: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """캐시 미스 시 compute()를 실행하고 결과를 저장합니다. 동일 요청은 1회만 실행됩니다."""
+        cached = self.get(namespace, text)
+        if cached is not None:
+            return cached
+
+        async def _load():
+            value = await compute()
+            self.set(namespace, text, value)
+            return value
+
+        return await self._singleflight.do(make_key(namespace, text), _load)
+
+    def get_or_compute_sync(
+        self, namespace: str, text: str, compute: Callable[[], Any]
+    ) -> Any:
+        cached = self.get(namespace, text)
+        if cached is not None:
+            return cached
+        value = compute()
+        self.set(namespace, text, value)
+        return value
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "memory_entries": len(self.memory),
+            "memory_hits": self.memory.hits,
+            "memory_misses": self.memory.misses,
+            "inflight": len(self._singleflight),
+        }
+
+
+# 프로세스 전역 캐시 (database.py 등에서 공유)
+embedding_cache = EmbeddingCache()
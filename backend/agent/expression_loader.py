@@ -4,12 +4,28 @@ CSV-based Expression Dictionary Loader
 
 Loads accord and note descriptions from CSV files and provides
 case-insensitive lookup methods.
+
+The per-perfume expression guide used by the recommendation writer is cached
+(keyed by perfume and dictionary version); the CSV files are re-read only when
+their mtime/size changes.
 """
 
 import csv
 import os
+import threading
+import time
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, Optional, Tuple
+
+from .cache_utils import LRUCache
+from .tracing import record_cache_lookup
+
+# CSV 변경 여부(mtime/size)를 확인하는 최소 간격 (초)
+EXPRESSION_DICT_CHECK_INTERVAL = float(os.getenv("EXPRESSION_DICT_CHECK_INTERVAL", "30"))
+EXPRESSION_GUIDE_CACHE_SIZE = int(os.getenv("EXPRESSION_GUIDE_CACHE_SIZE", "4096"))
+# 향수 1개당 가이드에 넣는 노트/어코드 수 (프롬프트 비대화 방지)
+GUIDE_NOTE_LIMIT = 10
+GUIDE_ACCORD_LIMIT = 10
 
 
 class ExpressionLoader:
@@ -34,24 +50,60 @@ class ExpressionLoader:
             
         self.accord_dict: Dict[str, str] = {}
         self.note_dict: Dict[str, str] = {}
+        self.version = 0
+        self._guide_cache = LRUCache(maxsize=EXPRESSION_GUIDE_CACHE_SIZE)
+        self._reload_lock = threading.Lock()
+        self._last_check = 0.0
         
         # Docker-compatible path resolution: use PROJECT_ROOT env var, fallback to /app/
         # In Docker: PROJECT_ROOT not set → uses /app/ → CSV files at /app/*.csv
         # In local dev: Can set PROJECT_ROOT=/path/to/project if needed
         project_root = Path(os.getenv('PROJECT_ROOT', '/app/'))
+        self.accord_path = project_root / "accord_desc_dictionary.csv"
+        self.note_path = project_root / "note_desc_dictionary.csv"
         
-        # Load accord dictionary
-        accord_path = project_root / "accord_desc_dictionary.csv"
-        self._load_accord_dict(accord_path)
-        
-        # Load note dictionary
-        note_path = project_root / "note_desc_dictionary.csv"
-        self._load_note_dict(note_path)
+        self._file_stamps = self._stat_files()
+        self._load_all()
         
         self._initialized = True
     
-    def _load_accord_dict(self, path: Path):
+    def _stat_files(self) -> Tuple:
+        stamps = []
+        for path in (self.accord_path, self.note_path):
+            try:
+                st = path.stat()
+                stamps.append((st.st_mtime_ns, st.st_size))
+            except OSError:
+                stamps.append(None)
+        return tuple(stamps)
+    
+    def _load_all(self):
+        # 새 dict를 다 만든 뒤 교체하므로 조회 중인 요청이 빈 사전을 보지 않음
+        self.accord_dict = self._load_accord_dict(self.accord_path)
+        self.note_dict = self._load_note_dict(self.note_path)
+        self.version += 1
+    
+    def refresh_if_changed(self) -> bool:
+        """CSV가 바뀌었으면 다시 읽고 True를 반환합니다 (stat 확인은 CHECK_INTERVAL마다 1회)."""
+        now = time.monotonic()
+        if now - self._last_check < EXPRESSION_DICT_CHECK_INTERVAL:
+            return False
+        with self._reload_lock:
+            if now - self._last_check < EXPRESSION_DICT_CHECK_INTERVAL:
+                return False
+            self._last_check = now
+            stamps = self._stat_files()
+            if stamps == self._file_stamps:
+                return False
+            self._file_stamps = stamps
+            self._load_all()
+            self._guide_cache.clear()
+            print(f"🔄 [ExpressionLoader] 표현 사전 변경 감지 -> v{self.version} 재적재")
+            return True
+    
+    def _load_accord_dict(self, path: Path) -> Dict[str, str]:
         """Load accord descriptions from CSV."""
+        accord_dict: Dict[str, str] = {}
         try:
             # Try utf-8-sig first (handles BOM)
             with open(path, 'r', encoding='utf-8-sig') as f:
@@ -66,7 +118,7 @@ class ExpressionLoader:
                         # Combine all descriptions
                         combined = f"{desc1}, {desc2}, {desc3}"
                         # Store with normalized key (lowercase)
-                        self.accord_dict[accord.lower()] = combined
+                        accord_dict[accord.lower()] = combined
         except UnicodeDecodeError:
             # Fallback to cp949 for Korean compatibility
             try:
@@ -80,16 +132,18 @@ class ExpressionLoader:
                         
                         if accord:
                             combined = f"{desc1}, {desc2}, {desc3}"
-                            self.accord_dict[accord.lower()] = combined
+                            accord_dict[accord.lower()] = combined
             except Exception as e:
                 print(f"⚠️ [ExpressionLoader] Failed to load accord dictionary: {e}")
         except FileNotFoundError:
             print(f"⚠️ [ExpressionLoader] Accord dictionary not found: {path}")
         except Exception as e:
             print(f"⚠️ [ExpressionLoader] Error loading accord dictionary: {e}")
+        return accord_dict
     
-    def _load_note_dict(self, path: Path):
+    def _load_note_dict(self, path: Path) -> Dict[str, str]:
         """Load note descriptions from CSV."""
+        note_dict: Dict[str, str] = {}
         try:
             # Try utf-8-sig first
             with open(path, 'r', encoding='utf-8-sig') as f:
@@ -101,7 +155,7 @@ class ExpressionLoader:
                     
                     if note and desc:
                         # Store with normalized key (lowercase)
-                        self.note_dict[note.lower()] = desc
+                        note_dict[note.lower()] = desc
         except UnicodeDecodeError:
             # Fallback to cp949
             try:
@@ -112,13 +166,14 @@ class ExpressionLoader:
                         desc = row.get('한글 설명', '').strip()
                         
                         if note and desc:
-                            self.note_dict[note.lower()] = desc
+                            note_dict[note.lower()] = desc
             except Exception as e:
                 print(f"⚠️ [ExpressionLoader] Failed to load note dictionary: {e}")
         except FileNotFoundError:
             print(f"⚠️ [ExpressionLoader] Note dictionary not found: {path}")
         except Exception as e:
             print(f"⚠️ [ExpressionLoader] Error loading note dictionary: {e}")
+        return note_dict
     
     def get_accord_desc(self, name: str) -> str:
         """
@@ -151,6 +206,66 @@ class ExpressionLoader:
         
         normalized = name.strip().lower()
         return self.note_dict.get(normalized, "")
+    
+    def _build_perfume_guide(self, notes: Dict[str, str], accord_str: str) -> str:
+        # Collect all notes
+        all_notes = []
+        for note_type in ["top", "middle", "base"]:
+            note_str = notes.get(note_type, "")
+            if note_str and note_str != "N/A":
+                all_notes.extend([n.strip() for n in note_str.split(",")])
+        
+        # Extract accords (before [Best Review])
+        accords = []
+        if accord_str:
+            accord_part = accord_str.split("[Best Review]")[0].strip()
+            accords = [a.strip() for a in accord_part.split(",") if a.strip()]
+        
+        expression_guide = []
+        if all_notes:
+            expression_guide.append("### 노트 표현 가이드")
+            for note in all_notes[:GUIDE_NOTE_LIMIT]:
+                desc = self.get_note_desc(note)
+                if desc:
+                    expression_guide.append(f"- {note}: {desc}")
+        
+        if accords:
+            expression_guide.append("\n### 어코드 표현 가이드")
+            for accord in accords[:GUIDE_ACCORD_LIMIT]:
+                desc = self.get_accord_desc(accord)
+                if desc:
+                    expression_guide.append(f"- {accord}: {desc}")
+        
+        return "\n".join(expression_guide) if expression_guide else ""
+    
+    def get_perfume_guide(self, perfume: dict) -> str:
+        """
+        Get the formatted note/accord expression guide for a perfume (cached).
+        
+        Args:
+            perfume: PerfumeDetail dict ("id", "notes": {"top", "middle", "base"}, "accord")
+        
+        Returns:
+            Guide text for the writer prompt (identical for the same perfume and dictionary version)
+        """
+        self.refresh_if_changed()
+        notes = perfume.get("notes") or {}
+        accord_str = perfume.get("accord") or ""
+        # 정렬용 문자열까지 키에 포함해 같은 ID라도 데이터가 바뀌면 새로 만듦
+        key = (
+            self.version,
+            perfume.get("id"),
+            notes.get("top", ""),
+            notes.get("middle", ""),
+            notes.get("base", ""),
+            accord_str.split("[Best Review]")[0],
+        )
+        guide = self._guide_cache.get(key)
+        record_cache_lookup("expression_guide", guide is not None)
+        if guide is None:
+            guide = self._build_perfume_guide(notes, accord_str)
+            self._guide_cache.set(key, guide)
+        return guide
 
 
 # Create singleton instance at module import
@@ -3,15 +3,17 @@ import os
 import json
 import asyncio
 import itertools
+import random
 from typing import Literal, List, Dict, Any, Optional
 
 from dotenv import load_dotenv
 from langchain_openai import ChatOpenAI
+from langchain_core.callbacks.manager import adispatch_custom_event
 from langchain_core.messages import SystemMessage, AIMessage, HumanMessage
 from langgraph.graph import StateGraph, START, END
-from langgraph.checkpoint.memory import MemorySaver
 
 # [Import] 로컬 모듈
+from .checkpointer import create_checkpointer
 from .schemas import (
     AgentState,
     UserPreferences,
@@ -29,7 +31,7 @@ from .schemas import (
 from .expression_loader import ExpressionLoader
 
 from .tools import (
-    advanced_perfume_search_tool,
+    advanced_perfume_search_async,
     lookup_note_by_string_tool,
     lookup_note_by_vector_tool,
 )
@@ -45,8 +47,21 @@ from .prompts import (
     WRITER_RECOMMENDATION_PROMPT_SINGLE,
     WRITER_RECOMMENDATION_PROMPT_EXPERT_SINGLE,
     NOTE_SELECTION_PROMPT,
+    WRITER_SECTION_OUTPUT_RULE,
+    RESEARCHER_TASK_INSTRUCTION,
+    RESEARCHER_COMBINED_TASK_INSTRUCTION,
 )
-from .database import save_recommendation_log
+from .prompt_layout import layout_messages, prompt_cache_stats
+from .chat_history import window_messages
+from .cancellation import cancellation_stats
+from .database import (
+    save_recommendation_log_async,
+    build_query_vector_async,
+    find_brand_mentions_async,
+    get_embeddings_async,
+)
+from .intent_router import IntentRouter
+from .strategy_plan_cache import StrategyPlanCache, prompt_version
 
 # [정보 검색 전용 서브 그래프 임포트]
 from .graph_info import info_graph
@@ -58,9 +73,41 @@ load_dotenv()
 # ==========================================
 FAST_LLM = ChatOpenAI(model="gpt-4.1-mini", temperature=0, streaming=True)
 SMART_LLM = ChatOpenAI(model="gpt-4.1", temperature=0, streaming=True)
-SUPER_SMART_LLM = ChatOpenAI(model="gpt-5.2", temperature=0, streaming=True)
-# Non-streaming version for parallel_reco to prevent token interleaving
-SUPER_SMART_LLM_NO_STREAM = ChatOpenAI(model="gpt-5.2", temperature=0, streaming=False)
+# Supervisor/Interviewer 전용: 재시도는 ainvoke_with_retry 한 곳에서만 처리 (클라이언트 내부 재시도 끔)
+# -> 최악의 시도 횟수 = ROUTER_LLM_RETRIES + 1, 시도마다 ROUTER_LLM_TIMEOUT
+ROUTER_CALL_LLM = ChatOpenAI(model="gpt-4.1", temperature=0, streaming=True, max_retries=0)
+# stream_usage: 스트리밍 마지막 청크에 usage(캐시 적중 토큰 포함)를 받아 prompt_cache_stats에 기록
+SUPER_SMART_LLM = ChatOpenAI(model="gpt-5.2", temperature=0, streaming=True, stream_usage=True)
+
+# [최적화] 완화 검색(Relaxation) 실행 모드
+# - sequential: 기존 방식 (조합을 하나씩 순차 실행)
+# - level: 같은 완화 레벨의 조합을 동시에 실행 (레벨 간에는 순차)
+# - all: 모든 레벨의 조합을 한 번에 동시 실행
+RELAXATION_MODES = ("sequential", "level", "all")
+RELAXATION_MODE = os.getenv("RECO_RELAXATION_MODE", "level").strip().lower()
+if RELAXATION_MODE not in RELAXATION_MODES:
+    print(
+        f"⚠️ [Config] 알 수 없는 RECO_RELAXATION_MODE='{RELAXATION_MODE}' -> 'level' 사용 "
+        f"(가능한 값: {', '.join(RELAXATION_MODES)})",
+        flush=True,
+    )
+    RELAXATION_MODE = "level"
+RELAXATION_CONCURRENCY = max(1, int(os.getenv("RECO_RELAXATION_CONCURRENCY", "4")))
+
+# [최적화] Supervisor/Interviewer 구조화 출력 호출의 시간 제한과 재시도
+ROUTER_LLM_TIMEOUT = float(os.getenv("ROUTER_LLM_TIMEOUT", "20"))
+ROUTER_LLM_RETRIES = max(0, int(os.getenv("ROUTER_LLM_RETRIES", "2")))
+ROUTER_LLM_BACKOFF = 0.5
+
+# parallel_reco 섹션 스트림 이벤트 이름 (main.py가 on_custom_event로 받아 클라이언트에 전달)
+RECO_STREAM_EVENT = "reco_section_chunk"
+RECO_SECTION_PRIORITIES = (1, 2, 3)
+RECO_STRATEGIES = (("이미지 강조", 1), ("이미지 보완", 2), ("이미지 반전", 3))
+
+# [최적화] 추천 전략 수립 방식
+# - per_strategy: 전략마다 개별 구조화 출력 호출 (기존 방식, 3회)
+# - combined: 한 번의 호출로 3개 전략(ResearchActionPlan)을 받고, 누락/파싱 실패한 전략만 개별 호출로 대체
+RECO_PLAN_MODE = os.getenv("RECO_PLAN_MODE", "per_strategy").strip().lower()
 
 
 # ==========================================
@@ -70,36 +117,251 @@ def log_filters(h_filters: dict, s_filters: dict):
     pass
 
 
+def _match_combined_plans(action_plan, strategies=RECO_STRATEGIES) -> Dict[int, SearchStrategyPlan]:
+    """
+    통합 계획(ResearchActionPlan)을 전략 우선순위별로 매칭합니다.
+    priority가 맞는 계획을 우선 사용하고, 없으면 전략 이름이 포함된 계획을 사용합니다.
+    매칭되지 않은 전략은 결과에서 빠지며 호출 측에서 개별 호출로 대체합니다.
+    """
+    remaining = list(getattr(action_plan, "plans", None) or [])
+    matched = {}
+    for name, priority in strategies:
+        plan = next((p for p in remaining if p.priority == priority), None) or next(
+            (p for p in remaining if name in (p.strategy_name or "")), None
+        )
+        if plan is None:
+            continue
+        remaining.remove(plan)
+        plan.priority = priority
+        matched[priority] = plan
+    return matched
+
+
+async def _first_non_empty_by_priority(factories: list, concurrency: int):
+    """
+    factories(우선순위 순서)를 동시에 실행하되, 가장 우선순위가 높은 non-empty 결과를 반환합니다.
+    - Semaphore로 동시 실행 수를 제한합니다.
+    - 우선순위 순서대로 결과를 확인하므로, 앞선 조합이 비어 있음이 확정된 뒤에만 뒤 조합이 선택됩니다.
+    - 승자가 확정되면 아직 실행 중인 나머지 작업은 즉시 취소합니다.
+    Returns: (index, results) 또는 (None, [])
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _run(factory):
+        async with semaphore:
+            return await factory()
+
+    tasks = [asyncio.create_task(_run(factory)) for factory in factories]
+    try:
+        for idx, task in enumerate(tasks):
+            try:
+                results = await task
+            except Exception as e:
+                print(f"   ⚠️ 완화 검색 실패(조합 {idx}): {e}", flush=True)
+                continue
+            if results:
+                return idx, results
+        return None, []
+    finally:
+        pending = [task for task in tasks if not task.done()]
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+
+def _is_retryable(error: Exception) -> bool:
+    # 타임아웃/연결 오류/429/5xx만 재시도 (스키마 파싱 실패 등은 같은 입력이면 다시 실패)
+    if isinstance(error, asyncio.TimeoutError):
+        return True
+    try:
+        import openai
+    except ImportError:
+        return False
+    return isinstance(
+        error,
+        (openai.APIConnectionError, openai.RateLimitError, openai.InternalServerError),
+    )
+
+
+async def ainvoke_with_retry(
+    runnable,
+    messages: list,
+    label: str,
+    timeout: float = ROUTER_LLM_TIMEOUT,
+    retries: int = ROUTER_LLM_RETRIES,
+    backoff: float = ROUTER_LLM_BACKOFF,
+):
+    """
+    runnable.ainvoke를 호출 단위 timeout + 지수 backoff 재시도로 실행합니다.
+    - 이벤트 루프를 막지 않으므로 다른 사용자의 SSE 스트림이 계속 진행됩니다.
+    - CancelledError(클라이언트 연결 종료)는 잡지 않고 그대로 전파해 진행 중인 요청을 취소합니다.
+    """
+    for attempt in range(retries + 1):
+        try:
+            return await asyncio.wait_for(runnable.ainvoke(messages), timeout)
+        except Exception as e:
+            if attempt >= retries or not _is_retryable(e):
+                raise
+            delay = backoff * (2**attempt) * (1 + random.random() * 0.2)
+            print(
+                f"   ⚠️ [{label}] LLM 호출 실패({attempt + 1}회, {type(e).__name__}) -> {delay:.2f}s 후 재시도",
+                flush=True,
+            )
+            await asyncio.sleep(delay)
+
+
+def _normalize_section_header(header_line: str, priority: int) -> str:
+    """'## 3. 제목' / '##2 제목' 등 모델이 쓴 번호를 섹션 번호로 교체합니다."""
+    after = header_line[2:].lstrip()
+    idx = 0
+    while idx < len(after) and after[idx].isdigit():
+        idx += 1
+    if idx < len(after) and after[idx] == ".":
+        idx += 1
+    if idx < len(after) and after[idx] == " ":
+        idx += 1
+    rest = after[idx:]
+    return f"## {priority}. {rest}" if rest else f"## {priority}."
+
+
+class SectionStreamFormatter:
+    """
+    추천 섹션 후처리를 스트리밍 중에 적용합니다.
+    - 2, 3번 섹션은 첫 '##' 앞의 도입부를 버림
+    - 첫 줄이 '##' 헤더면 번호를 섹션 번호로 정규화 (헤더 줄이 완성될 때까지만 버퍼링)
+    - 끝 공백은 보류했다가 버리고, '---'로 끝나지 않으면 '\n---'를 덧붙임
+    """
+
+    def __init__(self, priority: int):
+        self.priority = priority
+        self.text = ""
+        self._head = ""
+        self._head_done = False
+        self._pending_ws = ""
+
+    def _resolve_head(self, final: bool) -> Optional[str]:
+        buf = self._head
+        if self.priority != 1:
+            header_index = buf.find("##")
+            if header_index < 0:
+                return buf if final else None
+            buf = buf[header_index:]
+        elif not buf.startswith("##"):
+            # "#" 한 글자만 도착한 경우는 헤더인지 아직 알 수 없음
+            if not final and "##".startswith(buf):
+                return None
+            return buf
+        newline = buf.find("\n")
+        if newline < 0:
+            if not final:
+                return None
+            return _normalize_section_header(buf, self.priority)
+        return _normalize_section_header(buf[:newline], self.priority) + buf[newline:]
+
+    def _emit(self, piece: str) -> str:
+        piece = self._pending_ws + piece
+        stripped = piece.rstrip()
+        self._pending_ws = piece[len(stripped):]
+        self.text += stripped
+        return stripped
+
+    def feed(self, chunk: str) -> str:
+        """새 청크를 받아 지금 내보낼 수 있는 텍스트를 반환합니다."""
+        if self._head_done:
+            return self._emit(chunk)
+        self._head += chunk
+        resolved = self._resolve_head(final=False)
+        if resolved is None:
+            return ""
+        self._head_done = True
+        self._head = ""
+        return self._emit(resolved)
+
+    def finish(self) -> str:
+        out = ""
+        if not self._head_done:
+            self._head_done = True
+            out = self._emit(self._resolve_head(final=True))
+        self._pending_ws = ""
+        if self.text and not self.text.endswith("---"):
+            out += "\n---"
+            self.text += "\n---"
+        return out
+
+
+async def _emit_reco_chunk(content: str) -> None:
+    try:
+        await adispatch_custom_event(RECO_STREAM_EVENT, {"content": content})
+    except RuntimeError:
+        # 그래프 실행 밖(직접 호출/테스트)에서는 이벤트 없이 최종 메시지만 사용
+        pass
+
+
 async def smart_search_with_retry_async(
-    h_filters: dict, s_filters: dict, exclude_ids: list = None, query_text: str = ""
+    h_filters: dict,
+    s_filters: dict,
+    exclude_ids: list = None,
+    query_text: str = "",
+    query_vector: Optional[List[float]] = None,
 ):
     priority_order = ["note", "accord", "occasion"]
     active_keys = [k for k in priority_order if k in s_filters and s_filters[k]]
 
-    results = await advanced_perfume_search_tool.ainvoke(
-        {
-            "hard_filters": h_filters,
-            "strategy_filters": s_filters,
-            "exclude_ids": exclude_ids,
-            "query_text": query_text,
-        }
-    )
+    # [최적화] 리랭킹 쿼리 벡터는 전략당 1회만 계산하여 모든 재시도(완화 검색)에 공유
+    if query_vector is None and query_text:
+        query_vector = await build_query_vector_async(query_text)
+
+    def _search_factory(filters: dict):
+        async def _search():
+            # 쿼리 벡터는 LLM용 도구 스키마 밖(내부 함수)으로만 전달
+            return await advanced_perfume_search_async(
+                hard_filters=h_filters,
+                strategy_filters=filters,
+                exclude_ids=exclude_ids,
+                query_text=query_text,
+                query_vector=query_vector or None,
+            )
+
+        return _search
+
+    results = await _search_factory(s_filters)()
     if results:
         return results, "Perfect Match"
 
+    # 완화 레벨별 조합 목록 (우선순위 순서 유지)
+    levels = []
     for r in range(len(active_keys) - 1, 0, -1):
-        for combo_keys in itertools.combinations(active_keys, r):
-            temp_filters = {k: s_filters[k] for k in combo_keys}
-            results = await advanced_perfume_search_tool.ainvoke(
-                {
-                    "hard_filters": h_filters,
-                    "strategy_filters": temp_filters,
-                    "exclude_ids": exclude_ids,
-                    "query_text": query_text,
-                }
-            )
-            if results:
-                return results, f"Relaxed (Level {len(active_keys)-r})"
+        combos = [
+            {k: s_filters[k] for k in combo_keys}
+            for combo_keys in itertools.combinations(active_keys, r)
+        ]
+        levels.append((len(active_keys) - r, combos))
+
+    if RELAXATION_MODE == "all":
+        # [최적화] 모든 레벨의 조합을 동시에 실행 -> 최악 지연 = 가장 느린 단일 검색
+        flat = [(level, combo) for level, combos in levels for combo in combos]
+        idx, results = await _first_non_empty_by_priority(
+            [_search_factory(combo) for _, combo in flat], RELAXATION_CONCURRENCY
+        )
+        if idx is not None:
+            return results, f"Relaxed (Level {flat[idx][0]})"
+        return [], "No Results"
+
+    for level, combos in levels:
+        if RELAXATION_MODE == "sequential":
+            for combo in combos:
+                results = await _search_factory(combo)()
+                if results:
+                    return results, f"Relaxed (Level {level})"
+            continue
+
+        # [최적화] 같은 레벨의 조합은 동시에 실행
+        idx, results = await _first_non_empty_by_priority(
+            [_search_factory(combo) for combo in combos], RELAXATION_CONCURRENCY
+        )
+        if idx is not None:
+            return results, f"Relaxed (Level {level})"
     return [], "No Results"
 
 
@@ -133,7 +395,28 @@ async def call_info_graph_wrapper(state: AgentState):
 # ==========================================
 
 
-def supervisor_node(state: AgentState):
+# 구조화 출력 runnable은 요청마다 만들지 않고 재사용
+SUPERVISOR_LLM = ROUTER_CALL_LLM.with_structured_output(RoutingDecision)
+INTERVIEWER_LLM = ROUTER_CALL_LLM.with_structured_output(InterviewResult)
+
+# [최적화] 명확한 의도는 규칙/임베딩으로 즉시 분류하고, 모호한 입력만 LLM으로 분류
+intent_router = IntentRouter(
+    brand_detector=find_brand_mentions_async, embed=get_embeddings_async
+)
+
+# [최적화] 같은 선호 정보 + 전략에 대한 계획은 TTL 동안 재사용 (프롬프트/모델이 바뀌면 키가 바뀜)
+strategy_plan_cache = StrategyPlanCache(
+    version=prompt_version(
+        RESEARCHER_SYSTEM_PROMPT,
+        RESEARCHER_TASK_INSTRUCTION,
+        RESEARCHER_COMBINED_TASK_INSTRUCTION,
+        RECO_PLAN_MODE,
+        SMART_LLM.model_name,
+    )
+)
+
+
+async def supervisor_node(state: AgentState):
     """[Main Router]"""
     print("\n" + "=" * 60, flush=True)
     print("👀 [Supervisor] 사용자 의도 분류 중...", flush=True)
@@ -142,12 +425,23 @@ def supervisor_node(state: AgentState):
         print("   👉 인터뷰 진행 중 -> Interviewer로 이동", flush=True)
         return {"next_step": "interviewer"}
 
-    messages = [SystemMessage(content=SUPERVISOR_PROMPT)] + state["messages"]
+    last_message = state["messages"][-1] if state["messages"] else None
+    local = None
+    if isinstance(last_message, HumanMessage):
+        local = await intent_router.route(str(last_message.content))
+        if local.route is not None:
+            print(f"   👉 분류 결과(로컬): {local.route}", flush=True)
+            return {"next_step": local.route}
+
+    # [최적화] 체크포인터의 전체 이력 대신 최근 대화 + 요약만 전달
+    messages = [SystemMessage(content=SUPERVISOR_PROMPT)] + window_messages(state["messages"])
 
     try:
-        decision = SMART_LLM.with_structured_output(RoutingDecision).invoke(messages)
+        decision = await ainvoke_with_retry(SUPERVISOR_LLM, messages, "Supervisor")
         next_step = decision.next_step
-        print(f"   👉 분류 결과: {next_step}", flush=True)
+        # 임계값 튜닝용: 로컬 후보(reason)와 LLM 결과를 함께 기록
+        local_reason = f" (local={local.reason}, {local.confidence:.2f})" if local else ""
+        print(f"   👉 분류 결과: {next_step}{local_reason}", flush=True)
         return {"next_step": next_step}
 
     except Exception as e:
@@ -155,7 +449,7 @@ def supervisor_node(state: AgentState):
         return {"next_step": "writer"}
 
 
-def interviewer_node(state: AgentState):
+async def interviewer_node(state: AgentState):
     """[Interviewer]"""
     current_prefs = state.get("user_preferences", {})
 
@@ -174,10 +468,10 @@ def interviewer_node(state: AgentState):
             "{{CURRENT_CONTEXT}}", "정보 없음"
         )
 
-    messages = [SystemMessage(content=formatted_prompt)] + state["messages"]
+    messages = [SystemMessage(content=formatted_prompt)] + window_messages(state["messages"])
 
     try:
-        result = SMART_LLM.with_structured_output(InterviewResult).invoke(messages)
+        result = await ainvoke_with_retry(INTERVIEWER_LLM, messages, "Interviewer")
         new_prefs = result.user_preferences.dict(exclude_unset=True)
         updated_prefs = {
             **current_prefs,
@@ -220,37 +514,63 @@ async def parallel_reco_node(state: AgentState):
     current_context = json.dumps(user_prefs, ensure_ascii=False)
 
     plan_llm = SMART_LLM.with_structured_output(SearchStrategyPlan)
+    combined_plan_task = None
     seen_ids = set()
     seen_ids_lock = asyncio.Lock()
 
-    def _normalize_section_boundary(previous_text: str, next_text: str) -> str:
-        if not previous_text or not next_text:
-            return next_text
-        if not next_text.lstrip().startswith("##"):
-            return next_text
-        prev_trimmed = previous_text.rstrip()
-        if prev_trimmed.endswith("---") and not previous_text.endswith("\n"):
-            if not next_text.startswith("\n"):
-                return f"\n{next_text}"
-        return next_text
+    async def plan_all_strategies() -> Dict[int, SearchStrategyPlan]:
+        """[combined] 3개 전략을 한 번의 구조화 출력 호출로 수립 (실패 시 빈 dict → 개별 호출)"""
+        messages = layout_messages(
+            RESEARCHER_SYSTEM_PROMPT,
+            static_blocks=(RESEARCHER_COMBINED_TASK_INSTRUCTION,),
+            volatile=(
+                f"사용자 요청 데이터: {current_context}",
+                "전략 목록: " + ", ".join(f"{p}. {name}" for name, p in RECO_STRATEGIES),
+            ),
+        )
+        try:
+            action_plan = await SMART_LLM.with_structured_output(ResearchActionPlan).ainvoke(
+                messages, config={"tags": ["internal_helper"]}
+            )
+        except Exception as e:
+            print(f"   ⚠️ [Reco] 통합 전략 수립 실패, 전략별 호출로 대체: {e}", flush=True)
+            return {}
+        matched = _match_combined_plans(action_plan)
+        missing = [name for name, p in RECO_STRATEGIES if p not in matched]
+        if missing:
+            print(f"   ⚠️ [Reco] 통합 계획에 누락된 전략 {missing} → 개별 호출", flush=True)
+        return matched
+
+    async def plan_strategy(strategy_name: str, priority: int) -> SearchStrategyPlan:
+        nonlocal combined_plan_task
+        if RECO_PLAN_MODE == "combined":
+            # 처음 요청한 전략이 통합 호출을 시작하고, 나머지 전략은 같은 결과를 기다림
+            if combined_plan_task is None:
+                combined_plan_task = asyncio.ensure_future(plan_all_strategies())
+            plan = (await asyncio.shield(combined_plan_task)).get(priority)
+            if plan is not None:
+                return plan
+
+        # [최적화] 3개 전략 호출이 동일한 정적 prefix(시스템 프롬프트 + 작업 지시)를 공유하도록 배치
+        plan_messages = layout_messages(
+            RESEARCHER_SYSTEM_PROMPT,
+            static_blocks=(RESEARCHER_TASK_INSTRUCTION,),
+            volatile=(
+                f"사용자 요청 데이터: {current_context}",
+                f"전략 이름: {strategy_name}",
+                f"우선순위: {priority}",
+            ),
+        )
+        return await plan_llm.ainvoke(plan_messages, config={"tags": ["internal_helper"]})
 
     async def prepare_strategy(strategy_name: str, priority: int):
         """Phase 1: Strategy planning + search + perfume selection (parallel)"""
-        plan_messages = [
-            SystemMessage(content=RESEARCHER_SYSTEM_PROMPT),
-            HumanMessage(
-                content=(
-                    f"사용자 요청 데이터: {current_context}\n"
-                    f"전략 이름: {strategy_name}\n"
-                    f"우선순위: {priority}\n"
-                    "위 데이터를 바탕으로 전략을 수립해 주세요."
-                )
-            ),
-        ]
-
         try:
-            plan = await plan_llm.ainvoke(
-                plan_messages, config={"tags": ["internal_helper"]}
+            plan = await strategy_plan_cache.get_or_plan(
+                user_prefs,
+                strategy_name,
+                priority,
+                lambda: plan_strategy(strategy_name, priority),
             )
         except Exception as e:
             return None
@@ -280,7 +600,7 @@ async def parallel_reco_node(state: AgentState):
         if not selected_perfume:
             return None
 
-        save_recommendation_log(
+        await save_recommendation_log_async(
             member_id=member_id, perfumes=[selected_perfume], reason=plan.reason
         )
 
@@ -323,8 +643,8 @@ async def parallel_reco_node(state: AgentState):
             "priority": priority,
         }
 
-    async def generate_output(prepared_data: dict):
-        """Phase 2: LLM output generation with streaming (sequential)"""
+    async def generate_output(prepared_data: dict, emit):
+        """Phase 2: LLM output generation with streaming (sections run concurrently, emit() buffers per section)"""
         if not prepared_data:
             return None
             
@@ -334,50 +654,9 @@ async def parallel_reco_node(state: AgentState):
         user_mode = state.get("user_mode", "BEGINNER")
         
         # [★ Dynamic Expression Injection]
-        # Extract notes and accords from perfume data
+        # [최적화] 향수별 노트/어코드 표현 가이드는 캐시에서 조회 (CSV 사전이 바뀌면 자동 무효화)
         perfume_data = section_data.get("perfume", {})
-        perfume_name = perfume_data.get("name", "Unknown")
-        brand = perfume_data.get("brand", "Unknown")
-        notes_data = perfume_data.get("notes", {})
-        accord_str = perfume_data.get("accord", "")
-        
-        # Collect all notes
-        all_notes = []
-        for note_type in ["top", "middle", "base"]:
-            note_str = notes_data.get(note_type, "")
-            if note_str and note_str != "N/A":
-                all_notes.extend([n.strip() for n in note_str.split(",")])
-        
-        # Extract accords (before [Best Review])
-        accords = []
-        if accord_str:
-            accord_part = accord_str.split("[Best Review]")[0].strip()
-            accords = [a.strip() for a in accord_part.split(",") if a.strip()]
-        
-        # Load expression loader
-        loader = ExpressionLoader()
-        
-        # Build expression guide
-        expression_guide = []
-        injected_count = 0
-        
-        if all_notes:
-            expression_guide.append("### 노트 표현 가이드")
-            for note in all_notes[:10]:  # Limit to 10 to avoid prompt bloat
-                desc = loader.get_note_desc(note)
-                if desc:
-                    expression_guide.append(f"- {note}: {desc}")
-                    injected_count += 1
-        
-        if accords:
-            expression_guide.append("\n### 어코드 표현 가이드")
-            for accord in accords[:10]:
-                desc = loader.get_accord_desc(accord)
-                if desc:
-                    expression_guide.append(f"- {accord}: {desc}")
-                    injected_count += 1
-        
-        expression_text = "\n".join(expression_guide) if expression_guide else ""
+        expression_text = ExpressionLoader().get_perfume_guide(perfume_data)
         
         data_ctx = json.dumps(section_data, ensure_ascii=False, indent=2)
 
@@ -386,94 +665,108 @@ async def parallel_reco_node(state: AgentState):
         else:
             section_system = WRITER_RECOMMENDATION_PROMPT_SINGLE
 
-        # Inject expression guide into prompt
-        content_parts = [
-            f"[섹션 번호]: {priority}",
-            f"[도입부 포함]: {'예' if priority == 1 else '아니오'}",
-            f"[출력 규칙]: 도입부 포함이 '아니오'이면 첫 줄을 반드시 '## {priority}.'로 시작하고 도입부 문장을 쓰지 마세요.",
-        ]
-        
-        if expression_text:
-            content_parts.append(f"\n[감각 표현 참고]:\n{expression_text}")
-        
-        content_parts.append(f"\n[참고 데이터]:\n{data_ctx}")
-        
-        messages = [SystemMessage(content=section_system)] + state["messages"] + [
-            HumanMessage(content="\n".join(content_parts))
-        ]
+        # [최적화] 프롬프트 캐시: 시스템 프롬프트 + 출력 규칙(정적) → 대화 이력 → 섹션별 데이터(가변) 순서
+        # 섹션 번호는 가장 마지막에 두어 3개 섹션이 최대한 긴 공통 prefix를 공유하도록 함
+        messages = layout_messages(
+            section_system,
+            static_blocks=(WRITER_SECTION_OUTPUT_RULE,),
+            history=window_messages(state["messages"]),
+            volatile=(
+                f"[감각 표현 참고]:\n{expression_text}" if expression_text else "",
+                f"\n[참고 데이터]:\n{data_ctx}",
+                f"\n[섹션 번호]: {priority}",
+                f"[도입부 포함]: {'예' if priority == 1 else '아니오'}",
+            ),
+        )
 
+        # 토큰은 internal_helper 태그로 직접 노출하지 않고, 섹션 순서대로 RECO_STREAM_EVENT로 내보냄
+        formatter = SectionStreamFormatter(priority)
+        generated_chunks = 0
+        usage = None
         try:
-            response = await SUPER_SMART_LLM.ainvoke(messages)
-            result_text = response.content
-            if result_text:
-                header_index = result_text.find("##")
-                if priority != 1 and header_index > 0:
-                    result_text = result_text[header_index:]
-                if result_text.startswith("##"):
-                    lines = result_text.splitlines()
-                    header_line = lines[0]
-                    after = header_line[2:].lstrip()
-                    idx = 0
-                    while idx < len(after) and after[idx].isdigit():
-                        idx += 1
-                    if idx < len(after) and after[idx] == ".":
-                        idx += 1
-                    if idx < len(after) and after[idx] == " ":
-                        idx += 1
-                    rest = after[idx:]
-                    lines[0] = (
-                        f"## {priority}. {rest}" if rest else f"## {priority}."
-                    )
-                    result_text = "\n".join(lines)
-            if result_text and not result_text.rstrip().endswith("---"):
-                result_text = f"{result_text.rstrip()}\n---"
-            return result_text
+            async for chunk in SUPER_SMART_LLM.astream(
+                messages, config={"tags": ["internal_helper"]}
+            ):
+                usage = getattr(chunk, "usage_metadata", None) or usage
+                if chunk.content:
+                    generated_chunks += 1
+                piece = formatter.feed(chunk.content or "")
+                if piece:
+                    emit(piece)
+            prompt_cache_stats.record("reco_writer", usage)
+            cancellation_stats.observe_completed("reco_writer", usage)
+        except asyncio.CancelledError:
+            # 클라이언트 연결 종료 → 생성 중단 (스트림 청크 ≈ 토큰 1개)
+            saved = cancellation_stats.record_cancelled("reco_writer", generated_tokens=generated_chunks)
+            print(f"   🔌 [Reco] 섹션 {priority} 생성 취소 (절약 추정 {saved} tokens)", flush=True)
+            raise
         except Exception as e:
-            return None
+            print(f"   ⚠️ [Reco] 섹션 {priority} 생성 실패: {e}", flush=True)
+            if not formatter.text:
+                return None
+        tail = formatter.finish()
+        if tail:
+            emit(tail)
+        return formatter.text or None
 
     # Phase 1: Parallel preparation (strategy planning + search)
     # All 3 strategies run simultaneously - fast!
     prep_tasks = [
-        asyncio.create_task(prepare_strategy("이미지 강조", 1)),
-        asyncio.create_task(prepare_strategy("이미지 보완", 2)),
-        asyncio.create_task(prepare_strategy("이미지 반전", 3)),
+        asyncio.create_task(prepare_strategy(name, priority))
+        for name, priority in RECO_STRATEGIES
+    ]
+
+    # Phase 2: [최적화] 각 섹션은 준비가 끝나는 즉시 생성을 시작하고 섹션별 큐에 버퍼링
+    # 클라이언트에는 1 → 2 → 3 순서로만 내보내며, 앞 섹션이 끝나는 순간 다음 섹션의 버퍼부터 스트리밍
+    section_queues = {p: asyncio.Queue() for p in RECO_SECTION_PRIORITIES}
+
+    async def run_section(prep_task, queue: asyncio.Queue):
+        try:
+            try:
+                data = await prep_task
+            except asyncio.CancelledError:
+                # 준비 단계에서 취소되어 섹션 생성 호출 자체를 하지 않음
+                cancellation_stats.record_cancelled("reco_writer", started=False)
+                raise
+            if data:
+                await generate_output(data, queue.put_nowait)
+        finally:
+            queue.put_nowait(None)
+
+    section_tasks = [
+        asyncio.create_task(run_section(prep_task, section_queues[p]))
+        for prep_task, p in zip(prep_tasks, RECO_SECTION_PRIORITIES)
     ]
 
-    # Phase 2: Sequential output generation with streaming
-    # Wait for prep in order, then generate output with streaming
-    results = []
+    full_text = ""
     try:
-        data1 = await prep_tasks[0]
-        result1 = await generate_output(data1) if data1 else None
-        results.append(result1)
-
-        data2 = await prep_tasks[1]
-        result2 = await generate_output(data2) if data2 else None
-        results.append(result2)
-
-        data3 = await prep_tasks[2]
-        result3 = await generate_output(data3) if data3 else None
-        results.append(result3)
-    except (Exception, asyncio.CancelledError) as e:
+        for priority in RECO_SECTION_PRIORITIES:
+            queue = section_queues[priority]
+            section_started = False
+            while (piece := await queue.get()) is not None:
+                if not section_started and full_text:
+                    piece = f"\n\n{piece}"
+                section_started = True
+                full_text += piece
+                await _emit_reco_chunk(piece)
+        await asyncio.gather(*section_tasks, return_exceptions=True)
+    except Exception as e:
+        print(f"   ⚠️ [Reco] 추천 생성 실패: {e}", flush=True)
         return {
             "messages": [AIMessage(content="조건에 맞는 향수를 찾지 못했습니다. 😢")],
             "next_step": "end",
         }
-
-    # Assemble sections in order (1 → 2 → 3)
-    full_text = ""
-    for idx, result_text in enumerate(results, start=1):
-        # Handle exceptions returned by gather(return_exceptions=True)
-        if isinstance(result_text, (Exception, asyncio.CancelledError)):
-            continue
-
-        if not result_text:
-            continue
-
-        if full_text:
-            full_text = f"{full_text}\n\n{result_text}"
-        else:
-            full_text = result_text
+    finally:
+        # [최적화] 연결 종료 등으로 노드가 취소되면 진행 중인 계획/검색/생성 작업을 모두 취소하고 정리될 때까지 대기
+        pending = [
+            task
+            for task in section_tasks + prep_tasks + [combined_plan_task]
+            if task is not None and not task.done()
+        ]
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
 
     if not full_text:
         full_text = "조건에 맞는 향수를 찾지 못했습니다. 😢 대안을 안내해 드릴게요..."
@@ -516,5 +809,6 @@ workflow.add_conditional_edges(
 workflow.add_edge("parallel_reco", END)
 workflow.add_edge("info_retrieval_subgraph", END)
 
-checkpointer = MemorySaver()
+# [최적화] 메모리 상한(LRU) + 선택적 영구 저장소(sqlite/postgres) 체크포인터
+checkpointer = create_checkpointer()
 app_graph = workflow.compile(checkpointer=checkpointer)
\ No newline at end of file
@@ -18,6 +18,7 @@ from .tools_info import (
     lookup_accord_info_tool,
 )
 from .tools_similarity import lookup_similar_perfumes_tool
+from .tools import lookup_notes_by_vector_batch_tool
 
 # [3] 프롬프트 임포트
 from .prompts_info import (
@@ -31,13 +32,29 @@ from .prompts_info import (
 
 # [4] Expression Loader for dynamic dictionary injection
 from .expression_loader import ExpressionLoader
+from .prompt_layout import layout_messages, prompt_cache_stats
+
+# [5] 로컬 라우터 (향수 이름 인덱스 + 노트/어코드 사전)
+from .info_router import InfoRouter
+from .database import catalog_vocab, find_brand_mentions_async, get_perfume_name_index_async
 
 load_dotenv()
 
 # [LLM 이원화]
-INFO_LLM = ChatOpenAI(model="gpt-4o", temperature=0, streaming=True)
+# stream_usage: 응답 usage(캐시 적중 토큰 포함)를 받아 prompt_cache_stats에 기록
+INFO_LLM = ChatOpenAI(model="gpt-4o", temperature=0, streaming=True, stream_usage=True)
 ROUTER_LLM = ChatOpenAI(model="gpt-4o", temperature=0, streaming=False)
 
+# [최적화] 대상(향수/노트/어코드)이 분명한 질문은 로컬에서 분류하고, 모호한 질문만 ROUTER_LLM으로 분류
+info_router = InfoRouter(
+    perfume_index=get_perfume_name_index_async,
+    vocabulary=catalog_vocab.get_async,
+    brand_detector=find_brand_mentions_async,
+    note_vector_lookup=lambda keywords: lookup_notes_by_vector_batch_tool.ainvoke(
+        {"keywords": keywords, "top_k": 1}
+    ),
+)
+
 
 # ==========================================
 # 4. Utility Functions for Ordinal/Pronoun Resolution
@@ -161,11 +178,15 @@ async def stream_fixed_message(text: str) -> AIMessage:
 # ==========================================
 
 
-def info_supervisor_node(state: InfoState):
+async def info_supervisor_node(state: InfoState):
     """[Router] 분류 노드"""
     print(f"\n   ▶️ [Info Subgraph] Supervisor 노드 시작", flush=True)
     user_query = state.get("user_query", "")
 
+    local = await info_router.route(user_query)
+    if local.info_type is not None:
+        return local.as_state()
+
     chat_history = state.get("messages", [])
     context_str = ""
     if chat_history:
@@ -175,19 +196,21 @@ def info_supervisor_node(state: InfoState):
             if msg.content:
                 context_str += f"- {role}: {msg.content}\n"
 
-    final_system_prompt = INFO_SUPERVISOR_PROMPT
-    if context_str:
-        final_system_prompt += f"\n\n[Recent Chat Context]\n{context_str}"
-
-    final_system_prompt += "\n\n[Instruction]\nResolve the target name from context and classify based on the PRIORITY rules."
-
-    messages = [
-        SystemMessage(content=final_system_prompt),
-        HumanMessage(content=user_query),
-    ]
+    # [최적화] 고정 지시문은 시스템 프롬프트에, 대화 맥락은 질문과 함께 마지막 메시지에 배치 (프롬프트 캐시 prefix 유지)
+    messages = layout_messages(
+        INFO_SUPERVISOR_PROMPT,
+        static_blocks=(
+            "[Instruction]\nResolve the target name from [Recent Chat Context] in the user message "
+            "and classify based on the PRIORITY rules.",
+        ),
+        volatile=(
+            f"[Recent Chat Context]\n{context_str}" if context_str else "",
+            f"[User Query]\n{user_query}",
+        ),
+    )
 
     try:
-        decision = ROUTER_LLM.with_structured_output(InfoRoutingDecision).invoke(
+        decision = await ROUTER_LLM.with_structured_output(InfoRoutingDecision).ainvoke(
             messages
         )
         final_target = decision.target_name
@@ -343,6 +366,7 @@ async def perfume_describer_node(state: InfoState):
             HumanMessage(content="\n".join(content_parts)),
         ]
         response = await INFO_LLM.ainvoke(messages)
+        prompt_cache_stats.record("info_perfume_describer", response.usage_metadata)
 
         return {"messages": [response], "final_answer": response.content}
 
@@ -371,9 +395,15 @@ async def ingredient_specialist_node(state: InfoState):
         """
 
         try:
-            analysis = await ROUTER_LLM.with_structured_output(
-                IngredientAnalysisResult
-            ).ainvoke(analysis_prompt, config={"tags": ["internal_helper"]})
+            if state.get("notes") or state.get("accords"):
+                # [최적화] 로컬 라우터가 카탈로그 노트/어코드로 이미 분리한 경우 분석 LLM 호출 생략
+                analysis = IngredientAnalysisResult(
+                    notes=state.get("notes") or [], accords=state.get("accords") or []
+                )
+            else:
+                analysis = await ROUTER_LLM.with_structured_output(
+                    IngredientAnalysisResult
+                ).ainvoke(analysis_prompt, config={"tags": ["internal_helper"]})
             print(
                 f"      - 분석 결과: Notes={analysis.notes}, Accords={analysis.accords}",
                 flush=True,
@@ -382,11 +412,20 @@ async def ingredient_specialist_node(state: InfoState):
             print(f"      ⚠️ 분석 실패: {e}", flush=True)
             analysis = IngredientAnalysisResult(notes=[target_name], accords=[])
 
+        # [최적화] 노트 키워드를 카탈로그 노트명으로 일괄 변환 (사전 조회 + 나머지는 배치 벡터 검색 1회)
+        # 모두 카탈로그 이름이면 lookup_note_info_tool이 정규화 LLM 호출을 생략합니다.
+        # (분석 실패 시의 target_name은 노트가 아닐 수 있어 기존처럼 정규화 LLM에 맡김)
+        note_keywords = analysis.notes
+        if note_keywords and note_keywords != [target_name]:
+            resolved = await info_router.resolve_notes(note_keywords)
+            note_keywords = list(dict.fromkeys(resolved.get(k) or k for k in note_keywords))
+            print(f"      - 노트 변환: {resolved}", flush=True)
+
         # 2. 병렬 도구 호출 (원래 로직 유지)
         tasks = []
         tasks.append(
-            lookup_note_info_tool.ainvoke({"keywords": analysis.notes})
-            if analysis.notes
+            lookup_note_info_tool.ainvoke({"keywords": note_keywords})
+            if note_keywords
             else asyncio.sleep(0, result="")
         )
         tasks.append(
@@ -487,6 +526,7 @@ async def ingredient_specialist_node(state: InfoState):
             HumanMessage(content=combined_context),
         ]
         response = await INFO_LLM.ainvoke(messages)
+        prompt_cache_stats.record("info_ingredient_specialist", response.usage_metadata)
 
         return {"messages": [response], "final_answer": response.content}
 
@@ -544,6 +584,7 @@ async def similarity_curator_node(state: InfoState):
             ),
         ]
         response = await INFO_LLM.ainvoke(messages)
+        prompt_cache_stats.record("info_similarity_curator", response.usage_metadata)
 
         # [★수정] 결과가 화면에 나오도록 final_answer를 포함하여 반환
         return {"messages": [response], "final_answer": response.content}
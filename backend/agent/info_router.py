@@ -0,0 +1,530 @@
+# backend/agent/info_router.py
+"""
+Local fast path for the info subgraph router (info_supervisor_node).
+
+Most info questions name their target explicitly ("샤넬 넘버5 노트 알려줘",
+"베티버가 뭐야?"). Instead of a ROUTER_LLM (gpt-4o) call per question, a rule
+classifier picks the info type and an entity resolver finds the target:
+
+- perfumes: in-memory name index (catalog name, Korean name, search keywords)
+- notes / accords: catalog vocabulary + Korean alias tables
+- brands: BrandMatcher.mentions
+
+Only decisions at or above INFO_ROUTER_MIN_CONFIDENCE are used. Pronouns and
+ordinals ("이거", "2번째 거") and anything ambiguous fall back to the LLM, which
+sees the recent chat context.
+"""
+
+import os
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .brand_matcher import normalize_brand
+
+INFO_ROUTER_MODE = os.getenv("INFO_ROUTER_MODE", "rules").lower()
+INFO_ROUTER_MIN_CONFIDENCE = float(os.getenv("INFO_ROUTER_MIN_CONFIDENCE", "0.85"))
+PERFUME_INDEX_TTL = float(os.getenv("PERFUME_INDEX_TTL", "3600"))
+
+# 영문 키는 짧으면 일반 단어와 겹치기 쉬워 4글자부터, 한글 키는 2글자부터 사용
+MIN_ASCII_KEY = 4
+MIN_KOREAN_KEY = 2
+
+# ==========================================
+# 규칙 (INFO_SUPERVISOR_PROMPT의 판단 순서와 동일한 의미)
+# ==========================================
+# 대명사/순번은 최근 대화 맥락이 필요하므로 항상 LLM 경로로 보냄
+REFERENCE_PATTERN = re.compile(
+    r"이거|그거|저거|이것|그것|이\s*향수|그\s*향수|저\s*향수|\d+\s*번|"
+    r"(첫|두|세|네|다섯)\s*번째|(첫|둘|셋|넷)째|방금|아까"
+)
+SIMILAR_PATTERN = re.compile(r"비슷|유사|대체|대신|같은\s*느낌|같은\s*향|닮은|느낌\s*나는|다른\s*거")
+RECOMMEND_PATTERN = re.compile(r"추천")
+BRAND_PATTERN = re.compile(r"브랜드")
+
+# 한글 표기 -> 카탈로그 노트명 (카탈로그에 없는 노트는 무시됨)
+NOTE_ALIASES: Dict[str, str] = {
+    "머스크": "Musk",
+    "베르가못": "Bergamot",
+    "레몬": "Lemon",
+    "라임": "Lime",
+    "자몽": "Grapefruit",
+    "오렌지": "Orange",
+    "만다린": "Mandarin Orange",
+    "유자": "Yuzu",
+    "네롤리": "Neroli",
+    "오렌지블로썸": "Orange Blossom",
+    "장미": "Rose",
+    "로즈": "Rose",
+    "자스민": "Jasmine",
+    "재스민": "Jasmine",
+    "라벤더": "Lavender",
+    "아이리스": "Iris",
+    "바이올렛": "Violet",
+    "튜베로즈": "Tuberose",
+    "일랑일랑": "Ylang-Ylang",
+    "피오니": "Peony",
+    "작약": "Peony",
+    "은방울꽃": "Lily-of-the-Valley",
+    "프리지아": "Freesia",
+    "샌달우드": "Sandalwood",
+    "샌들우드": "Sandalwood",
+    "백단향": "Sandalwood",
+    "시더우드": "Cedar",
+    "시더": "Cedar",
+    "베티버": "Vetiver",
+    "패출리": "Patchouli",
+    "파출리": "Patchouli",
+    "오우드": "Agarwood (Oud)",
+    "바닐라": "Vanilla",
+    "통카빈": "Tonka Bean",
+    "통카": "Tonka Bean",
+    "앰버": "Amber",
+    "엠버": "Amber",
+    "벤조인": "Benzoin",
+    "인센스": "Incense",
+    "유향": "Olibanum",
+    "레더": "Leather",
+    "가죽": "Leather",
+    "무화과": "Fig",
+    "피그": "Fig",
+    "복숭아": "Peach",
+    "피치": "Peach",
+    "블랙베리": "Blackberry",
+    "사과": "Apple",
+    "코코넛": "Coconut",
+    "민트": "Mint",
+    "세이지": "Sage",
+    "로즈마리": "Rosemary",
+    "핑크페퍼": "Pink Pepper",
+    "후추": "Pepper",
+    "카다멈": "Cardamom",
+    "시나몬": "Cinnamon",
+    "계피": "Cinnamon",
+    "녹차": "Green Tea",
+    "그린티": "Green Tea",
+    "얼그레이": "Earl Grey Tea",
+    "커피": "Coffee",
+    "앰브록산": "Ambroxan",
+    "알데하이드": "Aldehydes",
+    "씨솔트": "Sea Salt",
+    "바다소금": "Sea Salt",
+}
+
+# 한글 표기 -> 카탈로그 어코드명
+ACCORD_ALIASES: Dict[str, str] = {
+    "프레시": "Fresh",
+    "프레쉬": "Fresh",
+    "시트러스": "Citrus",
+    "프루티": "Fruity",
+    "스위트": "Sweet",
+    "플로럴": "Floral",
+    "파우더리": "Powdery",
+    "크리미": "Creamy",
+    "구르망": "Gourmand",
+    "오리엔탈": "Oriental",
+    "스파이시": "Spicy",
+    "애니멀": "Animal",
+    "애니멀릭": "Animal",
+    "레더리": "Leathery",
+    "스모키": "Smoky",
+    "우디": "Woody",
+    "레지너스": "Resinous",
+    "얼시": "Earthy",
+    "어시": "Earthy",
+    "시프레": "Chypre",
+    "푸제르": "Fougère",
+    "그린": "Green",
+    "아쿠아틱": "Aquatic",
+    "아쿠아": "Aquatic",
+    "신세틱": "Synthetic",
+}
+
+
+def _compact(text: str) -> str:
+    """공백/구두점/악센트를 제거한 비교용 문자열 ("Wood Sage & Sea Salt" -> "woodsageandseasalt")"""
+    return normalize_brand(text)
+
+
+def _min_key_length(key: str) -> int:
+    return MIN_ASCII_KEY if key.isascii() else MIN_KOREAN_KEY
+
+
+class _KeyIndex:
+    """
+    문장 속 키(부분 문자열) 탐색용 인덱스.
+    키를 앞 2글자로 묶어 두고, 문장의 각 위치에서 해당 버킷의 키만 비교합니다.
+    """
+
+    def __init__(self, keys: Iterable[str]):
+        self._buckets: Dict[str, List[str]] = defaultdict(list)
+        for key in set(keys):
+            if len(key) >= _min_key_length(key):
+                self._buckets[key[:2]].append(key)
+        for bucket in self._buckets.values():
+            bucket.sort(key=len, reverse=True)
+
+    def find(self, compact_text: str) -> List[Tuple[int, str]]:
+        """(시작 위치, 키) 목록. 왼쪽부터 가장 긴 키를 겹치지 않게 고릅니다 ("로즈마리" 안의 "로즈" 제외)."""
+        found: List[Tuple[int, str]] = []
+        covered_until = 0
+        for i in range(len(compact_text) - 1):
+            if i < covered_until:
+                continue
+            for key in self._buckets.get(compact_text[i : i + 2], ()):
+                if compact_text.startswith(key, i):
+                    found.append((i, key))
+                    covered_until = i + len(key)
+                    break
+        return found
+
+
+# ==========================================
+# 1. 향수 이름 인덱스
+# ==========================================
+@dataclass(frozen=True)
+class PerfumeEntry:
+    id: int
+    brand: str
+    name: str
+
+    @property
+    def display_name(self) -> str:
+        return f"{self.brand} {self.name}".strip()
+
+
+@dataclass(frozen=True)
+class PerfumeMatch:
+    perfume: PerfumeEntry
+    confidence: float
+    key: str
+    ambiguous: bool = False
+
+
+class PerfumeNameIndex:
+    """
+    Process-wide perfume name index (catalog name, Korean name, search keywords).
+
+    Args:
+        loader: Blocking function returning rows with perfume_id, perfume_brand,
+            perfume_name, name_kr, search_keywords
+        ttl: Seconds before a background refresh is triggered (0 = never)
+    """
+
+    def __init__(self, loader: Callable[[], Iterable[Dict[str, Any]]], ttl: float = PERFUME_INDEX_TTL):
+        self._loader = loader
+        self.ttl = ttl
+        self._by_key: Dict[str, List[Tuple[int, PerfumeEntry]]] = {}
+        self._key_index = _KeyIndex(())
+        self._loaded_at: Optional[float] = None
+        self._load_lock = threading.Lock()
+        self._refreshing = False
+
+    # ---------- 적재 ----------
+    def load(self, rows: Iterable[Dict[str, Any]]) -> None:
+        """인덱스를 새로 만든 뒤 참조를 한 번에 교체합니다."""
+        by_key: Dict[str, Dict[int, Tuple[int, PerfumeEntry]]] = defaultdict(dict)
+        for row in rows:
+            entry = PerfumeEntry(
+                id=int(row["perfume_id"]),
+                brand=row.get("perfume_brand") or "",
+                name=row.get("perfume_name") or "",
+            )
+            # rank: 0 = 카탈로그 이름, 1 = 한글 이름, 2 = 검색 키워드 (tools_info 정렬 기준과 동일)
+            names = [(0, entry.name), (1, row.get("name_kr") or "")]
+            names += [(2, kw) for kw in (row.get("search_keywords") or "").split(",")]
+            for rank, name in names:
+                key = _compact(name)
+                if not key:
+                    continue
+                previous = by_key[key].get(entry.id)
+                if previous is None or rank < previous[0]:
+                    by_key[key][entry.id] = (rank, entry)
+        self._by_key = {key: list(entries.values()) for key, entries in by_key.items()}
+        self._key_index = _KeyIndex(self._by_key)
+        self._loaded_at = time.monotonic()
+
+    def refresh(self) -> None:
+        self.load(list(self._loader()))
+        print(f"✅ [PerfumeNameIndex] 향수 이름 {len(self._by_key)}개 인덱싱 완료")
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._loaded_at is not None
+
+    def ensure_loaded(self) -> None:
+        if self.is_loaded:
+            self._maybe_refresh_in_background()
+            return
+        with self._load_lock:
+            if not self.is_loaded:
+                self.refresh()
+
+    def _maybe_refresh_in_background(self) -> None:
+        if not self.ttl or time.monotonic() - self._loaded_at < self.ttl:
+            return
+        with self._load_lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def _run():
+            try:
+                self.refresh()
+            except Exception as e:
+                # 갱신 실패 시 기존 인덱스를 계속 사용하고 다음 TTL에 재시도
+                self._loaded_at = time.monotonic()
+                print(f"⚠️ [PerfumeNameIndex] 갱신 실패: {e}")
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=_run, name="perfume-name-index-refresh", daemon=True).start()
+
+    # ---------- 조회 ----------
+    def find(
+        self, text: str, brands: Sequence[str] = (), exclude_keys: Iterable[str] = ()
+    ) -> Optional[PerfumeMatch]:
+        """
+        문장에 언급된 향수 1개를 찾습니다. 가장 긴 이름 매치를 우선하고,
+        같은 이름을 가진 향수가 여러 개면 언급된 브랜드 → 이름 종류 → 짧은 이름 순으로 고릅니다.
+
+        Args:
+            brands: 문장에 언급된 브랜드 (BrandMatcher.mentions)
+            exclude_keys: 노트/어코드와 같은 이름 ("Rose" 등). 브랜드가 함께 언급된 경우만 향수로 인정
+        """
+        compact = _compact(text)
+        if not compact:
+            return None
+        mentioned = {_compact(b) for b in brands}
+        excluded = set(exclude_keys)
+
+        best: Optional[Tuple[Tuple, PerfumeMatch]] = None
+        for _start, key in self._key_index.find(compact):
+            entries = self._by_key[key]
+            if key in excluded:
+                entries = [e for e in entries if _compact(e[1].brand) in mentioned]
+            if not entries:
+                continue
+            # 브랜드 언급이 있으면 해당 브랜드의 향수만 후보로 사용
+            branded = [e for e in entries if _compact(e[1].brand) in mentioned]
+            candidates = sorted(branded or entries, key=lambda e: (e[0], len(e[1].name), e[1].id))
+            rank, entry = candidates[0]
+            other_brands = {_compact(e[1].brand) for e in candidates} - {_compact(entry.brand)}
+            if other_brands:
+                confidence, ambiguous = 0.6, True
+            elif branded:
+                confidence, ambiguous = 0.95, False
+            else:
+                # 검색 키워드 중 짧은 것("블루" 등)은 일반 단어와 겹칠 수 있어 단독으로는 확정하지 않음
+                confidence = 0.9 if rank < 2 else (0.86 if len(key) >= 3 else 0.8)
+                ambiguous = False
+            match = PerfumeMatch(entry, confidence, key, ambiguous)
+            score = (len(key), confidence)
+            if best is None or score > best[0]:
+                best = (score, match)
+        return best[1] if best else None
+
+    def __len__(self) -> int:
+        return len(self._by_key)
+
+
+# ==========================================
+# 2. 노트 / 어코드 사전
+# ==========================================
+class IngredientDictionary:
+    """
+    Args:
+        notes: Catalog note names
+        accords: Catalog accord names
+        note_aliases / accord_aliases: Korean alias -> catalog name
+    """
+
+    def __init__(
+        self,
+        notes: Iterable[str],
+        accords: Iterable[str],
+        note_aliases: Optional[Dict[str, str]] = None,
+        accord_aliases: Optional[Dict[str, str]] = None,
+    ):
+        self._notes = self._build(notes, NOTE_ALIASES if note_aliases is None else note_aliases)
+        self._accords = self._build(accords, ACCORD_ALIASES if accord_aliases is None else accord_aliases)
+        self._index = _KeyIndex(list(self._notes) + list(self._accords))
+
+    @staticmethod
+    def _build(names: Iterable[str], aliases: Dict[str, str]) -> Dict[str, str]:
+        table = {_compact(name): name for name in names if name}
+        by_key = dict(table)
+        for alias, target in aliases.items():
+            name = table.get(_compact(target))
+            if name:
+                by_key[_compact(alias)] = name
+        return by_key
+
+    @property
+    def keys(self) -> set:
+        return set(self._notes) | set(self._accords)
+
+    def note(self, keyword: str) -> Optional[str]:
+        """키워드(카탈로그 이름 또는 한글 별칭)와 정확히 일치하는 카탈로그 노트명"""
+        return self._notes.get(_compact(keyword))
+
+    def find(self, text: str) -> Tuple[List[str], List[str]]:
+        """문장에 언급된 (노트, 어코드) 목록 (등장 순서, 중복 제거)"""
+        notes: List[str] = []
+        accords: List[str] = []
+        for _start, key in self._index.find(_compact(text)):
+            # 어코드와 노트에 모두 있는 이름은 어코드로 취급 ("Citrus", "Woody" 등)
+            if key in self._accords:
+                if self._accords[key] not in accords:
+                    accords.append(self._accords[key])
+            elif self._notes[key] not in notes:
+                notes.append(self._notes[key])
+        return notes, accords
+
+
+# ==========================================
+# 3. 분류기
+# ==========================================
+@dataclass(frozen=True)
+class InfoRouteDecision:
+    info_type: Optional[str]  # None이면 LLM으로 위임
+    confidence: float
+    reason: str
+    target_name: str = ""
+    target_id: Optional[int] = None
+    notes: List[str] = field(default_factory=list)
+    accords: List[str] = field(default_factory=list)
+
+    def as_state(self) -> Dict[str, Any]:
+        """info_supervisor_node가 반환할 InfoState 업데이트"""
+        update: Dict[str, Any] = {"info_type": self.info_type, "target_name": self.target_name}
+        if self.target_id is not None:
+            update["target_id"] = self.target_id
+        if self.notes or self.accords:
+            update["notes"] = list(self.notes)
+            update["accords"] = list(self.accords)
+        return update
+
+
+class InfoRouter:
+    """
+    Args:
+        perfume_index: async () -> loaded PerfumeNameIndex
+        vocabulary: async () -> catalog snapshot (version, notes, accords)
+        brand_detector: async text -> brands mentioned in the text
+        note_vector_lookup: async keywords -> {keyword: [catalog note, ...]} (batch vector search)
+        mode: off | rules
+        min_confidence: Minimum confidence for a local decision to be used
+    """
+
+    def __init__(
+        self,
+        perfume_index: Callable[[], Awaitable[PerfumeNameIndex]],
+        vocabulary: Callable[[], Awaitable[Any]],
+        brand_detector: Optional[Callable[[str], Awaitable[List[str]]]] = None,
+        note_vector_lookup: Optional[Callable[[List[str]], Awaitable[Dict[str, List[str]]]]] = None,
+        mode: str = INFO_ROUTER_MODE,
+        min_confidence: float = INFO_ROUTER_MIN_CONFIDENCE,
+    ):
+        self._perfume_index = perfume_index
+        self._vocabulary = vocabulary
+        self._brand_detector = brand_detector
+        self._note_vector_lookup = note_vector_lookup
+        self.mode = mode
+        self.min_confidence = min_confidence
+        self._ingredients: Optional[IngredientDictionary] = None
+        self._ingredients_version: Any = None
+        self.counts: Counter = Counter()
+
+    async def _ingredient_dictionary(self) -> IngredientDictionary:
+        snapshot = await self._vocabulary()
+        version = getattr(snapshot, "version", None)
+        # 카탈로그 스냅샷이 바뀔 때만 사전을 다시 만듦
+        if self._ingredients is None or version != self._ingredients_version:
+            self._ingredients = IngredientDictionary(snapshot.notes, snapshot.accords)
+            self._ingredients_version = version
+        return self._ingredients
+
+    async def resolve_notes(self, keywords: Sequence[str]) -> Dict[str, Optional[str]]:
+        """
+        노트 키워드 -> 카탈로그 노트명 (변환하지 못하면 None).
+        사전(한글 별칭 포함)에 있는 키워드는 바로 변환하고, 나머지만 모아
+        note_vector_lookup을 한 번 호출합니다 (임베딩 1회 + pgvector 1회).
+        """
+        ingredients = await self._ingredient_dictionary()
+        resolved = {k: ingredients.note(k) for k in keywords if k and k.strip()}
+        unknown = [k for k, note in resolved.items() if note is None]
+        if unknown and self._note_vector_lookup is not None:
+            try:
+                candidates = await self._note_vector_lookup(unknown)
+            except Exception as e:
+                print(f"⚠️ [InfoRouter] 노트 벡터 검색 실패: {e}", flush=True)
+                candidates = {}
+            for keyword in unknown:
+                matches = candidates.get(keyword.strip()) or []
+                resolved[keyword] = matches[0] if matches else None
+        return resolved
+
+    async def _brands_in(self, text: str) -> List[str]:
+        if self._brand_detector is None:
+            return []
+        return await self._brand_detector(text)
+
+    async def classify(self, text: str) -> InfoRouteDecision:
+        text = (text or "").strip()
+        if not text:
+            return InfoRouteDecision(None, 0.0, "empty")
+        if REFERENCE_PATTERN.search(text):
+            return InfoRouteDecision(None, 0.0, "reference")
+
+        brands = await self._brands_in(text)
+        ingredients = await self._ingredient_dictionary()
+        index = await self._perfume_index()
+        perfume = index.find(text, brands, exclude_keys=ingredients.keys)
+        notes, accords = ingredients.find(text)
+        similar = bool(SIMILAR_PATTERN.search(text))
+
+        if perfume is not None:
+            target = perfume.perfume
+            # 기존 info_supervisor 규칙: 향수가 특정되면 '비슷/추천/대체/같은'은 유사 추천
+            info_type = "similarity" if similar or RECOMMEND_PATTERN.search(text) else "perfume"
+            reason = f"perfume:{perfume.key}" + (":ambiguous" if perfume.ambiguous else "")
+            return InfoRouteDecision(
+                info_type, perfume.confidence, reason, target.display_name, target.id
+            )
+        if similar:
+            # "우디 계열 비슷한 거"처럼 기준 향수가 없는 유사 요청은 LLM 판단에 맡김
+            return InfoRouteDecision(None, 0.0, "similar-without-perfume")
+        if notes or accords:
+            if brands:
+                return InfoRouteDecision(None, 0.5, f"ingredient+brand:{brands[0]}")
+            info_type = "note" if notes else "accord"
+            return InfoRouteDecision(
+                info_type, 0.9, "ingredient", ", ".join(notes + accords), notes=notes, accords=accords
+            )
+        if len(brands) == 1 and BRAND_PATTERN.search(text):
+            return InfoRouteDecision("brand", 0.9, f"brand:{brands[0]}", brands[0])
+        return InfoRouteDecision(None, 0.0, "no-entity")
+
+    async def route(self, text: str) -> InfoRouteDecision:
+        """확신할 수 있으면 info_type을 채워 반환하고, 아니면 info_type=None (LLM 폴백)."""
+        if self.mode == "off":
+            return InfoRouteDecision(None, 0.0, "disabled")
+        try:
+            decision = await self.classify(text)
+        except Exception as e:
+            print(f"⚠️ [InfoRouter] 로컬 분류 실패: {e}")
+            decision = InfoRouteDecision(None, 0.0, "error")
+
+        if decision.info_type is not None and decision.confidence < self.min_confidence:
+            decision = InfoRouteDecision(None, decision.confidence, f"below-threshold:{decision.reason}")
+        self.counts[decision.info_type or "llm"] += 1
+        print(
+            f"      🧭 [InfoRouter] type={decision.info_type or 'llm'} target={decision.target_name or '-'} "
+            f"confidence={decision.confidence:.2f} reason={decision.reason}",
+            flush=True,
+        )
+        return decision
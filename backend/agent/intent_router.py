@@ -0,0 +1,258 @@
+# backend/agent/intent_router.py
+"""
+First-stage intent router in front of the supervisor LLM.
+
+Classifies the latest user message into interviewer / info_retrieval / writer
+without an LLM call when the signal is clear:
+1. keyword/regex rules (+ brand mentions from the catalog brand matcher)
+2. optional nearest-centroid over embeddings of labelled examples
+   (INTENT_ROUTER_MODE=embedding)
+
+Anything below the confidence threshold returns route=None and the supervisor
+falls back to the LLM. Every decision is logged with its confidence so the
+thresholds can be tuned from logs.
+"""
+
+import math
+import os
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence
+
+from .cache_utils import AsyncSingleFlight
+
+# off | rules | embedding (rules 다음 단계로 임베딩 최근접 중심 분류까지 사용)
+INTENT_ROUTER_MODE = os.getenv("INTENT_ROUTER_MODE", "rules").lower()
+INTENT_ROUTER_MIN_CONFIDENCE = float(os.getenv("INTENT_ROUTER_MIN_CONFIDENCE", "0.8"))
+INTENT_EMBED_MIN_SIMILARITY = float(os.getenv("INTENT_EMBED_MIN_SIMILARITY", "0.55"))
+# 1, 2위 중심과의 유사도 차이가 이보다 작으면 모호한 입력으로 보고 LLM에 넘김
+INTENT_EMBED_MIN_MARGIN = 0.05
+
+# ==========================================
+# 규칙 (SUPERVISOR_PROMPT의 분류 기준과 동일한 의미)
+# ==========================================
+SIMILAR_PATTERN = re.compile(r"비슷한|비슷하|유사한|대체할|대신할|같은\s*느낌|같은\s*향|닮은|느낌\s*나는|계열")
+FACT_PATTERN = re.compile(
+    r"뭐야|뭔가요|뭐예요|뭐에요|무엇|설명|알려\s*줘|알려\s*주|어떤\s*향이|무슨\s*향|노트\s*구성|"
+    r"탑\s*노트|미들\s*노트|베이스\s*노트|성분|지속력|발향|출시|조향사|어떤\s*브랜드"
+)
+# 특정 대상(브랜드/향수/노트)을 묻는 정의형 질문 ("베티버가 뭐야?", "탑 노트란 무엇")
+DEFINITION_PATTERN = re.compile(
+    r"[가-힣A-Za-z0-9]\s*(?:이|가|은|는|란|이란)\s*(?:뭐야|뭔가요|뭐예요|뭐에요|무엇)"
+)
+# 취향/상황 조건 ("지속력 좋은", "베르가못 들어간", "우디한 향수", "데이트할 때", "출근용", "비 오는 날")
+# -> "알려줘"가 붙어도 사실 질문이 아니라 추천 요청
+PREFERENCE_PATTERN = re.compile(
+    r"좋은|좋을|들어간|들어가는|들어\s*있는|[가-힣]한\s*(?:향|느낌|거|걸)|할\s*때|하기\s*좋|"
+    r"(?<=[가-힣])(?<!사)용(?=\s|으로|[?!.,]|$)|날에?\s|계절|분위기"
+)
+RECOMMEND_PATTERN = re.compile(
+    r"추천|골라\s*줘|골라\s*주|뭐\s*사|뭘\s*사|선물|뿌릴\s*만한|뿌리기\s*좋은|어울리는|찾고\s*있|찾아\s*줘|있어\?|있을까"
+)
+SMALLTALK_PATTERN = re.compile(
+    r"^\s*(안녕|하이|헬로|hi|hello|hey|ㅎㅇ|반가워|반갑|고마워|감사|ㅋㅋ|ㅎㅎ|잘\s*가|바이)|"
+    r"너\s*누구|넌\s*누구|뭘\s*할\s*수|뭐\s*할\s*수|날씨|농담|심심",
+    re.IGNORECASE,
+)
+DOMAIN_PATTERN = re.compile(
+    r"향수|향|뿌리|뿌릴|노트|어코드|브랜드|퍼퓸|코롱|perfume|fragrance|cologne|edp|edt", re.IGNORECASE
+)
+
+# 임베딩 분류용 라벨 예시 (INTENT_ROUTER_MODE=embedding)
+LABELLED_EXAMPLES: Dict[str, List[str]] = {
+    "interviewer": [
+        "여름에 뿌릴만한 향수 있어?",
+        "여자친구 선물로 향수 뭐 사지?",
+        "상큼한 향수 추천해줘",
+        "출근할 때 쓰기 좋은 은은한 향 찾고 있어",
+        "20대 남자한테 어울리는 향수 골라줘",
+        "겨울 데이트용으로 포근한 향 추천해줄래?",
+    ],
+    "info_retrieval": [
+        "샤넬 넘버5 노트 알려줘",
+        "베티버가 뭐야?",
+        "딥티크 브랜드 설명해줘",
+        "디올 쁘아종이랑 비슷한 향수 추천해줘",
+        "블랙베리 앤 베이 같은 느낌의 향수 있어?",
+        "조말론 우드 세이지랑 비슷한 거 찾아줘",
+    ],
+    "writer": [
+        "안녕",
+        "오늘 날씨 어때?",
+        "너 누구야?",
+        "고마워!",
+        "심심한데 농담 하나 해줘",
+        "넌 뭘 할 수 있어?",
+    ],
+}
+
+
+@dataclass(frozen=True)
+class IntentDecision:
+    route: Optional[str]  # None이면 LLM으로 위임
+    confidence: float
+    method: str  # rules | embedding | none
+    reason: str = ""
+
+
+def _cosine(a: List[float], b: List[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+def _centroid(vectors: List[List[float]]) -> List[float]:
+    vectors = [v for v in vectors if v]
+    if not vectors:
+        return []
+    return [sum(col) / len(vectors) for col in zip(*vectors)]
+
+
+class IntentRouter:
+    """
+    Args:
+        brand_detector: async text -> brands mentioned in the text (e.g. BrandMatcher.mentions)
+        embed: async texts -> vectors, used only in embedding mode
+        mode: off | rules | embedding
+        min_confidence: Minimum confidence for a local decision to be used
+    """
+
+    def __init__(
+        self,
+        brand_detector: Optional[Callable[[str], Awaitable[List[str]]]] = None,
+        embed: Optional[Callable[[List[str]], Awaitable[List[List[float]]]]] = None,
+        mode: str = INTENT_ROUTER_MODE,
+        min_confidence: float = INTENT_ROUTER_MIN_CONFIDENCE,
+        examples: Optional[Dict[str, List[str]]] = None,
+    ):
+        self._brand_detector = brand_detector
+        self._embed = embed
+        self.mode = mode
+        self.min_confidence = min_confidence
+        self._examples = examples or LABELLED_EXAMPLES
+        self._centroids: Optional[Dict[str, List[float]]] = None
+        self._singleflight = AsyncSingleFlight()
+        self.counts: Counter = Counter()
+
+    # ---------- 1단계: 규칙 ----------
+    async def _brands_in(self, text: str) -> List[str]:
+        if self._brand_detector is None:
+            return []
+        try:
+            return await self._brand_detector(text)
+        except Exception as e:
+            print(f"⚠️ [IntentRouter] 브랜드 탐지 실패: {e}")
+            return []
+
+    def classify_rules(self, text: str, brands: Sequence[str] = ()) -> IntentDecision:
+        text = (text or "").strip()
+        if not text:
+            return IntentDecision(None, 0.0, "none", "empty")
+
+        similar = bool(SIMILAR_PATTERN.search(text))
+        fact = bool(FACT_PATTERN.search(text))
+        recommend = bool(RECOMMEND_PATTERN.search(text))
+        smalltalk = bool(SMALLTALK_PATTERN.search(text))
+        preference = bool(PREFERENCE_PATTERN.search(text))
+        domain = bool(brands) or bool(DOMAIN_PATTERN.search(text))
+
+        # 특정 제품(브랜드 언급)을 기준으로 한 유사 추천 -> info_retrieval
+        if similar and brands:
+            return IntentDecision("info_retrieval", 0.95, "rules", f"similar+brand:{brands[0]}")
+        # 향수와 무관한 짧은 인사/잡담 ("넌 뭘 할 수 있어?"가 추천으로 잡히지 않도록 먼저 판단)
+        if smalltalk and not domain:
+            if len(text) <= 30 and not (fact or recommend):
+                return IntentDecision("writer", 0.9, "rules", "smalltalk")
+            return IntentDecision(None, 0.5, "rules", "ambiguous:smalltalk")
+        if fact and not recommend:
+            # "지속력 좋은 향수 알려줘", "출근용 향수 설명해줘" 등 취향/상황 조건은 추천 요청
+            # (브랜드가 함께 있으면 "샤넬 중에 ~" 같은 브랜드 기반 추천일 수 있어 LLM 판단)
+            if preference:
+                if domain and not brands:
+                    return IntentDecision("interviewer", 0.85, "rules", "fact+preference")
+                return IntentDecision(None, 0.5, "rules", "ambiguous:fact,preference")
+            # 특정 브랜드/향수/노트를 묻는 사실 질문만 로컬 처리
+            # (향수 맥락이 없으면 "이름이 뭐야?" 같은 잡담일 수 있어 낮춤)
+            if brands or DEFINITION_PATTERN.search(text):
+                confidence = 0.92 if domain else 0.75
+                return IntentDecision("info_retrieval", confidence, "rules", "fact")
+            return IntentDecision(None, 0.5, "rules", "ambiguous:fact-without-entity")
+        # 브랜드 없는 취향 기반 추천 요청
+        if recommend and not similar and not brands:
+            confidence = 0.9 if domain else 0.75
+            return IntentDecision("interviewer", confidence, "rules", "recommend")
+
+        # "시트러스 계열 비슷한 거 추천", "샤넬 향수 추천해줘" 등은 LLM 판단에 맡김
+        signals = [
+            name
+            for name, on in (("similar", similar), ("fact", fact), ("recommend", recommend))
+            if on
+        ]
+        return IntentDecision(None, 0.0, "rules", "ambiguous:" + ",".join(signals or ["no-signal"]))
+
+    # ---------- 2단계: 임베딩 최근접 중심 ----------
+    async def _get_centroids(self) -> Dict[str, List[float]]:
+        if self._centroids is not None:
+            return self._centroids
+
+        async def _build():
+            labels, texts = [], []
+            for route, samples in self._examples.items():
+                labels.extend([route] * len(samples))
+                texts.extend(samples)
+            vectors = await self._embed(texts)
+            grouped: Dict[str, List[List[float]]] = {}
+            for route, vector in zip(labels, vectors):
+                grouped.setdefault(route, []).append(vector)
+            centroids = {route: _centroid(vs) for route, vs in grouped.items()}
+            # 임베딩 실패 시 빈 벡터가 남으므로 캐시하지 않고 다음 요청에서 재시도
+            if all(centroids.values()):
+                self._centroids = centroids
+            return centroids
+
+        return await self._singleflight.do("centroids", _build)
+
+    async def classify_embedding(self, text: str) -> IntentDecision:
+        centroids = await self._get_centroids()
+        vector = (await self._embed([text]))[0]
+        if not vector or not all(centroids.values()):
+            return IntentDecision(None, 0.0, "embedding", "embedding-unavailable")
+
+        scored = sorted(
+            ((_cosine(vector, c), route) for route, c in centroids.items()), reverse=True
+        )
+        (best, route), (second, _) = scored[0], scored[1]
+        if best < INTENT_EMBED_MIN_SIMILARITY or best - second < INTENT_EMBED_MIN_MARGIN:
+            return IntentDecision(None, round(best, 4), "embedding", f"low-margin:{route}")
+        # 유사도/마진을 0~1 confidence로 환산 (마진 0.15 이상이면 최대)
+        confidence = min(1.0, 0.7 + 2 * (best - second))
+        return IntentDecision(route, round(confidence, 4), "embedding", f"sim={best:.3f}")
+
+    # ---------- 진입점 ----------
+    async def route(self, text: str) -> IntentDecision:
+        """확신할 수 있으면 route를 채워 반환하고, 아니면 route=None (LLM 폴백)."""
+        if self.mode == "off":
+            return IntentDecision(None, 0.0, "none", "disabled")
+
+        decision = self.classify_rules(text, await self._brands_in(text))
+        undecided = decision.route is None or decision.confidence < self.min_confidence
+        if undecided and self.mode == "embedding" and self._embed is not None:
+            try:
+                embedded = await self.classify_embedding(text)
+                if embedded.route is not None:
+                    decision = embedded
+            except Exception as e:
+                print(f"⚠️ [IntentRouter] 임베딩 분류 실패: {e}")
+
+        if decision.route is not None and decision.confidence < self.min_confidence:
+            decision = IntentDecision(
+                None, decision.confidence, decision.method, f"below-threshold:{decision.route}"
+            )
+        self.counts[decision.route or "llm"] += 1
+        print(
+            f"   🧭 [IntentRouter] route={decision.route or 'llm'} confidence={decision.confidence:.2f} "
+            f"method={decision.method} reason={decision.reason}",
+            flush=True,
+        )
+        return decision
@@ -0,0 +1,115 @@
+# backend/agent/note_index.py
+"""
+In-memory note dictionary for typo-tolerant note lookup.
+
+Replaces the per-call "SELECT DISTINCT note + Levenshtein over every note" scan:
+- exact (case-insensitive) lookups are a dict hit
+- distance <= 2 candidates come from a symmetric-deletion index
+  (every note is stored under all of its 1-2 character deletions, the query's
+  deletions are looked up, and only those candidates are verified with Levenshtein)
+- the dictionary is loaded once per process; refreshes come from the catalog vocabulary
+  (CatalogVocabulary subscribers call load() with each new snapshot)
+"""
+
+import threading
+import time
+from collections import defaultdict
+from itertools import combinations
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from .brand_matcher import edit_distance
+
+MAX_EDIT_DISTANCE = 2
+# 원본 동작 유지: 3글자 미만 입력은 완전 일치만 허용
+MIN_FUZZY_LENGTH = 3
+
+
+def _deletes(word: str, max_distance: int) -> Set[str]:
+    """word에서 0~max_distance개의 문자를 지운 모든 변형."""
+    variants = {word}
+    for n in range(1, min(max_distance, len(word)) + 1):
+        for positions in combinations(range(len(word)), n):
+            variants.add("".join(ch for i, ch in enumerate(word) if i not in positions))
+    return variants
+
+
+class NoteDictionary:
+    """
+    Process-wide note dictionary with exact hash + symmetric-deletion fuzzy index.
+
+    Args:
+        loader: Returns every note name (called once, on first use)
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[], Iterable[str]],
+        max_distance: int = MAX_EDIT_DISTANCE,
+    ):
+        self._loader = loader
+        self.max_distance = max_distance
+        self._exact: Dict[str, str] = {}
+        self._deletion_index: Dict[str, Set[str]] = {}
+        self._loaded_at: Optional[float] = None
+        self._load_lock = threading.Lock()
+
+    # ---------- 적재 ----------
+    def load(self, notes: Iterable[str]) -> None:
+        """인덱스를 새로 만든 뒤 참조를 한 번에 교체합니다 (조회 중인 요청은 이전 인덱스를 계속 사용)."""
+        exact: Dict[str, str] = {}
+        deletion_index: Dict[str, Set[str]] = defaultdict(set)
+        for note in notes:
+            if not note:
+                continue
+            key = note.strip().lower()
+            if key in exact:
+                continue
+            exact[key] = note
+            for variant in _deletes(key, self.max_distance):
+                deletion_index[variant].add(key)
+        self._exact, self._deletion_index = exact, dict(deletion_index)
+        self._loaded_at = time.monotonic()
+
+    def refresh(self) -> None:
+        notes = list(self._loader())
+        self.load(notes)
+        print(f"✅ [NoteDictionary] 노트 {len(self._exact)}개 인덱싱 완료")
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._loaded_at is not None
+
+    def ensure_loaded(self) -> None:
+        if self.is_loaded:
+            return
+        with self._load_lock:
+            if not self.is_loaded:
+                self.refresh()
+
+    # ---------- 조회 ----------
+    def lookup(self, keyword: str) -> List[str]:
+        """완전 일치가 있으면 [노트], 없으면 편집 거리 2 이내 노트를 거리순으로 반환합니다."""
+        self.ensure_loaded()
+        key = (keyword or "").strip().lower()
+        if not key:
+            return []
+        exact = self._exact.get(key)
+        if exact:
+            return [exact]
+        if len(key) < MIN_FUZZY_LENGTH:
+            return []
+
+        candidates: Set[str] = set()
+        for variant in _deletes(key, self.max_distance):
+            candidates.update(self._deletion_index.get(variant, ()))
+
+        scored = []
+        for candidate in candidates:
+            dist = edit_distance(key, candidate)
+            if dist <= self.max_distance:
+                scored.append((dist, candidate))
+        scored.sort()
+        return [self._exact[candidate] for _, candidate in scored]
+
+    def __len__(self) -> int:
+        return len(self._exact)
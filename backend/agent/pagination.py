@@ -0,0 +1,80 @@
+# backend/agent/pagination.py
+"""
+Keyset cursors and HTTP conditional responses for the chat list/history APIs.
+
+- Cursors are opaque base64url tokens wrapping the sort key of the last row
+  of a page, e.g. (last_chat_dt, thread_id) or (created_dt, message primary key).
+- conditional_json_response adds ETag / Last-Modified and answers 304 when the
+  client already has the same page.
+"""
+
+import base64
+import hashlib
+import json
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Optional, Sequence, Tuple
+
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(created_at: datetime, key: Any) -> str:
+    raw = json.dumps([created_at.isoformat(), key], ensure_ascii=False)
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, key = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(created_at), key
+    except Exception as e:
+        raise InvalidCursor(f"invalid cursor: {cursor}") from e
+
+
+def _as_utc(value: datetime) -> datetime:
+    # DB 타임스탬프(timezone 없음)는 UTC로 간주
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        candidates = {tag.strip() for tag in if_none_match.split(",")}
+        return etag in candidates or "*" in candidates
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = _as_utc(parsedate_to_datetime(if_modified_since))
+        except (TypeError, ValueError):
+            return False
+        # HTTP 날짜는 초 단위이므로 비교도 초 단위로
+        return _as_utc(last_modified).replace(microsecond=0) <= since
+    return False
+
+
+def conditional_json_response(
+    request: Request, payload: Any, last_modified: Optional[datetime] = None
+) -> Response:
+    """ETag(본문 해시) / Last-Modified 헤더를 붙이고, 변경이 없으면 304를 반환합니다."""
+    body = json.dumps(payload, ensure_ascii=False, default=str, separators=(",", ":"))
+    etag = 'W/"' + hashlib.sha1(body.encode("utf-8")).hexdigest() + '"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(_as_utc(last_modified), usegmt=True)
+
+    if _not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(content=json.loads(body), headers=headers)
+
+
+def latest(values: Sequence[Optional[datetime]]) -> Optional[datetime]:
+    present = [v for v in values if v is not None]
+    return max(present) if present else None
@@ -0,0 +1,88 @@
+# backend/agent/prompt_layout.py
+"""
+Prompt assembly for provider-side prompt caching.
+
+OpenAI caches the longest previously-seen prompt prefix (>= 1024 tokens), so
+every request is laid out as
+
+    [System: static instructions + static blocks (dictionaries, output rules)]
+    [conversation history]
+    [Human: per-request data, most volatile last]
+
+Static parts never contain request data and are joined in a fixed order, so
+the three writer sections and the three planner calls of one request share
+the same byte-identical prefix. PromptCacheStats aggregates the cached-token
+ratio reported in API usage fields, per call site.
+"""
+
+import threading
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Sequence
+
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+
+STATIC_BLOCK_SEPARATOR = "\n\n"
+
+
+def layout_messages(
+    system: str,
+    static_blocks: Sequence[str] = (),
+    history: Sequence[BaseMessage] = (),
+    volatile: Sequence[str] = (),
+) -> List[BaseMessage]:
+    """
+    Args:
+        system: Static system prompt (no request data)
+        static_blocks: Extra static sections appended to the system prompt in the given order
+        history: Conversation messages (stable for a thread, grows at the end)
+        volatile: Per-request parts for the final user message, least to most volatile
+    """
+    system_text = STATIC_BLOCK_SEPARATOR.join([system, *[b for b in static_blocks if b]])
+    messages: List[BaseMessage] = [SystemMessage(content=system_text)]
+    messages.extend(history)
+    parts = [p for p in volatile if p]
+    if parts:
+        messages.append(HumanMessage(content="\n".join(parts)))
+    return messages
+
+
+class PromptCacheStats:
+    """usage_metadata의 input_tokens / cache_read를 호출 지점(label)별로 누적합니다."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data: Dict[str, Dict[str, int]] = defaultdict(
+            lambda: {"calls": 0, "input_tokens": 0, "cached_tokens": 0}
+        )
+
+    def record(self, label: str, usage: Optional[Dict[str, Any]]) -> None:
+        if not usage:
+            return
+        input_tokens = int(usage.get("input_tokens") or 0)
+        details = usage.get("input_token_details") or {}
+        cached = int(details.get("cache_read") or 0)
+        with self._lock:
+            entry = self._data[label]
+            entry["calls"] += 1
+            entry["input_tokens"] += input_tokens
+            entry["cached_tokens"] += cached
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {
+                label: {
+                    **entry,
+                    "cached_ratio": round(entry["cached_tokens"] / entry["input_tokens"], 4)
+                    if entry["input_tokens"]
+                    else 0.0,
+                }
+                for label, entry in self._data.items()
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+# 프로세스 전역 통계 (graph.py / graph_info.py에서 기록)
+prompt_cache_stats = PromptCacheStats()
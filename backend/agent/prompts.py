@@ -167,7 +167,7 @@ RESEARCHER_SYSTEM_PROMPT = f"""
    - 헷갈리면 안전하게 **Accord**로 분류하세요.
 
 [데이터베이스 유효 값]
-- Seasons: {{SEASONS_STR}} | Occasions: {{OCCASIONS_STR}} | Accords/Notes: {{ACCORDS_STR}} | Genders: {{GENDERS_STR}}
+- Seasons: {SEASONS_STR} | Occasions: {OCCASIONS_STR} | Accords/Notes: {ACCORDS_STR} | Genders: {GENDERS_STR}
 
 [출력 규정]
 - **strategy_name, reason**: 반드시 '한글(Korean)'로 작성하세요.
@@ -454,6 +454,28 @@ Researcher가 전달한 **JSON 데이터(ResearcherOutput)**를 바탕으로 향
 [[SAVE:9876:Chanel No.5]]
 """
 
+# =================================================================
+# [최적화] 프롬프트 캐시용 정적 블록
+# - 요청마다 바뀌지 않는 지시문은 시스템 프롬프트 뒤에 고정 순서로 붙이고,
+#   섹션 번호/참고 데이터 등 요청별 값은 마지막 사용자 메시지로 보냅니다 (prompt_layout.py)
+# =================================================================
+WRITER_SECTION_OUTPUT_RULE = """
+[섹션 출력 규칙]
+- 마지막 사용자 메시지의 `[섹션 번호]`와 `[도입부 포함]` 값을 따르세요.
+- `[도입부 포함]`이 '아니오'이면 첫 줄을 반드시 `## {섹션 번호}.`로 시작하고 도입부 문장을 쓰지 마세요.
+"""
+
+RESEARCHER_TASK_INSTRUCTION = """
+[작업 지시]
+마지막 사용자 메시지의 '사용자 요청 데이터', '전략 이름', '우선순위'를 바탕으로 해당 전략 1개를 수립해 주세요.
+"""
+
+RESEARCHER_COMBINED_TASK_INSTRUCTION = """
+[작업 지시 - 통합 수립]
+마지막 사용자 메시지의 '사용자 요청 데이터'를 바탕으로 '전략 목록'의 모든 전략을 한 번에 수립해 주세요.
+- `plans`에는 전략 목록의 항목마다 정확히 1개의 계획을 넣고, `priority`와 `strategy_name`은 목록의 값을 그대로 사용하세요.
+"""
+
 
 NOTE_SELECTION_PROMPT = """
 당신은 향수 조향 전문가이자 이미지 컨설턴트입니다.
@@ -0,0 +1,180 @@
+# backend/agent/review_centroids.py
+"""
+Per-perfume review centroid vectors for fast reranking.
+
+The offline job (scripts/build_review_centroids.py) averages every review
+embedding of a perfume into one normalized centroid and keeps pointers to the
+most representative reviews. The reranker then scores each candidate with a
+single vector operation instead of scanning all of its reviews.
+
+Centroids live in two places:
+- TB_PERFUME_REVIEW_CENTROID_M (pgvector) for in-database scoring
+- a local .npz file used as a NumPy in-memory fallback when pgvector is unavailable
+"""
+
+import json
+import os
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+CENTROID_TABLE = "TB_PERFUME_REVIEW_CENTROID_M"
+REVIEW_CENTROID_PATH = os.getenv(
+    "REVIEW_CENTROID_PATH", os.path.join(os.getcwd(), ".cache", "review_centroids.npz")
+)
+# 대표 리뷰 포인터 개수
+TOP_REVIEW_COUNT = 3
+
+CENTROID_TABLE_DDL = f"""
+    CREATE TABLE IF NOT EXISTS {CENTROID_TABLE} (
+        PERFUME_ID INTEGER PRIMARY KEY,
+        CENTROID vector NOT NULL,
+        REVIEW_COUNT INTEGER NOT NULL,
+        TOP_REVIEW_IDS BIGINT[],
+        BEST_REVIEW TEXT,
+        UPDATED_DT TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+CENTROID_SCORE_SQL = f"""
+    SELECT PERFUME_ID as perfume_id,
+           1 - (CENTROID <=> %s::vector) as similarity_score,
+           BEST_REVIEW as best_review
+    FROM {CENTROID_TABLE}
+    WHERE PERFUME_ID IN ({{placeholders}})
+"""
+
+
+def to_pgvector_literal(vector: Sequence[float]) -> str:
+    """pgvector 텍스트 표현('[0.1,0.2,...]'). psycopg2/psycopg3 어느 쪽에서도 %s::vector로 사용 가능."""
+    return "[" + ",".join(f"{float(v):.7g}" for v in vector) + "]"
+
+
+def parse_pgvector(value: Any) -> np.ndarray:
+    """pgvector 어댑터 없이 조회한 vector 컬럼('[...]' 문자열)을 NumPy 배열로 변환합니다."""
+    if isinstance(value, str):
+        value = json.loads(value)
+    return np.asarray(value, dtype=np.float32)
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def compute_centroid(
+    embeddings: np.ndarray, review_ids: Sequence[int], top_n: int = TOP_REVIEW_COUNT
+) -> Tuple[np.ndarray, List[int]]:
+    """
+    Compute the normalized centroid of a perfume's review embeddings.
+
+    Args:
+        embeddings: (n_reviews, dim) matrix
+        review_ids: Review id per row
+        top_n: Number of representative review pointers to keep
+
+    Returns:
+        (centroid, top_review_ids) where top_review_ids are ordered by
+        cosine similarity to the centroid (most representative first)
+    """
+    normalized = _normalize_rows(np.asarray(embeddings, dtype=np.float32))
+    centroid = normalized.mean(axis=0)
+    norm = np.linalg.norm(centroid)
+    if norm > 0:
+        centroid = centroid / norm
+    sims = normalized @ centroid
+    order = np.argsort(-sims)[:top_n]
+    return centroid.astype(np.float32), [review_ids[i] for i in order]
+
+
+class CentroidIndex:
+    """
+    NumPy in-memory centroid index (fallback when pgvector scoring is unavailable).
+
+    Loaded lazily from the .npz file written by the offline job.
+    """
+
+    def __init__(self, path: Optional[str] = REVIEW_CENTROID_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._row_by_id: Dict[int, int] = {}
+        self._matrix: Optional[np.ndarray] = None
+        self._best_reviews: List[str] = []
+
+    @classmethod
+    def from_arrays(
+        cls, perfume_ids: Iterable[int], centroids: np.ndarray, best_reviews: Sequence[str]
+    ) -> "CentroidIndex":
+        index = cls(path=None)
+        index._set(list(perfume_ids), centroids, list(best_reviews))
+        return index
+
+    def _set(self, perfume_ids: List[int], centroids: np.ndarray, best_reviews: List[str]) -> None:
+        self._row_by_id = {int(pid): row for row, pid in enumerate(perfume_ids)}
+        self._matrix = _normalize_rows(np.asarray(centroids, dtype=np.float32))
+        self._best_reviews = best_reviews
+        self._loaded = True
+
+    def _ensure_loaded(self) -> bool:
+        if self._loaded:
+            return self._matrix is not None
+        with self._lock:
+            if self._loaded:
+                return self._matrix is not None
+            self._loaded = True
+            if not self.path or not os.path.exists(self.path):
+                return False
+            try:
+                data = np.load(self.path, allow_pickle=False)
+                self._set(
+                    data["perfume_ids"].tolist(),
+                    data["centroids"],
+                    data["best_reviews"].tolist(),
+                )
+                print(f"✅ [CentroidIndex] {len(self._row_by_id)}개 향수 centroid 로드: {self.path}")
+            except Exception as e:
+                print(f"⚠️ [CentroidIndex] centroid 파일 로드 실패: {e}")
+                self._matrix = None
+        return self._matrix is not None
+
+    @property
+    def available(self) -> bool:
+        return self._ensure_loaded()
+
+    def score(
+        self, query_vector: Sequence[float], perfume_ids: Sequence[int]
+    ) -> Optional[Dict[int, Dict[str, Any]]]:
+        """후보 향수별 {similarity_score, best_review}. 인덱스가 없으면 None."""
+        if not self._ensure_loaded():
+            return None
+        rows = [(pid, self._row_by_id[pid]) for pid in perfume_ids if pid in self._row_by_id]
+        if not rows:
+            return {}
+        query = np.asarray(query_vector, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm > 0:
+            query = query / norm
+        sims = self._matrix[[row for _, row in rows]] @ query
+        return {
+            pid: {"similarity_score": float(sim), "best_review": self._best_reviews[row]}
+            for (pid, row), sim in zip(rows, sims)
+        }
+
+
+def save_centroid_file(
+    path: str, perfume_ids: Sequence[int], centroids: np.ndarray, best_reviews: Sequence[str]
+) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    np.savez_compressed(
+        path,
+        perfume_ids=np.asarray(perfume_ids, dtype=np.int64),
+        centroids=np.asarray(centroids, dtype=np.float32),
+        best_reviews=np.asarray(best_reviews, dtype=str),
+    )
+
+
+# 프로세스 전역 인덱스 (database.rerank_perfumes_async에서 사용)
+centroid_index = CentroidIndex()
@@ -13,7 +13,9 @@ class InfoState(Dict):
     info_type: Literal["perfume", "note", "accord", "brand", "similarity", "unknown"] 
     
     target_name: str                 # 검색할 대상 이름
-    target_id: Optional[int]         # 검색할 대상 perfume_id (순번/대명사 해석 시 사용)
+    target_id: Optional[int]         # 검색할 대상 perfume_id (순번/대명사 해석, 로컬 라우터 이름 인덱스)
+    notes: Optional[List[str]]       # 로컬 라우터가 찾은 노트 (있으면 성분 분석 LLM 생략)
+    accords: Optional[List[str]]     # 로컬 라우터가 찾은 어코드
     
     # 검색 결과 데이터
     search_result: Optional[Dict]    # DB에서 찾은 Raw Data
@@ -0,0 +1,155 @@
+# backend/agent/sse.py
+"""
+SSE framing for the /chat stream.
+
+Consecutive answer tokens are coalesced into one frame until SSE_BATCH_MAX_DELAY
+has passed since the first buffered token or SSE_BATCH_MAX_BYTES is reached;
+other event types (log, error) flush the buffer and are sent immediately, so the
+event order is unchanged. The first answer frame is never delayed (TTFB).
+
+The event source runs in its own task behind a bounded queue (backpressure: a
+slow client stalls the graph instead of growing memory), and is cancelled as
+soon as the client disconnects.
+"""
+
+import asyncio
+import json
+import os
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+try:
+    import orjson
+
+    def dumps(payload: Dict[str, Any]) -> bytes:
+        return orjson.dumps(payload)
+
+except ImportError:
+
+    def dumps(payload: Dict[str, Any]) -> bytes:
+        return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+SSE_BATCH_MAX_DELAY = float(os.getenv("SSE_BATCH_MAX_DELAY", "0.02"))
+SSE_BATCH_MAX_BYTES = int(os.getenv("SSE_BATCH_MAX_BYTES", "256"))
+SSE_QUEUE_SIZE = int(os.getenv("SSE_QUEUE_SIZE", "256"))
+SSE_DISCONNECT_POLL_INTERVAL = float(os.getenv("SSE_DISCONNECT_POLL_INTERVAL", "0.5"))
+
+BATCHED_EVENT_TYPE = "answer"
+
+_DONE = object()
+
+
+def encode_event(payload: Dict[str, Any]) -> bytes:
+    return b"data: " + dumps(payload) + b"\n\n"
+
+
+class _Failure:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+async def stream_sse(
+    events: AsyncIterator[Dict[str, Any]],
+    is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None,
+    max_delay: float = SSE_BATCH_MAX_DELAY,
+    max_bytes: int = SSE_BATCH_MAX_BYTES,
+    queue_size: int = SSE_QUEUE_SIZE,
+    poll_interval: float = SSE_DISCONNECT_POLL_INTERVAL,
+    on_disconnect: Optional[Callable[[], None]] = None,
+) -> AsyncIterator[bytes]:
+    """
+    Args:
+        events: Payload dicts ({"type": ..., "content": ...}) in send order
+        is_disconnected: Request.is_disconnected (None = no polling)
+        max_delay: Seconds an answer token may wait in the buffer
+        max_bytes: Buffered answer size (UTF-8 bytes) that forces a flush
+        queue_size: Payloads the producer may run ahead of the client
+        poll_interval: Seconds between disconnect checks
+        on_disconnect: Called once when a disconnect is detected
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, queue_size))
+
+    async def _produce():
+        try:
+            async for payload in events:
+                await queue.put(payload)
+        except asyncio.CancelledError:
+            raise
+        except BaseException as e:
+            await queue.put(_Failure(e))
+            return
+        await queue.put(_DONE)
+
+    producer = asyncio.create_task(_produce())
+
+    pending: List[str] = []
+    pending_bytes = 0
+    pending_since = 0.0
+    sent_answer = False
+    next_poll = time.monotonic() + poll_interval
+
+    def _flush() -> bytes:
+        nonlocal pending_bytes
+        frame = encode_event({"type": BATCHED_EVENT_TYPE, "content": "".join(pending)})
+        pending.clear()
+        pending_bytes = 0
+        return frame
+
+    try:
+        while True:
+            now = time.monotonic()
+            if is_disconnected is not None and now >= next_poll:
+                next_poll = now + poll_interval
+                if await is_disconnected():
+                    if on_disconnect is not None:
+                        on_disconnect()
+                    return
+
+            deadline = next_poll if is_disconnected is not None else None
+            if pending:
+                flush_at = pending_since + max_delay
+                deadline = flush_at if deadline is None else min(deadline, flush_at)
+
+            try:
+                if deadline is None:
+                    item = await queue.get()
+                else:
+                    item = await asyncio.wait_for(queue.get(), max(0.0, deadline - time.monotonic()))
+            except asyncio.TimeoutError:
+                if pending and time.monotonic() >= pending_since + max_delay:
+                    yield _flush()
+                continue
+
+            if item is _DONE:
+                if pending:
+                    yield _flush()
+                return
+            if isinstance(item, _Failure):
+                if pending:
+                    yield _flush()
+                raise item.error
+
+            if item.get("type") == BATCHED_EVENT_TYPE and isinstance(item.get("content"), str):
+                content = item["content"]
+                if not content:
+                    continue
+                if not pending:
+                    pending_since = time.monotonic()
+                pending.append(content)
+                pending_bytes += len(content.encode("utf-8"))
+                if not sent_answer or pending_bytes >= max_bytes:
+                    sent_answer = True
+                    yield _flush()
+                continue
+
+            if pending:
+                yield _flush()
+            yield encode_event(item)
+    finally:
+        if not producer.done():
+            producer.cancel()
+            try:
+                await producer
+            except asyncio.CancelledError:
+                pass
@@ -0,0 +1,124 @@
+# backend/agent/strategy_plan_cache.py
+"""
+TTL cache for researcher-phase SearchStrategyPlan results.
+
+After the interviewer normalizes preferences, many users end up with the same
+preference set, and each of them used to pay for three planning calls. Plans are
+cached under (canonical preferences, strategy name, priority, prompt version);
+concurrent misses for the same key share one LLM call.
+"""
+
+import hashlib
+import json
+import os
+import re
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from .cache_utils import AsyncSingleFlight, LRUCache
+from .schemas import SearchStrategyPlan
+from .tracing import record_cache_lookup
+
+STRATEGY_PLAN_CACHE_TTL = float(os.getenv("STRATEGY_PLAN_CACHE_TTL", "21600"))
+STRATEGY_PLAN_CACHE_SIZE = int(os.getenv("STRATEGY_PLAN_CACHE_SIZE", "2048"))
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def _canonical_value(value: Any) -> Any:
+    if isinstance(value, str):
+        text = _WHITESPACE_RE.sub(" ", value).strip().casefold()
+        # "Rose, Musk" / "musk,rose" 처럼 순서만 다른 쉼표 목록은 같은 값으로 취급
+        if "," in text:
+            return ", ".join(sorted(p.strip() for p in text.split(",") if p.strip()))
+        return text
+    if isinstance(value, dict):
+        return canonicalize_preferences(value)
+    if isinstance(value, (list, tuple, set)):
+        items = [_canonical_value(v) for v in value]
+        return sorted(items, key=lambda v: json.dumps(v, ensure_ascii=False, sort_keys=True))
+    return value
+
+
+def canonicalize_preferences(prefs: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """빈 값(None, '', [])을 제거하고 문자열을 정규화한 선호 정보"""
+    canonical = {}
+    for key, value in (prefs or {}).items():
+        value = _canonical_value(value)
+        if value in (None, "", [], {}):
+            continue
+        canonical[str(key)] = value
+    return canonical
+
+
+def prompt_version(*parts: str) -> str:
+    """프롬프트/모델이 바뀌면 캐시 키도 바뀌도록 내용 해시를 버전으로 사용"""
+    digest = hashlib.sha1()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()[:12]
+
+
+class StrategyPlanCache:
+    """
+    Args:
+        version: Prompt version string (see prompt_version)
+        ttl: Seconds a plan stays valid (0 = caching disabled)
+        maxsize: Plans kept in the LRU
+    """
+
+    def __init__(
+        self,
+        version: str,
+        ttl: float = STRATEGY_PLAN_CACHE_TTL,
+        maxsize: int = STRATEGY_PLAN_CACHE_SIZE,
+    ):
+        self.version = version
+        self.enabled = ttl > 0
+        self._plans = LRUCache(maxsize=maxsize, ttl=ttl)
+        self._singleflight = AsyncSingleFlight()
+
+    def key(self, prefs: Optional[Dict[str, Any]], strategy_name: str, priority: int) -> str:
+        payload = json.dumps(
+            [self.version, strategy_name, priority, canonicalize_preferences(prefs)],
+            ensure_ascii=False,
+            sort_keys=True,
+        )
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+    async def get_or_plan(
+        self,
+        prefs: Optional[Dict[str, Any]],
+        strategy_name: str,
+        priority: int,
+        planner: Callable[[], Awaitable[SearchStrategyPlan]],
+    ) -> SearchStrategyPlan:
+        """캐시된 계획의 사본을 반환하고, 없으면 planner를 한 번만 호출해 저장합니다."""
+        if not self.enabled:
+            return await planner()
+
+        key = self.key(prefs, strategy_name, priority)
+        plan = self._plans.get(key)
+        record_cache_lookup("strategy_plan", plan is not None)
+        if plan is None:
+
+            async def _plan():
+                result = await planner()
+                self._plans.set(key, result.model_copy(deep=True))
+                return result
+
+            plan = await self._singleflight.do(key, _plan)
+        else:
+            print(f"      ⚡ [PlanCache] HIT: {strategy_name}", flush=True)
+        return plan.model_copy(deep=True)
+
+    @property
+    def hits(self) -> int:
+        return self._plans.hits
+
+    @property
+    def misses(self) -> int:
+        return self._plans.misses
+
+    def clear(self) -> None:
+        self._plans.clear()
@@ -1,17 +1,16 @@
 # backend/agent/tools.py
-import asyncio
 from langchain_core.tools import tool
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 # [수정] 비동기 처리를 위해 rerank_perfumes_async 임포트
 from .database import (
-    lookup_note_by_string,
-    lookup_note_by_vector,
-    search_perfumes,
+    lookup_note_by_string_async,
+    lookup_notes_by_vector_async,
+    search_perfumes_async,
     rerank_perfumes_async,
 )
 
-from .tools_schemas import LookupNoteInput, AdvancedSearchInput
+from .tools_schemas import LookupNoteInput, LookupNotesBatchInput, AdvancedSearchInput
 
 
 @tool(args_schema=LookupNoteInput)
@@ -20,8 +19,8 @@ async def lookup_note_by_string_tool(keyword: str) -> List[str]:
     사용자가 직접 입력한 구체적인 향료 이름의 오탈자를 교정합니다.
     - 명시적 노드를 Hard Filter용 표준 명칭으로 바꿀 때 사용하세요.
     """
-    # [최적화] 동기 DB 함수를 별도 스레드에서 실행하여 이벤트 루프 블로킹 방지
-    return await asyncio.to_thread(lookup_note_by_string, keyword)
+    # [최적화] 인메모리 노트 사전 조회 (최초 적재 이후 DB 접근 없음)
+    return await lookup_note_by_string_async(keyword)
 
 
 @tool(args_schema=LookupNoteInput)
@@ -30,27 +29,38 @@ async def lookup_note_by_vector_tool(keyword: str) -> List[str]:
     추상적인 향기 느낌이나 키워드와 관련된 실제 향료 후보군 10개를 검색합니다.
     - AI가 제안한 키워드를 실제 DB 노드로 변환할 때 사용하세요.
     """
-    # [최적화] 동기 함수를 비동기 스레드에서 처리
-    return await asyncio.to_thread(lookup_note_by_vector, keyword)
+    # [최적화] 비동기 임베딩 + 비동기 DB 조회 (배치 API를 키워드 1개로 사용)
+    results = await lookup_notes_by_vector_async([keyword])
+    return results.get(keyword.strip(), [])
 
 
-@tool(args_schema=AdvancedSearchInput)
-async def advanced_perfume_search_tool(
+@tool(args_schema=LookupNotesBatchInput)
+async def lookup_notes_by_vector_batch_tool(
+    keywords: List[str], top_k: int = 10
+) -> Dict[str, List[str]]:
+    """
+    여러 향기 키워드의 실제 향료 후보를 한 번에 검색합니다. (키워드별 top_k개)
+    - 노트 여러 개를 연달아 변환해야 할 때 단건 도구를 반복 호출하지 말고 이 도구를 사용하세요.
+    """
+    # [최적화] 임베딩 요청 1회 + pgvector 쿼리 1회
+    return await lookup_notes_by_vector_async(keywords, top_k=top_k)
+
+
+async def advanced_perfume_search_async(
     hard_filters: Dict[str, Any],
     strategy_filters: Dict[str, List[str]],
     exclude_ids: List[int],
     query_text: str,
+    query_vector: Optional[List[float]] = None,
 ) -> List[Dict[str, Any]]:
     """
-    [고도화된 비동기 검색 도구]
-    1. DB에서 조건에 맞는 향수 20개를 1차로 검색합니다. (병렬 처리 지원)
-    2. 비동기 LLM을 이용해 리뷰 데이터와 전략 의도를 매칭하여 재정렬합니다.
-    3. 최종 상위 5개를 반환합니다.
+    advanced_perfume_search_tool의 내부 구현.
+    - query_vector(미리 계산된 리랭킹 벡터)는 LLM용 도구 스키마에 노출하지 않고,
+      그래프 코드가 이 함수를 직접 호출할 때만 전달합니다.
     """
 
-    # 1. Broad Retrieval (Thread Pool 사용으로 병렬성 확보)
-    candidates = await asyncio.to_thread(
-        search_perfumes,
+    # 1. Broad Retrieval (비동기 커넥션 풀 사용으로 이벤트 루프 블로킹 없이 병렬 처리)
+    candidates = await search_perfumes_async(
         hard_filters=hard_filters,
         strategy_filters=strategy_filters,
         exclude_ids=exclude_ids,
@@ -62,14 +72,39 @@ async def advanced_perfume_search_tool(
 
     # 2. Semantic Reranking (비동기 LLM 호출)
     # [최적화] rerank_perfumes_async를 호출하여 검색 중 발생하는 지연을 최소화합니다.
-    final_results = await rerank_perfumes_async(candidates, query_text, top_k=5)
+    # (query_vector가 주어지면 번역/임베딩 없이 벡터 유사도만 계산합니다.)
+    final_results = await rerank_perfumes_async(
+        candidates, query_text, top_k=5, query_vector=query_vector
+    )
 
     return final_results
 
 
+@tool(args_schema=AdvancedSearchInput)
+async def advanced_perfume_search_tool(
+    hard_filters: Dict[str, Any],
+    strategy_filters: Dict[str, List[str]],
+    exclude_ids: List[int],
+    query_text: str,
+) -> List[Dict[str, Any]]:
+    """
+    [고도화된 비동기 검색 도구]
+    1. DB에서 조건에 맞는 향수 20개를 1차로 검색합니다. (병렬 처리 지원)
+    2. 비동기 LLM을 이용해 리뷰 데이터와 전략 의도를 매칭하여 재정렬합니다.
+    3. 최종 상위 5개를 반환합니다.
+    """
+    return await advanced_perfume_search_async(
+        hard_filters=hard_filters,
+        strategy_filters=strategy_filters,
+        exclude_ids=exclude_ids,
+        query_text=query_text,
+    )
+
+
 # Export tools list
 TOOLS = [
     lookup_note_by_string_tool,
     lookup_note_by_vector_tool,
+    lookup_notes_by_vector_batch_tool,
     advanced_perfume_search_tool,
 ]
@@ -1,4 +1,5 @@
 # backend/agent/tools_info.py
+import asyncio
 import json
 import re
 from typing import List, Dict, Any
@@ -7,7 +8,7 @@ from langchain_openai import ChatOpenAI
 from psycopg2.extras import RealDictCursor
 
 # DB 연결 함수
-from .database import get_db_connection, release_db_connection
+from .database import get_db_connection, release_db_connection, note_dictionary
 
 # 스키마 임포트
 from .tools_schemas_info import NoteSearchInput, AccordSearchInput, PerfumeIdSearchInput
@@ -159,10 +160,15 @@ async def lookup_perfume_by_id_tool(perfume_id: int) -> str:
     """
     perfume_id를 받아 향수 상세 정보를 반환합니다.
     """
+    # 동기 커넥션 풀을 사용하므로 조회는 스레드에서 실행 (이벤트 루프 블로킹 방지)
+    return await asyncio.to_thread(_lookup_perfume_by_id, perfume_id)
+
+
+def _lookup_perfume_by_id(perfume_id: int) -> str:
     conn = None
     cur = None
     try:
-        conn = await get_db_connection()
+        conn = get_db_connection()
         cur = conn.cursor(cursor_factory=RealDictCursor)
         
         sql = """
@@ -195,6 +201,11 @@ async def lookup_perfume_by_id_tool(perfume_id: int) -> str:
             release_db_connection(conn)
 
 
+def _all_catalog_notes(keywords: List[str]) -> bool:
+    # 인메모리 노트 사전의 완전 일치 결과가 자기 자신이면 카탈로그 노트명
+    return bool(keywords) and all(note_dictionary.lookup(k) == [k] for k in keywords)
+
+
 # =================================================================
 # Tool 2. 노트 정보 검색 (사전 + DB 병합)
 # =================================================================
@@ -212,9 +223,13 @@ def lookup_note_info_tool(keywords: List[str]) -> str:
     Output strictly JSON List.
     """
     try:
-        norm_result = NORMALIZER_LLM.invoke(normalization_prompt).content
-        cleaned = norm_result.replace("```json", "").replace("```", "").strip()
-        target_notes = json.loads(cleaned)
+        if _all_catalog_notes(keywords):
+            # [최적화] 이미 카탈로그 노트명으로 변환된 키워드는 정규화 LLM 호출 생략
+            target_notes = keywords
+        else:
+            norm_result = NORMALIZER_LLM.invoke(normalization_prompt).content
+            cleaned = norm_result.replace("```json", "").replace("```", "").strip()
+            target_notes = json.loads(cleaned)
     except:
         target_notes = keywords
 
@@ -11,6 +11,15 @@ class LookupNoteInput(BaseModel):
     )
 
 
+class LookupNotesBatchInput(BaseModel):
+    """여러 향기 키워드를 한 번에 실제 노트 후보로 변환하기 위한 입력 스키마"""
+
+    keywords: List[str] = Field(
+        description="노트 후보를 찾을 향기 키워드 목록 (예: ['숲의 향', '비 온 뒤 흙냄새'])"
+    )
+    top_k: int = Field(default=10, description="키워드별 반환할 노트 후보 수")
+
+
 # ==========================================
 # [Schema 2] 고도화된 향수 검색용 (Advanced Search) - [신규]
 # ==========================================
@@ -0,0 +1,286 @@
+# backend/agent/tracing.py
+"""
+Per-request tracing for the chat graph.
+
+main.py opens a RequestTrace for every /chat request and feeds it the
+astream_events stream, which yields
+
+- per-node wall time (on_chain_start/end of LangGraph nodes)
+- per-LLM-call time to first token, duration and token usage (on_chat_model_*)
+
+DB query time and cache lookups happen below the graph, so they report to the
+trace bound to the current context (contextvars are copied into the node tasks).
+
+Everything is exported as Prometheus metrics when prometheus_client is
+installed (GET /metrics), and written as one JSON line per request to
+TRACE_DIR/<thread_id>.jsonl when TRACE_DIR is set.
+"""
+
+import asyncio
+import contextvars
+import json
+import os
+import re
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+try:
+    from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    CONTENT_TYPE_LATEST = "text/plain; charset=utf-8"
+    PROMETHEUS_AVAILABLE = False
+
+TRACE_DIR = os.getenv("TRACE_DIR", "").strip()
+
+_LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 40, 80)
+_DB_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+
+if PROMETHEUS_AVAILABLE:
+    REQUEST_SECONDS = Histogram(
+        "chat_request_seconds", "Total /chat request time", ["route"], buckets=_LATENCY_BUCKETS
+    )
+    REQUEST_TTFT_SECONDS = Histogram(
+        "chat_request_ttft_seconds", "Time to first answer token of a /chat request", ["route"],
+        buckets=_LATENCY_BUCKETS,
+    )
+    NODE_SECONDS = Histogram(
+        "chat_node_seconds", "Graph node wall time", ["node"], buckets=_LATENCY_BUCKETS
+    )
+    LLM_TTFT_SECONDS = Histogram(
+        "chat_llm_ttft_seconds", "LLM time to first streamed token", ["node", "model"],
+        buckets=_LATENCY_BUCKETS,
+    )
+    LLM_SECONDS = Histogram(
+        "chat_llm_seconds", "LLM call duration", ["node", "model"], buckets=_LATENCY_BUCKETS
+    )
+    LLM_TOKENS = Counter(
+        "chat_llm_tokens", "LLM tokens by kind (input/output/cached)", ["node", "model", "kind"]
+    )
+    DB_QUERY_SECONDS = Histogram(
+        "chat_db_query_seconds", "Async DB query time", ["db"], buckets=_DB_BUCKETS
+    )
+    CACHE_LOOKUPS = Counter("chat_cache_lookups", "Cache lookups", ["cache", "result"])
+    PROMPT_CACHED_RATIO = Gauge(
+        "chat_prompt_cached_ratio", "Cached share of prompt tokens", ["label"]
+    )
+    CANCELLED_CALLS = Gauge("chat_cancelled_llm_calls", "LLM calls cancelled by disconnects", ["label"])
+    CANCELLED_TOKENS_SAVED = Gauge(
+        "chat_cancelled_est_tokens_saved", "Estimated tokens saved by cancellation", ["label"]
+    )
+
+_current_trace: contextvars.ContextVar[Optional["RequestTrace"]] = contextvars.ContextVar(
+    "chat_request_trace", default=None
+)
+
+
+def _model_label(metadata: Dict[str, Any]) -> str:
+    return str(metadata.get("ls_model_name") or "unknown")
+
+
+class RequestTrace:
+    """한 /chat 요청의 노드/LLM/DB/캐시 타이밍을 모읍니다."""
+
+    def __init__(self, thread_id: str):
+        self.thread_id = thread_id
+        self.started_at = time.time()
+        self._t0 = time.perf_counter()
+        self.route: Optional[str] = None
+        self.ttft: Optional[float] = None
+        self.total: Optional[float] = None
+        self.nodes: List[Dict[str, Any]] = []
+        self.llm_calls: List[Dict[str, Any]] = []
+        self.db = {"queries": 0, "seconds": 0.0}
+        self.cache: Dict[str, Dict[str, int]] = defaultdict(lambda: {"hit": 0, "miss": 0})
+        self._open: Dict[str, Dict[str, Any]] = {}
+        self._token = None
+
+    # ---------- context ----------
+    def __enter__(self):
+        self._token = _current_trace.set(self)
+        return self
+
+    def __exit__(self, *exc):
+        try:
+            _current_trace.reset(self._token)
+        except ValueError:
+            # 다른 컨텍스트에서 정리되는 경우 (제너레이터 GC 등)
+            _current_trace.set(None)
+        self.finish()
+        return False
+
+    def _elapsed(self) -> float:
+        return time.perf_counter() - self._t0
+
+    # ---------- astream_events ----------
+    def on_event(self, event: Dict[str, Any]) -> None:
+        kind = event.get("event")
+        run_id = str(event.get("run_id"))
+        metadata = event.get("metadata") or {}
+        node = metadata.get("langgraph_node", "")
+
+        if kind == "on_chain_start" and node and event.get("name") == node:
+            self._open[run_id] = {"node": node, "start": self._elapsed()}
+            # route: 마지막으로 실행된 최상위 노드 (서브그래프 내부 노드는 checkpoint_ns에 '|'가 포함됨)
+            top_level = "|" not in str(metadata.get("langgraph_checkpoint_ns", ""))
+            if top_level and node not in ("supervisor", "__start__"):
+                self.route = node
+        elif kind == "on_chain_end" and run_id in self._open:
+            opened = self._open.pop(run_id)
+            seconds = self._elapsed() - opened["start"]
+            self.nodes.append({"node": opened["node"], "start": round(opened["start"], 4), "seconds": round(seconds, 4)})
+            if PROMETHEUS_AVAILABLE:
+                NODE_SECONDS.labels(opened["node"]).observe(seconds)
+        elif kind == "on_chat_model_start":
+            self._open[run_id] = {
+                "node": node,
+                "model": _model_label(metadata),
+                "internal": "internal_helper" in (event.get("tags") or []),
+                "start": self._elapsed(),
+                "ttft": None,
+            }
+        elif kind == "on_chat_model_stream" and run_id in self._open:
+            opened = self._open[run_id]
+            chunk = (event.get("data") or {}).get("chunk")
+            if opened["ttft"] is None and getattr(chunk, "content", None):
+                opened["ttft"] = self._elapsed() - opened["start"]
+        elif kind == "on_chat_model_end" and run_id in self._open:
+            opened = self._open.pop(run_id)
+            output = (event.get("data") or {}).get("output")
+            self._record_llm(opened, getattr(output, "usage_metadata", None) or {})
+
+    def _record_llm(self, opened: Dict[str, Any], usage: Dict[str, Any]) -> None:
+        seconds = self._elapsed() - opened["start"]
+        details = usage.get("input_token_details") or {}
+        tokens = {
+            "input": int(usage.get("input_tokens") or 0),
+            "output": int(usage.get("output_tokens") or 0),
+            "cached": int(details.get("cache_read") or 0),
+        }
+        call = {
+            "node": opened["node"],
+            "model": opened["model"],
+            "internal": opened["internal"],
+            "start": round(opened["start"], 4),
+            "ttft": round(opened["ttft"], 4) if opened["ttft"] is not None else None,
+            "seconds": round(seconds, 4),
+            "tokens": tokens,
+        }
+        self.llm_calls.append(call)
+        if PROMETHEUS_AVAILABLE:
+            labels = (opened["node"] or "none", opened["model"])
+            LLM_SECONDS.labels(*labels).observe(seconds)
+            if opened["ttft"] is not None:
+                LLM_TTFT_SECONDS.labels(*labels).observe(opened["ttft"])
+            for kind, count in tokens.items():
+                if count:
+                    LLM_TOKENS.labels(*labels, kind).inc(count)
+
+    def mark_first_answer(self) -> None:
+        if self.ttft is None:
+            self.ttft = self._elapsed()
+
+    # ---------- DB / cache ----------
+    def add_db_query(self, db: str, seconds: float) -> None:
+        self.db["queries"] += 1
+        self.db["seconds"] += seconds
+
+    def add_cache_lookup(self, cache: str, hit: bool) -> None:
+        self.cache[cache]["hit" if hit else "miss"] += 1
+
+    # ---------- export ----------
+    def finish(self) -> None:
+        if self.total is not None:
+            return
+        self.total = self._elapsed()
+        route = self.route or "unknown"
+        if PROMETHEUS_AVAILABLE:
+            REQUEST_SECONDS.labels(route).observe(self.total)
+            if self.ttft is not None:
+                REQUEST_TTFT_SECONDS.labels(route).observe(self.ttft)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "thread_id": self.thread_id,
+            "started_at": self.started_at,
+            "route": self.route,
+            "ttft": round(self.ttft, 4) if self.ttft is not None else None,
+            "total": round(self.total, 4) if self.total is not None else None,
+            "nodes": self.nodes,
+            "llm_calls": self.llm_calls,
+            "db": {"queries": self.db["queries"], "seconds": round(self.db["seconds"], 4)},
+            "cache": {name: dict(counts) for name, counts in self.cache.items()},
+        }
+
+    async def write_json(self, trace_dir: str = TRACE_DIR) -> None:
+        """TRACE_DIR가 설정된 경우에만 thread_id별 JSONL 파일에 요청 trace를 추가합니다."""
+        if not trace_dir:
+            return
+        safe_name = re.sub(r"[^A-Za-z0-9_.-]", "_", self.thread_id or "unknown")
+        path = os.path.join(trace_dir, f"{safe_name}.jsonl")
+        line = json.dumps(self.to_dict(), ensure_ascii=False) + "\n"
+
+        def _append():
+            os.makedirs(trace_dir, exist_ok=True)
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(line)
+
+        try:
+            await asyncio.to_thread(_append)
+        except Exception as e:
+            print(f"⚠️ [Trace] 저장 실패 ({path}): {e}", flush=True)
+
+
+def record_db_query(db: str, seconds: float) -> None:
+    if PROMETHEUS_AVAILABLE:
+        DB_QUERY_SECONDS.labels(db).observe(seconds)
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add_db_query(db, seconds)
+
+
+def record_cache_lookup(cache: str, hit: bool) -> None:
+    if PROMETHEUS_AVAILABLE:
+        CACHE_LOOKUPS.labels(cache, "hit" if hit else "miss").inc()
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add_cache_lookup(cache, hit)
+
+
+def render_metrics() -> Optional[bytes]:
+    """Prometheus 텍스트 포맷 (prometheus_client 미설치 시 None)"""
+    if not PROMETHEUS_AVAILABLE:
+        return None
+    from .cancellation import cancellation_stats
+    from .prompt_layout import prompt_cache_stats
+
+    for label, entry in prompt_cache_stats.snapshot().items():
+        PROMPT_CACHED_RATIO.labels(label).set(entry["cached_ratio"])
+    for label, entry in cancellation_stats.snapshot()["cancelled"].items():
+        CANCELLED_CALLS.labels(label).set(entry["calls"])
+        CANCELLED_TOKENS_SAVED.labels(label).set(entry["est_tokens_saved"])
+    return generate_latest()
+
+
+async def trace_stream(events, trace: RequestTrace):
+    """
+    stream_generator의 payload를 그대로 전달하면서 trace를 현재 컨텍스트에 바인딩합니다.
+    첫 answer payload 시점을 TTFT로 기록하고, 종료 시 요약 로그와 JSON trace를 남깁니다.
+    """
+    with trace:
+        try:
+            async for payload in events:
+                if payload.get("type") == "answer":
+                    trace.mark_first_answer()
+                yield payload
+        finally:
+            trace.finish()
+            ttft = f"{trace.ttft:.2f}s" if trace.ttft is not None else "-"
+            print(
+                f"📊 [Trace] route={trace.route or '-'} ttft={ttft} total={trace.total:.2f}s "
+                f"llm={len(trace.llm_calls)} db={trace.db['queries']} ({trace.db['seconds']:.2f}s)",
+                flush=True,
+            )
+            await trace.write_json()
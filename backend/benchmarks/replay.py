@@ -0,0 +1,648 @@
+#!/usr/bin/env python3
+"""
+오프라인 재생(replay) 벤치마크
+
+녹화된 채팅 세션(corpus/sessions.json)을 실제 app_graph + /chat 스트림 로직
+(main.stream_generator)으로 재생해 라우트별 성능을 측정합니다. OpenAI/Postgres 없이 실행됩니다.
+
+- LLM: ReplayChatModel이 녹화된 응답을 재생합니다. 응답 지연은 모델별 프로파일
+  (첫 토큰 시간 / 초당 토큰 수)에 시드 고정 로그정규 분포 지터를 더해 재현합니다.
+- DB: FixtureDB(fixtures/perfumes.json)가 검색/조회 도구와 로그 저장을 대신하고,
+  쿼리 수와 지연(프로파일)을 기록합니다.
+
+출력: 라우트별 TTFT(첫 답변 토큰) / 전체 응답 시간 p50·p95, 요청당 DB 쿼리 수, LLM 호출 수
+
+실행 방법:
+    cd backend
+    python -m benchmarks.replay --repeat 5
+    python -m benchmarks.replay --repeat 5 --json > before.json
+    python -m benchmarks.replay --repeat 5 --baseline before.json --max-regression 0.2
+    python -m benchmarks.replay --speed 0      # 지연 없이 흐름/호출 수만 확인
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import math
+import os
+import random
+import re
+import statistics
+import sys
+import time
+import uuid
+from collections import Counter, defaultdict
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+from unittest import mock
+
+# agent 모듈 import 전에 오프라인 기본값 지정 (실제 키/DB는 사용하지 않음)
+os.environ.setdefault("OPENAI_API_KEY", "sk-offline-replay")
+os.environ.setdefault("CHECKPOINT_BACKEND", "memory")
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from langchain_core.language_models.chat_models import BaseChatModel  # noqa: E402
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage  # noqa: E402
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult  # noqa: E402
+from langchain_core.runnables import RunnableLambda  # noqa: E402
+
+from agent.info_router import InfoRouter, PerfumeNameIndex  # noqa: E402
+
+BENCH_DIR = Path(__file__).resolve().parent
+DEFAULT_CORPUS = BENCH_DIR / "corpus" / "sessions.json"
+DEFAULT_FIXTURE = BENCH_DIR / "fixtures" / "perfumes.json"
+
+_TOKEN_RE = re.compile(r"\S+\s*|\s+")
+
+
+class ReplayMiss(RuntimeError):
+    """녹화된 응답이 더 이상 없을 때 (그래프 흐름이 녹화 시점과 달라진 경우)"""
+
+
+# ==========================================
+# 1. 지연 모델
+# ==========================================
+class LatencyModel:
+    """
+    Args:
+        profiles: {"llm": {model: {"ttft_ms", "tokens_per_s"}}, "db": {kind: ms}, "jitter": sigma}
+        speed: 지연 배율 (1.0 = 녹화 프로파일 그대로, 0 = 지연 없음)
+        seed: 지터 난수 시드 (같은 시드 → 같은 지연 순서)
+    """
+
+    def __init__(self, profiles: Dict[str, Any], speed: float = 1.0, seed: int = 7):
+        self.profiles = profiles
+        self.speed = max(0.0, speed)
+        self.sigma = float(profiles.get("jitter", 0.25))
+        self._rng = random.Random(seed)
+
+    def _jitter(self, ms: float) -> float:
+        if self.speed == 0 or ms <= 0:
+            return 0.0
+        return ms / 1000 * self.speed * self._rng.lognormvariate(0, self.sigma)
+
+    def _llm(self, model: str) -> Dict[str, float]:
+        llm = self.profiles.get("llm", {})
+        return llm.get(model) or llm.get("default") or {"ttft_ms": 400, "tokens_per_s": 60}
+
+    def ttft(self, model: str, override_ms: Optional[float] = None) -> float:
+        return self._jitter(override_ms if override_ms is not None else self._llm(model)["ttft_ms"])
+
+    def per_token(self, model: str) -> float:
+        tps = self._llm(model)["tokens_per_s"]
+        return 0.0 if self.speed == 0 else self.speed / tps
+
+    def db(self, kind: str) -> float:
+        db = self.profiles.get("db", {})
+        return self._jitter(db.get(kind, db.get("default", 5)))
+
+
+# ==========================================
+# 2. 녹화 응답 재생
+# ==========================================
+def _prompt_text(messages: Any) -> str:
+    if isinstance(messages, str):
+        return messages
+    if isinstance(messages, BaseMessage):
+        return str(messages.content)
+    parts = []
+    for message in messages or []:
+        parts.append(str(getattr(message, "content", message)))
+    return "\n".join(parts)
+
+
+class ReplayHarness:
+    """현재 턴의 녹화 응답, 지연 모델, 호출 카운터를 보관합니다."""
+
+    def __init__(self, latency: LatencyModel):
+        self.latency = latency
+        self._responses: Dict[str, List[Dict[str, Any]]] = {}
+        self.llm_calls: Counter = Counter()
+        self.db_queries: Counter = Counter()
+        self.misses: List[str] = []
+
+    def load_turn(self, responses: Dict[str, List[Dict[str, Any]]]) -> None:
+        self._responses = {key: list(entries) for key, entries in responses.items()}
+
+    def take(self, key: str, prompt: str) -> Dict[str, Any]:
+        """match 문자열이 프롬프트에 포함된 첫 응답(없으면 match 없는 첫 응답)을 꺼냅니다."""
+        entries = self._responses.get(key) or []
+        for index, entry in enumerate(entries):
+            if entry.get("match") and entry["match"] in prompt:
+                self.llm_calls[key] += 1
+                return entries.pop(index)
+        for index, entry in enumerate(entries):
+            if not entry.get("match"):
+                self.llm_calls[key] += 1
+                return entries.pop(index)
+        self.misses.append(key)
+        raise ReplayMiss(f"녹화된 '{key}' 응답이 없습니다")
+
+    def unused(self) -> Dict[str, int]:
+        return {key: len(entries) for key, entries in self._responses.items() if entries}
+
+    async def db_query(self, kind: str) -> None:
+        self.db_queries[kind] += 1
+        delay = self.latency.db(kind)
+        if delay:
+            await asyncio.sleep(delay)
+
+
+class ReplayChatModel(BaseChatModel):
+    """녹화된 텍스트/구조화 응답을 프로파일 지연으로 재생하는 채팅 모델"""
+
+    harness: Any
+    label: str
+    model_name: str = "replay"
+    streaming: bool = True
+
+    @property
+    def _llm_type(self) -> str:
+        return "replay"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"model_name": self.model_name, "label": self.label}
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        entry = self.harness.take(self.label, _prompt_text(messages))
+        delay = self.harness.latency.ttft(self.model_name, entry.get("ttft_ms"))
+        delay += self.harness.latency.per_token(self.model_name) * len(_TOKEN_RE.findall(entry["text"]))
+        if delay:
+            time.sleep(delay)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=entry["text"]))])
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs) -> AsyncIterator[ChatGenerationChunk]:
+        prompt = _prompt_text(messages)
+        entry = self.harness.take(self.label, prompt)
+        latency = self.harness.latency
+        delay = latency.ttft(self.model_name, entry.get("ttft_ms"))
+        if delay:
+            await asyncio.sleep(delay)
+        tokens = _TOKEN_RE.findall(entry["text"])
+        for index, token in enumerate(tokens):
+            if index and latency.per_token(self.model_name):
+                await asyncio.sleep(latency.per_token(self.model_name))
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
+        # 스트림 마지막 청크의 usage (글자 수 기반 근사치)
+        yield ChatGenerationChunk(
+            message=AIMessageChunk(
+                content="",
+                usage_metadata={
+                    "input_tokens": len(prompt) // 2,
+                    "output_tokens": len(tokens),
+                    "total_tokens": len(prompt) // 2 + len(tokens),
+                },
+            )
+        )
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        text = ""
+        async for chunk in self._astream(messages, stop=stop, **kwargs):
+            text += chunk.message.content
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+    def with_structured_output(self, schema, **kwargs):
+        key = schema.__name__
+        harness = self.harness
+        model_name = self.model_name
+
+        def _delay(entry: Dict[str, Any]) -> float:
+            # 구조화 출력은 JSON 전체를 받은 뒤 파싱되므로 생성 시간 전체를 대기
+            tokens = len(json.dumps(entry["output"], ensure_ascii=False)) // 3
+            return harness.latency.ttft(model_name, entry.get("ttft_ms")) + harness.latency.per_token(
+                model_name
+            ) * tokens
+
+        def _invoke(messages):
+            entry = harness.take(key, _prompt_text(messages))
+            delay = _delay(entry)
+            if delay:
+                time.sleep(delay)
+            return schema.model_validate(entry["output"])
+
+        async def _ainvoke(messages):
+            entry = harness.take(key, _prompt_text(messages))
+            delay = _delay(entry)
+            if delay:
+                await asyncio.sleep(delay)
+            return schema.model_validate(entry["output"])
+
+        return RunnableLambda(_invoke, afunc=_ainvoke, name=f"replay_{key}")
+
+
+# ==========================================
+# 3. 로컬 DB 픽스처
+# ==========================================
+class _FixtureTool:
+    """langchain tool 자리에 들어가는 ainvoke/invoke 호환 객체"""
+
+    def __init__(self, afunc):
+        self._afunc = afunc
+
+    async def ainvoke(self, tool_input, config=None):
+        return await self._afunc(tool_input)
+
+    def invoke(self, tool_input, config=None):
+        return asyncio.run(self._afunc(tool_input))
+
+
+def _split(value: Optional[str]) -> List[str]:
+    return [v.strip() for v in (value or "").split(",") if v.strip()]
+
+
+class FixtureDB:
+    """fixtures/perfumes.json 기반 검색/조회 (쿼리 수/지연은 harness에 기록)"""
+
+    def __init__(self, fixture: Dict[str, Any], harness: ReplayHarness):
+        self.perfumes: List[Dict[str, Any]] = fixture["perfumes"]
+        self.notes: Dict[str, Any] = fixture.get("notes", {})
+        self.accords: Dict[str, Any] = fixture.get("accords", {})
+        self.harness = harness
+        # info 라우터 인덱스 (운영에서는 프로세스당 1회 적재되므로 쿼리 수에 포함하지 않음)
+        self._name_index = PerfumeNameIndex(self._name_rows, ttl=0)
+        self._vocabulary = SimpleNamespace(
+            version=1,
+            notes=sorted(
+                {n for p in self.perfumes for k in ("top_notes", "middle_notes", "base_notes") for n in _split(p[k])}
+                | set(self.notes)
+            ),
+            accords=sorted({a.title() for p in self.perfumes for a in _split(p["accords"])} | {a.title() for a in self.accords}),
+        )
+
+    def _name_rows(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                "perfume_id": p["id"],
+                "perfume_brand": p["brand"],
+                "perfume_name": p["name"],
+                "name_kr": None,
+                "search_keywords": ",".join(p.get("aliases", [])),
+            }
+            for p in self.perfumes
+        ]
+
+    async def perfume_index(self) -> PerfumeNameIndex:
+        self._name_index.ensure_loaded()
+        return self._name_index
+
+    async def vocabulary(self) -> SimpleNamespace:
+        return self._vocabulary
+
+    def _find(self, text: str) -> Optional[Dict[str, Any]]:
+        lowered = (text or "").strip().lower()
+        if not lowered:
+            return None
+        for perfume in self.perfumes:
+            names = [perfume["name"], *perfume.get("aliases", [])]
+            if any(name.lower() in lowered or lowered in name.lower() for name in names if name):
+                return perfume
+        return None
+
+    async def search(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        await self.harness.db_query("search")
+        hard = params.get("hard_filters") or {}
+        soft = params.get("strategy_filters") or {}
+        exclude = set(params.get("exclude_ids") or [])
+        gender = hard.get("gender")
+        wanted = {v.lower() for key in ("accord", "note") for v in (soft.get(key) or [])}
+        scored = []
+        for perfume in self.perfumes:
+            if perfume["id"] in exclude:
+                continue
+            if gender and gender != "Unisex" and perfume["gender"] not in (gender, "Unisex"):
+                continue
+            profile = {
+                v.lower()
+                for v in _split(perfume["accords"])
+                + _split(perfume["top_notes"])
+                + _split(perfume["middle_notes"])
+                + _split(perfume["base_notes"])
+            }
+            score = len(wanted & profile)
+            if wanted and not score:
+                continue
+            scored.append((-score, perfume["id"], perfume))
+        return [dict(p) for _, _, p in sorted(scored)[:5]]
+
+    async def perfume_info(self, name: str) -> str:
+        await self.harness.db_query("lookup")
+        perfume = self._find(name)
+        return json.dumps(perfume, ensure_ascii=False) if perfume else "검색 실패: 향수를 찾을 수 없습니다."
+
+    async def perfume_by_id(self, params: Dict[str, Any]) -> str:
+        await self.harness.db_query("lookup")
+        for perfume in self.perfumes:
+            if perfume["id"] == params.get("perfume_id"):
+                return json.dumps(perfume, ensure_ascii=False)
+        return "{}"
+
+    async def _dictionary(self, table: Dict[str, Any], params: Dict[str, Any]) -> str:
+        await self.harness.db_query("lookup")
+        by_key = {key.lower(): value for key, value in table.items()}
+        found = {k: by_key[k.lower()] for k in params.get("keywords", []) if k.lower() in by_key}
+        return json.dumps(found, ensure_ascii=False)
+
+    async def note_info(self, params: Dict[str, Any]) -> str:
+        return await self._dictionary(self.notes, params)
+
+    async def accord_info(self, params: Dict[str, Any]) -> str:
+        return await self._dictionary(self.accords, params)
+
+    async def note_vectors(self, keywords: List[str]) -> Dict[str, List[str]]:
+        # 배치 벡터 검색 대용: 키워드 전체를 쿼리 1회로 처리 (이름 포함 여부로 근사)
+        await self.harness.db_query("note_vector")
+        return {
+            k.strip(): [n for n in self._vocabulary.notes if n.lower() in k.lower()][:1]
+            for k in keywords
+        }
+
+    async def similar(self, name: str) -> str:
+        await self.harness.db_query("search")
+        base = self._find(name)
+        if not base:
+            return "검색 실패: 기준 향수를 찾을 수 없습니다."
+        base_accords = set(_split(base["accords"]))
+        ranked = sorted(
+            (p for p in self.perfumes if p["id"] != base["id"]),
+            key=lambda p: (-len(base_accords & set(_split(p["accords"]))), p["id"]),
+        )
+        return json.dumps({"base": base["name"], "similar": ranked[:3]}, ensure_ascii=False)
+
+    async def brand_mentions(self, text: str) -> List[str]:
+        # 운영에서는 인메모리 BrandMatcher 조회이므로 DB 쿼리로 세지 않음
+        lowered = text.lower()
+        brands = set()
+        for perfume in self.perfumes:
+            names = [perfume["brand"], *perfume.get("brand_aliases", [])]
+            if any(name.lower() in lowered for name in names):
+                brands.add(perfume["brand"])
+        return sorted(brands)
+
+    async def write(self, *args, **kwargs) -> None:
+        await self.harness.db_query("write")
+
+
+# ==========================================
+# 4. 패치 + 세션 재생
+# ==========================================
+@contextlib.contextmanager
+def replay_environment(harness: ReplayHarness, db: FixtureDB, models: Dict[str, str]) -> Iterator[Any]:
+    """app_graph가 참조하는 LLM/DB 전역을 재생용 객체로 교체하고, main 모듈을 반환합니다."""
+    import main
+    from agent import graph as graph_mod
+    from agent import graph_info as info_mod
+
+    def llm(label: str) -> ReplayChatModel:
+        return ReplayChatModel(harness=harness, label=label, model_name=models.get(label, label))
+
+    smart = llm("smart")
+    patches = {
+        graph_mod: {
+            "SMART_LLM": smart,
+            "SUPER_SMART_LLM": llm("writer"),
+            "SUPERVISOR_LLM": smart.with_structured_output(graph_mod.RoutingDecision),
+            "INTERVIEWER_LLM": smart.with_structured_output(graph_mod.InterviewResult),
+            "advanced_perfume_search_async": lambda **params: db.search(params),
+            "save_recommendation_log_async": db.write,
+            "find_brand_mentions_async": db.brand_mentions,
+            "build_query_vector_async": lambda text: asyncio.sleep(0, result=None),
+        },
+        info_mod: {
+            "INFO_LLM": llm("info"),
+            "ROUTER_LLM": llm("router"),
+            "lookup_perfume_info_tool": _FixtureTool(db.perfume_info),
+            "lookup_perfume_by_id_tool": _FixtureTool(db.perfume_by_id),
+            "lookup_note_info_tool": _FixtureTool(db.note_info),
+            "lookup_accord_info_tool": _FixtureTool(db.accord_info),
+            "lookup_similar_perfumes_tool": _FixtureTool(db.similar),
+            "info_router": InfoRouter(
+                perfume_index=db.perfume_index,
+                vocabulary=db.vocabulary,
+                brand_detector=db.brand_mentions,
+                note_vector_lookup=db.note_vectors,
+            ),
+        },
+        main: {"log_chat_message": db.write},
+    }
+    with contextlib.ExitStack() as stack:
+        for module, attrs in patches.items():
+            for name, value in attrs.items():
+                stack.enter_context(mock.patch.object(module, name, value))
+        # 로컬 의도 분류는 그대로 사용하되 브랜드 조회는 픽스처로, 임베딩(OpenAI) 분류는 끔
+        stack.enter_context(mock.patch.object(graph_mod.intent_router, "_brand_detector", db.brand_mentions))
+        stack.enter_context(mock.patch.object(graph_mod.intent_router, "_embed", None))
+
+        async def _no_history(thread_id):
+            return []
+
+        stack.enter_context(mock.patch.object(main.chat_history_cache, "get", _no_history))
+        yield main
+
+
+INFO_NODES = ("perfume_describer", "ingredient_specialist", "similarity_curator", "fallback_handler")
+
+
+def _route_label(trace) -> str:
+    """info 서브그래프는 실제 답변 노드까지 구분 (예: info_retrieval_subgraph/perfume_describer)"""
+    route = trace.route or "unknown"
+    if route == "info_retrieval_subgraph":
+        inner = [n["node"] for n in trace.nodes if n["node"] in INFO_NODES]
+        if inner:
+            return f"{route}/{inner[-1]}"
+    return route
+
+
+async def _run_turn(main, harness: ReplayHarness, thread_id: str, turn: Dict[str, Any]) -> Dict[str, Any]:
+    from agent.tracing import RequestTrace, trace_stream
+
+    harness.load_turn(turn.get("responses", {}))
+    llm_before, db_before = sum(harness.llm_calls.values()), sum(harness.db_queries.values())
+    misses_before = len(harness.misses)
+    trace = RequestTrace(thread_id)
+    answer, errors = "", []
+    events = main.stream_generator(
+        turn["query"], thread_id, 0, turn.get("user_mode", "BEGINNER"), trace
+    )
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        async for payload in trace_stream(events, trace):
+            if payload["type"] == "answer":
+                answer += payload["content"]
+            elif payload["type"] == "error":
+                errors.append(payload["content"])
+    errors += harness.misses[misses_before:]
+    return {
+        "session_turn": turn.get("id"),
+        "route": _route_label(trace),
+        "expected_route": turn.get("expect_route"),
+        "ttft": trace.ttft,
+        "total": trace.total,
+        "llm_calls": sum(harness.llm_calls.values()) - llm_before,
+        "db_queries": sum(harness.db_queries.values()) - db_before,
+        "answer_chars": len(answer),
+        "unused_responses": harness.unused(),
+        "errors": errors,
+    }
+
+
+def _reset_caches() -> None:
+    """반복 간 비교가 가능하도록 프로세스 캐시를 비움 (--warm이면 유지)"""
+    from agent import graph as graph_mod
+
+    graph_mod.strategy_plan_cache.clear()
+
+
+async def run_benchmark(
+    corpus: Dict[str, Any],
+    fixture: Dict[str, Any],
+    repeat: int = 3,
+    speed: float = 1.0,
+    seed: int = 7,
+    warm: bool = False,
+) -> Dict[str, Any]:
+    harness = ReplayHarness(LatencyModel(corpus.get("latency_profiles", {}), speed=speed, seed=seed))
+    db = FixtureDB(fixture, harness)
+    turns: List[Dict[str, Any]] = []
+    with replay_environment(harness, db, corpus.get("models", {})) as main:
+        for _ in range(repeat):
+            for session in corpus["sessions"]:
+                if not warm:
+                    _reset_caches()
+                thread_id = f"replay-{session['id']}-{uuid.uuid4().hex[:8]}"
+                for index, turn in enumerate(session["turns"]):
+                    turn = {"id": f"{session['id']}#{index}", **turn}
+                    turns.append(await _run_turn(main, harness, thread_id, turn))
+    return build_report(turns, repeat=repeat, speed=speed, seed=seed)
+
+
+# ==========================================
+# 5. 리포트 / 회귀 비교
+# ==========================================
+def _percentile(values: List[float], pct: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))
+    return round(ordered[index], 4)
+
+
+def build_report(turns: List[Dict[str, Any]], **meta) -> Dict[str, Any]:
+    by_route: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for turn in turns:
+        by_route[turn["route"]].append(turn)
+
+    routes = {}
+    for route, items in sorted(by_route.items()):
+        ttfts = [t["ttft"] for t in items if t["ttft"] is not None]
+        totals = [t["total"] for t in items if t["total"] is not None]
+        routes[route] = {
+            "requests": len(items),
+            "ttft_p50_s": _percentile(ttfts, 50),
+            "ttft_p95_s": _percentile(ttfts, 95),
+            "total_p50_s": _percentile(totals, 50),
+            "total_p95_s": _percentile(totals, 95),
+            "db_queries_per_request": round(statistics.mean(t["db_queries"] for t in items), 2),
+            "llm_calls_per_request": round(statistics.mean(t["llm_calls"] for t in items), 2),
+        }
+    mismatched = [
+        t["session_turn"] for t in turns if t["expected_route"] and t["expected_route"] != t["route"]
+    ]
+    errors = [f"{t['session_turn']}: {e}" for t in turns for e in t["errors"]]
+    # 녹화보다 적은 호출로 끝난 경우 (로컬 라우팅/캐시 등으로 LLM 호출이 줄어든 것은 오류가 아님)
+    unused: Counter = Counter()
+    for turn in turns:
+        unused.update(turn["unused_responses"])
+    return {
+        **meta,
+        "routes": routes,
+        "route_mismatches": sorted(set(mismatched)),
+        "unused_responses": dict(sorted(unused.items())),
+        "errors": errors,
+    }
+
+
+REGRESSION_METRICS = ("ttft_p95_s", "total_p95_s", "db_queries_per_request", "llm_calls_per_request")
+
+
+def compare_reports(
+    baseline: Dict[str, Any], current: Dict[str, Any], max_regression: float, min_delta_s: float = 0.01
+) -> List[str]:
+    """baseline 대비 max_regression(비율) 이상 나빠진 지표 목록"""
+    regressions = []
+    for route, base in baseline.get("routes", {}).items():
+        now = current.get("routes", {}).get(route)
+        if now is None:
+            continue
+        for metric in REGRESSION_METRICS:
+            old, new = base.get(metric), now.get(metric)
+            if old is None or new is None:
+                continue
+            slack = min_delta_s if metric.endswith("_s") else 0
+            if new > old * (1 + max_regression) + slack:
+                regressions.append(f"{route}.{metric}: {old} -> {new}")
+    return regressions
+
+
+def _print_report(report: Dict[str, Any]) -> None:
+    print(f"📊 Replay benchmark (repeat={report['repeat']}, speed={report['speed']}, seed={report['seed']})")
+    header = f"{'route':<46}{'n':>4}{'ttft p50':>10}{'ttft p95':>10}{'total p50':>11}{'total p95':>11}{'db/req':>8}{'llm/req':>9}"
+    print(header)
+    for route, row in report["routes"].items():
+        cells = [row[k] for k in ("ttft_p50_s", "ttft_p95_s", "total_p50_s", "total_p95_s")]
+        fmt = ["-" if c is None else f"{c:.3f}" for c in cells]
+        print(
+            f"{route:<46}{row['requests']:>4}{fmt[0]:>10}{fmt[1]:>10}{fmt[2]:>11}{fmt[3]:>11}"
+            f"{row['db_queries_per_request']:>8}{row['llm_calls_per_request']:>9}"
+        )
+    for turn_id in report["route_mismatches"]:
+        print(f"   ⚠️ 예상과 다른 라우트: {turn_id}")
+    for key, count in report["unused_responses"].items():
+        print(f"   ℹ️ 사용되지 않은 녹화 응답: {key} x{count}")
+    for error in report["errors"][:10]:
+        print(f"   ❌ {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="녹화 세션 오프라인 재생 벤치마크")
+    parser.add_argument("--corpus", default=str(DEFAULT_CORPUS))
+    parser.add_argument("--fixture", default=str(DEFAULT_FIXTURE))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--speed", type=float, default=1.0, help="지연 배율 (0 = 지연 없음)")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--warm", action="store_true", help="반복 간 프로세스 캐시 유지")
+    parser.add_argument("--json", action="store_true", help="결과를 JSON으로 출력")
+    parser.add_argument("--baseline", help="비교할 이전 결과(JSON)")
+    parser.add_argument("--max-regression", type=float, default=0.2)
+    args = parser.parse_args()
+
+    corpus = json.loads(Path(args.corpus).read_text(encoding="utf-8"))
+    fixture = json.loads(Path(args.fixture).read_text(encoding="utf-8"))
+    # 모듈 로딩 로그가 JSON 출력에 섞이지 않도록 stderr로 보냄
+    with contextlib.redirect_stdout(sys.stderr):
+        report = asyncio.run(
+            run_benchmark(corpus, fixture, repeat=args.repeat, speed=args.speed, seed=args.seed, warm=args.warm)
+        )
+
+    if args.json:
+        json.dump(report, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    else:
+        _print_report(report)
+
+    failed = bool(report["errors"] or report["route_mismatches"])
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        regressions = compare_reports(baseline, report, args.max_regression)
+        for line in regressions:
+            print(f"   🐢 회귀: {line}", file=sys.stderr)
+        failed = failed or bool(regressions)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,51 @@
-import json
+import asyncio
 import time
-from typing import Generator, List
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 import os
 from agent.user_mode import normalize_user_mode
-from langchain_core.messages import HumanMessage, AIMessage
+from langchain_core.messages import HumanMessage
 
 # 모듈 임포트
 from agent.schemas import ChatRequest
-from agent.graph import app_graph
-from agent.database import save_chat_message, get_chat_history, get_user_chat_list
+from agent.graph import RECO_STREAM_EVENT, app_graph
+from agent.chat_history import to_langchain_messages
+from agent.sse import stream_sse
+from agent.cancellation import cancellation_stats
+from agent.tracing import CONTENT_TYPE_LATEST, RequestTrace, render_metrics, trace_stream
+from agent.chat_log_writer import CHAT_LOG_READ_FLUSH_TIMEOUT
+from agent.database import (
+    CHAT_HISTORY_PAGE_SIZE,
+    chat_history_cache,
+    chat_log_writer,
+    get_chat_history_async,
+    get_chat_history_page_async,
+    get_user_chat_rooms_page_async,
+    close_async_pools,
+)
+from agent.pagination import (
+    InvalidCursor,
+    conditional_json_response,
+    decode_cursor,
+    encode_cursor,
+)
 from routers import users, perfumes, archive # <--- ksu 추가
 
-app = FastAPI(title="Perfume Re-Act Chatbot")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 채팅 목록/기록 페이지네이션 인덱스는 배포 전 scripts/create_chat_indexes.py로 생성
+    yield
+    # [최적화] 종료 시 대기 중인 채팅 로그를 먼저 flush한 뒤 비동기 DB 커넥션 풀 정리
+    await chat_log_writer.close()
+    await close_async_pools()
+
+
+app = FastAPI(title="Perfume Re-Act Chatbot", lifespan=lifespan)
 
 uploads_dir = os.path.join(os.getcwd(), "uploads")
 os.makedirs(uploads_dir, exist_ok=True)
@@ -41,23 +71,32 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+async def log_chat_message(thread_id: str, member_id: int, role: str, text: str):
+    # [최적화] write-behind 저장 + 히스토리 캐시 갱신 (DB 쓰기를 기다리지 않음)
+    chat_history_cache.append(thread_id, role, text)
+    await chat_log_writer.enqueue(thread_id, member_id, role, text)
+
+
 async def stream_generator(
-    user_query: str, thread_id: str, member_id: int = 0, user_mode: str = "BEGINNER"
-) -> Generator[str, None, None]:
+    user_query: str,
+    thread_id: str,
+    member_id: int = 0,
+    user_mode: str = "BEGINNER",
+    trace: Optional[RequestTrace] = None,
+) -> AsyncIterator[Dict[str, str]]:
+    """/chat 스트림 이벤트(payload dict)를 순서대로 생성합니다. SSE 프레이밍/배칭은 agent.sse가 담당합니다."""
 
-    save_chat_message(thread_id, member_id, "user", user_query)
     config = {"configurable": {"thread_id": thread_id}}
 
-    db_history = get_chat_history(thread_id)
+    # [최적화] 체크포인터에 이 스레드 상태가 있으면 DB 복원 생략 (매 요청 전체 기록 재구성/중복 누적 방지)
+    # 상태가 없을 때만 캐시된 최근 대화 window를 복원합니다.
     restored_messages = []
+    checkpoint = await app_graph.aget_state(config)
+    if not (checkpoint and checkpoint.values.get("messages")):
+        history = await chat_history_cache.get(thread_id)
+        restored_messages = to_langchain_messages(history)
 
-    for msg in db_history:
-        if msg["role"] == "user" and msg["text"] == user_query:
-            continue
-        if msg["role"] == "user":
-            restored_messages.append(HumanMessage(content=msg["text"]))
-        else:
-            restored_messages.append(AIMessage(content=msg["text"]))
+    await log_chat_message(thread_id, member_id, "user", user_query)
 
     normalized_mode = normalize_user_mode(user_mode)
     
@@ -69,12 +108,13 @@ async def stream_generator(
 
     full_ai_response = ""
     did_stream_parallel_reco = False
-    pending_parallel_reco_separator = False
 
     try:
         async for event in app_graph.astream_events(
             inputs, config=config, version="v2"
         ):
+            if trace is not None:
+                trace.on_event(event)
             kind = event["event"]
             metadata = event.get("metadata", {})
             node_name = metadata.get("langgraph_node", "")
@@ -84,13 +124,18 @@ async def stream_generator(
                 output = event["data"].get("output")
                 if output and isinstance(output, dict) and "status" in output:
                     status_msg = output["status"]
-                    data = json.dumps(
-                        {"type": "log", "content": status_msg}, ensure_ascii=False
-                    )
-                    yield f"data: {data}\n\n"
+                    yield {"type": "log", "content": status_msg}
+
+            # [A-0] parallel_reco: 섹션 순서대로 정리된 청크 (섹션 간 구분/헤더 정규화는 노드에서 처리)
+            if kind == "on_custom_event" and event.get("name") == RECO_STREAM_EVENT:
+                content = event["data"].get("content")
+                if content:
+                    did_stream_parallel_reco = True
+                    full_ai_response += content
+                    yield {"type": "answer", "content": content}
 
             # [A] Writer & Info Agents: 실시간 답변 스트리밍
-            if kind == "on_chat_model_stream":
+            elif kind == "on_chat_model_stream":
                 
                 # [★추가] 내부용 헬퍼(번역기 등)의 출력은 화면에 보내지 않고 무시(Skip)
                 tags = event.get("tags", [])
@@ -98,8 +143,6 @@ async def stream_generator(
                     continue
 
                 target_nodes = [
-                    # Recommendation graph
-                    "parallel_reco",
                     # Legacy / other graphs
                     "writer",
                     "perfume_describer",
@@ -108,32 +151,12 @@ async def stream_generator(
                     "fallback_handler",     # <--- 이것도 추가 권장
                 ]
                 # NOTE: LangGraph's node name comes from workflow.add_node("<name>", ...).
-                # We include a prefix fallback in case the runtime metadata differs.
-                if node_name in target_nodes or node_name.startswith("parallel_reco"):
+                # parallel_reco는 섹션 병렬 생성이라 토큰 이벤트 대신 [A-0]의 정렬된 청크를 사용
+                if node_name in target_nodes:
                     content = event["data"]["chunk"].content
                     if content:
-                        if node_name == "parallel_reco" or node_name.startswith(
-                            "parallel_reco"
-                        ):
-                            if pending_parallel_reco_separator and content.lstrip().startswith(
-                                "##"
-                            ):
-                                content = f"\n\n{content.lstrip()}"
-                                pending_parallel_reco_separator = False
-                            content = content.replace("---##", "---\n\n##").replace(
-                                "--- ##", "---\n\n##"
-                            )
-                        if node_name == "parallel_reco" or node_name.startswith(
-                            "parallel_reco"
-                        ):
-                            did_stream_parallel_reco = True
-                            if content.strip().endswith("---"):
-                                pending_parallel_reco_separator = True
                         full_ai_response += content
-                        data = json.dumps(
-                            {"type": "answer", "content": content}, ensure_ascii=False
-                        )
-                        yield f"data: {data}\n\n"
+                        yield {"type": "answer", "content": content}
 
             # [B] Interviewer: 결과 전송
             elif kind == "on_chain_end" and node_name == "interviewer":
@@ -144,11 +167,7 @@ async def stream_generator(
                         last_msg = messages[-1]
                         if hasattr(last_msg, "content") and last_msg.content:
                             full_ai_response += last_msg.content
-                            data = json.dumps(
-                                {"type": "answer", "content": last_msg.content},
-                                ensure_ascii=False,
-                            )
-                            yield f"data: {data}\n\n"
+                            yield {"type": "answer", "content": last_msg.content}
 
             # [B-2] parallel_reco: 완성된 결과 전송 (non-streaming)
             elif kind == "on_chain_end" and node_name == "parallel_reco":
@@ -161,44 +180,49 @@ async def stream_generator(
                             if did_stream_parallel_reco:
                                 continue
                             full_ai_response += last_msg.content
-                            data = json.dumps(
-                                {"type": "answer", "content": last_msg.content},
-                                ensure_ascii=False,
-                            )
-                            yield f"data: {data}\n\n"
+                            yield {"type": "answer", "content": last_msg.content}
 
             # [C] ★Researcher 내부 단계 전환 (전략 수립 완료 -> 검색 시작)★
             elif kind == "on_chat_model_end" and node_name == "researcher":
                 # 리서처 노드 내에서 전략 수립 LLM이 끝나면 즉시 검색 문구로 교체합니다.
                 log_msg = "전략에 맞는 향수를 검색중 입니다..."
-                data = json.dumps(
-                    {"type": "log", "content": log_msg}, ensure_ascii=False
-                )
-                yield f"data: {data}\n\n"
+                yield {"type": "log", "content": log_msg}
 
             # [D] Tools (로그): 데이터 조회 완료
             elif kind == "on_chain_end" and node_name == "tools":
                 log_msg = (
                     "✅ 검색된 정보를 분석하여 최적의 추천 리스트를 만드는 중입니다..."
                 )
-                data = json.dumps(
-                    {"type": "log", "content": log_msg}, ensure_ascii=False
-                )
-                yield f"data: {data}\n\n"
+                yield {"type": "log", "content": log_msg}
 
         if full_ai_response:
-            save_chat_message(thread_id, member_id, "assistant", full_ai_response)
+            await log_chat_message(thread_id, member_id, "assistant", full_ai_response)
 
     except GeneratorExit:
         return
+    except asyncio.CancelledError:
+        # 클라이언트 연결 종료 시 Starlette가 스트림을 취소 -> 진행 중인 LLM 호출도 함께 취소됨
+        print(f"🔌 [Chat] 클라이언트 연결 종료로 처리 중단 (thread={thread_id})", flush=True)
+        raise
     except Exception as e:
-        error_msg = json.dumps({"type": "error", "content": str(e)}, ensure_ascii=False)
-        yield f"data: {error_msg}\n\n"
+        yield {"type": "error", "content": str(e)}
 
 @app.post("/chat")
-async def chat_stream(request: ChatRequest):
+async def chat_stream(request: ChatRequest, http_request: Request):
+    # [최적화] 답변 토큰은 20ms/256B 단위로 묶어 전송하고, 클라이언트 연결이 끊기면 그래프 실행을 취소
+    # 노드/LLM/DB/캐시 타이밍은 RequestTrace로 수집 (Prometheus /metrics, TRACE_DIR JSON)
+    trace = RequestTrace(request.thread_id)
+    events = trace_stream(
+        stream_generator(request.user_query, request.thread_id, request.member_id, request.user_mode, trace),
+        trace,
+    )
+
+    def _on_disconnect():
+        cancellation_stats.record_disconnect()
+        print(f"🔌 [Chat] 연결 종료 감지 → 그래프 실행 취소 (thread={request.thread_id})", flush=True)
+
     return StreamingResponse(
-        stream_generator(request.user_query, request.thread_id, request.member_id, request.user_mode),
+        stream_sse(events, is_disconnected=http_request.is_disconnected, on_disconnect=_on_disconnect),
         media_type="text/event-stream",
     )
 
@@ -208,16 +232,62 @@ def health():
     return {"status": "ok"}
 
 
+@app.get("/metrics")
+def metrics():
+    body = render_metrics()
+    if body is None:
+        raise HTTPException(status_code=501, detail="prometheus_client가 설치되어 있지 않습니다.")
+    return Response(content=body, media_type=CONTENT_TYPE_LATEST)
+
+
+def _parse_cursor(cursor: Optional[str]):
+    if not cursor:
+        return None
+    try:
+        return decode_cursor(cursor)
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="invalid cursor")
+
+
+# [최적화] cursor 기반 페이지네이션 + ETag/Last-Modified (변경 없으면 304)
 @app.get("/chat/rooms/{member_id}")
-async def get_rooms(member_id: int):
-    rooms = get_user_chat_list(member_id)
-    return {"rooms": rooms}
+async def get_rooms(
+    request: Request,
+    member_id: int,
+    cursor: Optional[str] = None,
+    limit: int = Query(30, ge=1, le=100),
+):
+    page = await get_user_chat_rooms_page_async(member_id, limit, _parse_cursor(cursor))
+    next_key = page["next_key"]
+    payload = {
+        "rooms": page["rooms"],
+        "next_cursor": encode_cursor(*next_key) if next_key else None,
+    }
+    return conditional_json_response(request, payload, page["last_modified"])
 
 
 @app.get("/chat/history/{thread_id}")
-async def get_history(thread_id: str):
-    messages = get_chat_history(thread_id)
-    return {"messages": messages}
+async def get_history(
+    request: Request,
+    thread_id: str,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=500),
+):
+    # 이 스레드의 미기록 메시지만 짧게 기다린 뒤 조회 (다른 사용자의 쓰기 부하와 무관)
+    await chat_log_writer.flush(thread_id, timeout=CHAT_LOG_READ_FLUSH_TIMEOUT)
+    # limit/cursor가 없으면 기존 클라이언트 호환을 위해 기존 쿼리로 스레드 전체를 반환
+    if limit is None and cursor is None:
+        messages = await get_chat_history_async(thread_id)
+        return conditional_json_response(request, {"messages": messages, "next_cursor": None})
+    page = await get_chat_history_page_async(
+        thread_id, limit or CHAT_HISTORY_PAGE_SIZE, _parse_cursor(cursor)
+    )
+    next_key = page["next_key"]
+    payload = {
+        "messages": page["messages"],
+        "next_cursor": encode_cursor(*next_key) if next_key else None,
+    }
+    return conditional_json_response(request, payload, page["last_modified"])
 
 
 if __name__ == "__main__":
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+향수별 리뷰 centroid 생성 배치 스크립트
+
+TB_PERFUME_REVIEW_M + TB_REVIEW_EMBEDDING_M의 리뷰 임베딩을 향수 단위로 평균내어
+정규화된 centroid 벡터와 대표 리뷰 포인터(centroid에 가장 가까운 리뷰 ID)를 만듭니다.
+
+결과 저장 위치:
+1. TB_PERFUME_REVIEW_CENTROID_M (pgvector) - rerank_perfumes_async의 centroid 모드가 사용
+2. REVIEW_CENTROID_PATH (.npz) - pgvector를 쓸 수 없을 때의 NumPy 인메모리 fallback
+
+실행 방법:
+    cd backend
+    python scripts/build_review_centroids.py            # DB 테이블 + npz 파일 모두 갱신
+    python scripts/build_review_centroids.py --no-db    # npz 파일만 갱신
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add backend directory to Python path
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+import numpy as np
+from psycopg2.extras import execute_values
+
+from agent.database import get_db_connection, release_db_connection
+from agent.review_centroids import (
+    CENTROID_TABLE,
+    CENTROID_TABLE_DDL,
+    REVIEW_CENTROID_PATH,
+    compute_centroid,
+    parse_pgvector,
+    save_centroid_file,
+    to_pgvector_literal,
+)
+
+FETCH_SIZE = 2000
+UPSERT_BATCH = 500
+
+
+def iter_perfume_reviews(conn):
+    """향수 ID 순으로 정렬된 리뷰를 향수 단위로 묶어서 반환합니다 (서버 사이드 커서)."""
+    cur = conn.cursor(name="review_centroid_cursor")
+    cur.itersize = FETCH_SIZE
+    cur.execute(
+        """
+        SELECT m.perfume_id, m.review_id, m.content, e.embedding::text
+        FROM TB_PERFUME_REVIEW_M m
+        JOIN TB_REVIEW_EMBEDDING_M e ON m.review_id = e.review_id
+        ORDER BY m.perfume_id
+        """
+    )
+    current_id, rows = None, []
+    try:
+        for perfume_id, review_id, content, embedding in cur:
+            if current_id is not None and perfume_id != current_id:
+                yield current_id, rows
+                rows = []
+            current_id = perfume_id
+            rows.append((review_id, content, embedding))
+        if current_id is not None and rows:
+            yield current_id, rows
+    finally:
+        cur.close()
+
+
+def upsert_centroids(conn, batch):
+    cur = conn.cursor()
+    try:
+        execute_values(
+            cur,
+            f"""
+            INSERT INTO {CENTROID_TABLE}
+                (PERFUME_ID, CENTROID, REVIEW_COUNT, TOP_REVIEW_IDS, BEST_REVIEW, UPDATED_DT)
+            VALUES %s
+            ON CONFLICT (PERFUME_ID) DO UPDATE SET
+                CENTROID = EXCLUDED.CENTROID,
+                REVIEW_COUNT = EXCLUDED.REVIEW_COUNT,
+                TOP_REVIEW_IDS = EXCLUDED.TOP_REVIEW_IDS,
+                BEST_REVIEW = EXCLUDED.BEST_REVIEW,
+                UPDATED_DT = CURRENT_TIMESTAMP
+            """,
+            batch,
+            template="(%s, %s::vector, %s, %s, %s, CURRENT_TIMESTAMP)",
+        )
+        conn.commit()
+    finally:
+        cur.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build per-perfume review centroids")
+    parser.add_argument("--no-db", action="store_true", help="DB 테이블은 갱신하지 않고 npz 파일만 저장")
+    parser.add_argument("--output", default=REVIEW_CENTROID_PATH, help="npz 출력 경로")
+    args = parser.parse_args()
+
+    print("🚀 [Batch] 리뷰 centroid 생성 시작...")
+    started = time.time()
+
+    read_conn = get_db_connection()
+    write_conn = None if args.no_db else get_db_connection()
+
+    perfume_ids, centroids, best_reviews = [], [], []
+    pending = []
+    try:
+        if write_conn is not None:
+            cur = write_conn.cursor()
+            try:
+                cur.execute(CENTROID_TABLE_DDL)
+                write_conn.commit()
+            except Exception as e:
+                write_conn.rollback()
+                print(f"⚠️ centroid 테이블 생성 실패 (pgvector 미설치?) -> npz만 저장합니다: {e}")
+                release_db_connection(write_conn)
+                write_conn = None
+            finally:
+                cur.close()
+
+        for perfume_id, rows in iter_perfume_reviews(read_conn):
+            review_ids = [r[0] for r in rows]
+            contents = {r[0]: r[1] for r in rows}
+            matrix = np.stack([parse_pgvector(r[2]) for r in rows])
+            centroid, top_ids = compute_centroid(matrix, review_ids)
+            best_review = contents.get(top_ids[0]) if top_ids else None
+
+            perfume_ids.append(perfume_id)
+            centroids.append(centroid)
+            best_reviews.append(best_review or "")
+
+            if write_conn is not None:
+                pending.append(
+                    (perfume_id, to_pgvector_literal(centroid), len(rows), top_ids, best_review)
+                )
+                if len(pending) >= UPSERT_BATCH:
+                    upsert_centroids(write_conn, pending)
+                    pending = []
+
+            if len(perfume_ids) % 1000 == 0:
+                print(f"   ... {len(perfume_ids)}개 향수 처리")
+
+        if write_conn is not None and pending:
+            upsert_centroids(write_conn, pending)
+
+        if perfume_ids:
+            save_centroid_file(args.output, perfume_ids, np.stack(centroids), best_reviews)
+            print(f"💾 npz 저장: {args.output}")
+    finally:
+        read_conn.rollback()
+        release_db_connection(read_conn)
+        if write_conn is not None:
+            release_db_connection(write_conn)
+
+    print(f"✅ 완료: {len(perfume_ids)}개 향수, {time.time() - started:.1f}초")
+
+
+if __name__ == "__main__":
+    main()
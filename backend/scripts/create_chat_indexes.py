@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+채팅 목록/기록 keyset 페이지네이션용 인덱스 생성 스크립트
+
+CREATE INDEX CONCURRENTLY는 테이블 쓰기를 막지 않지만 트랜잭션 안에서 실행할 수 없으므로
+autocommit 연결로 한 문장씩 실행합니다. 앱 시작 시가 아니라 배포 전에 한 번 실행하세요.
+(IF NOT EXISTS라 다시 실행해도 안전합니다. 생성 도중 실패하면 INVALID 인덱스가 남을 수 있으니
+ DROP INDEX CONCURRENTLY 후 다시 실행하세요.)
+
+실행 방법:
+    cd backend
+    python scripts/create_chat_indexes.py
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# Add backend directory to Python path
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from agent.database import (
+    get_chat_index_ddl,
+    get_recom_db_connection,
+    release_recom_db_connection,
+)
+
+
+def main():
+    print("🚀 [Migration] 채팅 인덱스 생성 시작...")
+    started = time.time()
+    statements = get_chat_index_ddl()
+
+    conn = get_recom_db_connection()
+    autocommit = conn.autocommit
+    conn.autocommit = True
+    cur = conn.cursor()
+    try:
+        for ddl in statements:
+            name = ddl.split("EXISTS", 1)[1].split()[0]
+            print(f"   ... {name}")
+            cur.execute(ddl)
+    finally:
+        cur.close()
+        conn.autocommit = autocommit
+        release_recom_db_connection(conn)
+
+    print(f"✅ 완료: {len(statements)}개 인덱스, {time.time() - started:.1f}초")
+
+
+if __name__ == "__main__":
+    main()
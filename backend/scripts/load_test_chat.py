@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+/chat 동시 요청 부하 테스트
+
+N개의 채팅 요청을 동시에 보내 SSE 첫 이벤트까지의 시간(TTFB), 전체 응답 시간,
+처리량을 측정합니다. 동시에 /health를 주기적으로 호출해 이벤트 루프가 막히는지
+(동기 LLM 호출 등) 확인합니다. 변경 전/후 커밋에서 같은 옵션으로 실행해 비교하세요.
+
+실행 방법:
+    cd backend
+    uvicorn main:app --port 8000              # 다른 터미널에서 서버 실행
+    python scripts/load_test_chat.py --concurrency 20 --requests 60
+    python scripts/load_test_chat.py --query "베티버가 뭐야?" --json > after.json
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+import uuid
+
+import httpx
+
+
+def _percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def _one_chat(client: httpx.AsyncClient, url: str, query: str, timeout: float) -> dict:
+    payload = {
+        "user_query": query,
+        "thread_id": f"loadtest-{uuid.uuid4()}",
+        "member_id": 0,
+        "user_mode": "BEGINNER",
+    }
+    started = time.perf_counter()
+    ttfb = None
+    events = 0
+    try:
+        async with client.stream("POST", f"{url}/chat", json=payload, timeout=timeout) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                if ttfb is None:
+                    ttfb = time.perf_counter() - started
+                events += 1
+        return {"ok": True, "ttfb": ttfb, "total": time.perf_counter() - started, "events": events}
+    except Exception as e:
+        return {"ok": False, "error": f"{type(e).__name__}: {e}", "total": time.perf_counter() - started}
+
+
+async def _probe_health(client: httpx.AsyncClient, url: str, interval: float, stop: asyncio.Event) -> list:
+    """이벤트 루프가 막히면 /health 응답 시간이 LLM 호출 시간만큼 늘어납니다."""
+    latencies = []
+    while not stop.is_set():
+        started = time.perf_counter()
+        try:
+            await client.get(f"{url}/health", timeout=60)
+            latencies.append(time.perf_counter() - started)
+        except Exception:
+            pass
+        await asyncio.sleep(interval)
+    return latencies
+
+
+async def run(args) -> dict:
+    semaphore = asyncio.Semaphore(args.concurrency)
+    limits = httpx.Limits(max_connections=args.concurrency + 2)
+
+    async with httpx.AsyncClient(limits=limits) as client:
+
+        async def _bounded():
+            async with semaphore:
+                return await _one_chat(client, args.url, args.query, args.timeout)
+
+        stop = asyncio.Event()
+        probe = asyncio.create_task(_probe_health(client, args.url, args.probe_interval, stop))
+        started = time.perf_counter()
+        results = await asyncio.gather(*[_bounded() for _ in range(args.requests)])
+        elapsed = time.perf_counter() - started
+        stop.set()
+        health = await probe
+
+    ok = [r for r in results if r["ok"]]
+    ttfbs = [r["ttfb"] for r in ok if r["ttfb"] is not None]
+    totals = [r["total"] for r in ok]
+    errors = [r["error"] for r in results if not r["ok"]]
+    return {
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "succeeded": len(ok),
+        "failed": len(errors),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(ok) / elapsed, 3) if elapsed else None,
+        "ttfb_p50_s": _percentile(ttfbs, 50),
+        "ttfb_p95_s": _percentile(ttfbs, 95),
+        "total_p50_s": _percentile(totals, 50),
+        "total_p95_s": _percentile(totals, 95),
+        "health_p50_s": _percentile(health, 50),
+        "health_max_s": max(health) if health else None,
+        "health_mean_s": statistics.mean(health) if health else None,
+        "sample_errors": errors[:5],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="/chat 동시 요청 부하 테스트")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--query", default="안녕")
+    parser.add_argument("--requests", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--timeout", type=float, default=180.0)
+    parser.add_argument("--probe-interval", type=float, default=0.1)
+    parser.add_argument("--json", action="store_true", help="결과를 JSON으로 출력")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    if args.json:
+        json.dump(report, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+        return
+
+    print(f"✅ 성공 {report['succeeded']}/{report['requests']} (동시 {report['concurrency']})")
+    print(f"   처리량: {report['throughput_rps']} req/s, 총 {report['elapsed_s']}s")
+    for key in ("ttfb_p50_s", "ttfb_p95_s", "total_p50_s", "total_p95_s", "health_p50_s", "health_max_s"):
+        value = report[key]
+        print(f"   {key}: {value:.3f}" if value is not None else f"   {key}: -")
+    for error in report["sample_errors"]:
+        print(f"   ❌ {error}")
+
+
+if __name__ == "__main__":
+    main()
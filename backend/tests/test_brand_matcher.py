@@ -0,0 +1,64 @@
+import sys
+from pathlib import Path
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from agent.brand_matcher import BrandMatcher, normalize_brand
+
+
+CATALOG = [
+    "Chanel",
+    "Dior",
+    "Diptyque",
+    "Hermès",
+    "Jo Malone London",
+    "Maison Francis Kurkdjian",
+    "Dolce&Gabbana",
+    "Tom Ford",
+]
+
+
+def test_normalized_key_and_alias_resolution():
+    matcher = BrandMatcher(CATALOG)
+
+    assert normalize_brand("Dolce & Gabbana") == normalize_brand("Dolce&Gabbana")
+    assert matcher.resolve("hermes").brand == "Hermès"
+    assert matcher.resolve("  TOM-FORD ").method == "exact"
+
+    alias = matcher.resolve("조말론")
+    assert alias.brand == "Jo Malone London"
+    assert alias.method == "alias"
+
+
+def test_fuzzy_ranking_with_confidence():
+    matcher = BrandMatcher(CATALOG)
+
+    typo = matcher.resolve("Diptyqe")
+    assert typo.brand == "Diptyque"
+    assert typo.method == "fuzzy"
+    assert 0.75 <= typo.confidence < 1.0
+
+    partial = matcher.resolve("kurkdjian")
+    assert partial.brand == "Maison Francis Kurkdjian"
+
+    # Unrelated input never resolves (caller may fall back to the LLM)
+    assert matcher.resolve("아무브랜드") is None
+    assert matcher.resolve("Zara") is None
+
+
+def test_mentions_match_english_brands_on_word_boundaries():
+    matcher = BrandMatcher(CATALOG + ["Fresh", "Nest", "Zara"])
+
+    # Brand keys hidden inside ordinary English words are not mentions
+    assert matcher.mentions("honestly I want something like this") == []
+    assert matcher.mentions("상큼하고 fresh한 향 비슷한 거 추천해줘") == []
+    assert matcher.mentions("a bizarre nesting doll") == []
+    # Multi-word names, "&", accents and attached Korean particles still match
+    assert matcher.mentions("tom ford랑 비슷한 거") == ["Tom Ford"]
+    assert matcher.mentions("Dolce & Gabbana 신상") == ["Dolce&Gabbana"]
+    assert matcher.mentions("hermes 향수") == ["Hermès"]
+    assert matcher.mentions("chanel이랑 zara 비교") == ["Chanel", "Zara"]
+    assert matcher.mentions("디올 쁘아종이랑 비슷한 거") == ["Dior"]
@@ -0,0 +1,103 @@
+import asyncio
+import re
+import sys
+from pathlib import Path
+
+import pytest
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from agent.cancellation import CancellationStats  # noqa: E402
+
+
+def test_saved_tokens_are_estimated_from_completed_calls():
+    stats = CancellationStats()
+    assert stats.record_cancelled("reco_writer", generated_tokens=5) == 0
+
+    stats.observe_completed("reco_writer", {"input_tokens": 1000, "output_tokens": 400})
+    stats.observe_completed("reco_writer", {"input_tokens": 1200, "output_tokens": 600})
+
+    assert stats.record_cancelled("reco_writer", generated_tokens=100) == 400
+    assert stats.record_cancelled("reco_writer", started=False) == 1600
+    assert stats.record_cancelled("reco_writer", generated_tokens=900) == 0
+
+    snap = stats.snapshot()
+    assert snap["cancelled"]["reco_writer"] == {"calls": 4, "not_started": 1, "est_tokens_saved": 2000}
+    assert snap["est_tokens_saved"] == 2000
+
+
+@pytest.mark.asyncio
+async def test_cancelling_reco_node_cancels_searches_and_writer_calls(monkeypatch):
+    from agent import graph as graph_mod
+    from agent.schemas import HardFilters, SearchStrategyPlan, StrategyFilters
+    from agent.strategy_plan_cache import StrategyPlanCache
+    from langchain_core.messages import AIMessageChunk
+
+    class FakePlanner:
+        async def ainvoke(self, messages, config=None):
+            name = re.search(r"전략 이름: (.+)", messages[-1].content).group(1)
+            return SearchStrategyPlan(
+                priority=1,
+                strategy_name=name,
+                reason=name,
+                hard_filters=HardFilters(gender="Unisex"),
+                strategy_filters=StrategyFilters(),
+                strategy_keyword=[name],
+            )
+
+    class FakeSmart:
+        def with_structured_output(self, _schema):
+            return FakePlanner()
+
+    writer_started = asyncio.Event()
+    cancelled = []
+
+    async def fake_search(h_filters, s_filters, exclude_ids=None, query_text=""):
+        if query_text != "이미지 강조":
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(f"search:{query_text}")
+                raise
+        return ([{"id": 1, "name": "P", "brand": "B"}], "ok")
+
+    class HangingWriter:
+        async def astream(self, messages, config=None):
+            yield AIMessageChunk(content="## 1.\n")
+            yield AIMessageChunk(content="본문")
+            writer_started.set()
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append("writer")
+                raise
+            yield AIMessageChunk(content="끝")
+
+    async def noop(*_args, **_kwargs):
+        return None
+
+    stats = CancellationStats()
+    stats.observe_completed("reco_writer", {"input_tokens": 900, "output_tokens": 300})
+    monkeypatch.setattr(graph_mod, "cancellation_stats", stats)
+    monkeypatch.setattr(graph_mod, "strategy_plan_cache", StrategyPlanCache(version="t", ttl=0))
+    monkeypatch.setattr(graph_mod, "SMART_LLM", FakeSmart())
+    monkeypatch.setattr(graph_mod, "SUPER_SMART_LLM", HangingWriter())
+    monkeypatch.setattr(graph_mod, "smart_search_with_retry_async", fake_search)
+    monkeypatch.setattr(graph_mod, "save_recommendation_log_async", noop)
+    monkeypatch.setattr(graph_mod, "_emit_reco_chunk", noop)
+
+    node = asyncio.create_task(
+        graph_mod.parallel_reco_node({"messages": [], "member_id": 0, "user_preferences": {}})
+    )
+    await asyncio.wait_for(writer_started.wait(), 1)
+    node.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await node
+
+    assert sorted(cancelled) == ["search:이미지 반전", "search:이미지 보완", "writer"]
+    snap = stats.snapshot()["cancelled"]["reco_writer"]
+    # 진행 중이던 1번 섹션(300 - 2) + 시작하지 못한 2, 3번 섹션(각 1200)
+    assert snap == {"calls": 3, "not_started": 2, "est_tokens_saved": 298 + 2400}
@@ -0,0 +1,86 @@
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from agent.catalog_vocab import CatalogVocabulary
+
+
+def _catalog(**overrides):
+    data = {
+        "brands": ["Dior", "Chanel"],
+        "seasons": ["Winter", "Spring"],
+        "occasions": ["Date"],
+        "accords": ["Woody", "Citrus"],
+        "notes": ["Rose", "Oud"],
+    }
+    data.update(overrides)
+    return data
+
+
+@pytest.mark.asyncio
+async def test_concurrent_first_loads_run_loader_once():
+    calls = []
+
+    def loader():
+        calls.append(1)
+        time.sleep(0.02)
+        return _catalog()
+
+    vocab = CatalogVocabulary(loader, ttl=0)
+    snapshots = await asyncio.gather(*[vocab.get_async() for _ in range(5)])
+
+    assert len(calls) == 1
+    assert all(s is snapshots[0] for s in snapshots)
+    assert snapshots[0].brands == ("Chanel", "Dior")
+    assert vocab.get().as_meta()["seasons"] == "Spring, Winter"
+
+
+def test_version_bumps_only_when_content_changes_and_notifies_subscribers():
+    data = {"value": _catalog()}
+    vocab = CatalogVocabulary(lambda: data["value"], ttl=0)
+    seen = []
+    vocab.subscribe(lambda snapshot: seen.append(snapshot.version))
+
+    assert vocab.get().version == 1
+    vocab.refresh()
+    assert vocab.version == 1
+
+    data["value"] = _catalog(brands=["Dior", "Chanel", "Byredo"])
+    assert vocab.refresh().version == 2
+    assert seen == [1, 2]
+
+
+def test_failing_subscriber_keeps_previous_snapshot_and_indexes(capsys):
+    data = {"value": _catalog()}
+    vocab = CatalogVocabulary(lambda: data["value"], ttl=0)
+    index = {}
+    vocab.subscribe(lambda snapshot: index.update(brands=snapshot.brands))
+
+    def flaky(snapshot):
+        if "Byredo" in snapshot.brands:
+            raise RuntimeError("index build failed")
+
+    vocab.subscribe(flaky)
+    assert vocab.get().version == 1
+
+    data["value"] = _catalog(brands=["Dior", "Chanel", "Byredo"])
+    snapshot = vocab.refresh()
+
+    # New version is not published and the other subscriber is rolled back
+    assert snapshot.version == 1
+    assert vocab.get().brands == ("Chanel", "Dior")
+    assert index["brands"] == ("Chanel", "Dior")
+    assert "index build failed" in capsys.readouterr().out
+
+    # Next refresh retries once the subscriber recovers
+    vocab._subscribers.remove(flaky)
+    assert vocab.refresh().version == 2
+    assert index["brands"] == ("Byredo", "Chanel", "Dior")
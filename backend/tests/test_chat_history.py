@@ -0,0 +1,72 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from agent.chat_history import ChatHistoryCache, to_langchain_messages, window_messages
+
+
+@pytest.mark.asyncio
+async def test_history_loads_once_with_limit_and_keeps_a_window():
+    calls = []
+
+    async def loader(thread_id, limit):
+        calls.append((thread_id, limit))
+        await asyncio.sleep(0.01)
+        return [
+            {"role": "user", "text": "q1", "metadata": None},
+            {"role": "assistant", "text": "a1", "metadata": None},
+        ]
+
+    cache = ChatHistoryCache(loader, window=3)
+    results = await asyncio.gather(*[cache.get("t1") for _ in range(3)])
+    assert calls == [("t1", 3)]
+    assert results[0] == [{"role": "user", "text": "q1"}, {"role": "assistant", "text": "a1"}]
+
+    cache.append("t1", "user", "q2")
+    cache.append("t1", "assistant", "a2")
+    # Uncached threads are not materialized by append
+    cache.append("t2", "user", "ignored")
+
+    history = await cache.get("t1")
+    assert [m["text"] for m in history] == ["a1", "q2", "a2"]
+    assert calls == [("t1", 3)]
+
+    messages = to_langchain_messages(history)
+    assert [m.type for m in messages] == ["ai", "human", "ai"]
+
+
+def test_window_messages_keeps_recent_turns_and_summarizes_the_rest():
+    from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+    messages = []
+    for i in range(1, 7):
+        messages.append(HumanMessage(content=f"질문 {i}"))
+        messages.append(AIMessage(content=f"## 1. P{i}\n[[SAVE:{i}:P{i}]]"))
+    messages.append(HumanMessage(content="질문 7"))
+
+    # 경계가 답변이면 다음 사용자 메시지부터 남김
+    windowed = window_messages(messages, window=4)
+    assert [m.content for m in windowed[1:]] == ["질문 6", messages[-2].content, "질문 7"]
+
+    summary = windowed[0]
+    assert isinstance(summary, SystemMessage)
+    assert "앞선 메시지 10개" in summary.content
+    assert "질문 1 / 질문 2 / 질문 3 / 질문 4 / 질문 5" in summary.content
+    assert "이미 추천한 향수: P1, P2, P3, P4, P5" in summary.content
+
+    # 요약에는 최근 요청 5개만 남기고, 추천한 향수는 모두 유지
+    summary = window_messages(messages, window=1)[0].content
+    assert "질문 1 " not in summary and "질문 2 / 질문 3 / 질문 4 / 질문 5 / 질문 6" in summary
+    assert "P1, P2, P3, P4, P5, P6" in summary
+
+    # 짧은 대화와 window=0은 그대로
+    assert window_messages(messages[:3], window=4) == messages[:3]
+    assert window_messages(messages, window=0) == messages
+
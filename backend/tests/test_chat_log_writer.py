@@ -0,0 +1,123 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from agent.chat_log_writer import ChatLogWriter
+
+
+@pytest.mark.asyncio
+async def test_enqueue_returns_before_write_and_batches_in_order():
+    batches = []
+    release = asyncio.Event()
+
+    async def write_batch(entries):
+        await release.wait()
+        batches.append([(e.thread_id, e.role) for e in entries])
+
+    writer = ChatLogWriter(write_batch, batch_size=10, flush_interval=0.01)
+    await asyncio.wait_for(writer.enqueue("t1", 1, "user", "안녕"), 0.1)
+    await writer.enqueue("t1", 1, "assistant", "반가워요")
+    await writer.enqueue("t2", 0, "user", "추천해줘")
+    assert batches == []
+
+    release.set()
+    await writer.close()
+
+    assert batches == [[("t1", "user"), ("t1", "assistant"), ("t2", "user")]]
+    assert writer.written == 3
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_is_retried_then_written_per_entry():
+    attempts = []
+
+    async def write_batch(entries):
+        attempts.append([e.message for e in entries])
+        if len(entries) > 1 or entries[0].message == "bad":
+            raise RuntimeError("db down")
+
+    writer = ChatLogWriter(write_batch, batch_size=10, flush_interval=0.01, max_retries=1, retry_backoff=0)
+    await writer.enqueue("t1", 1, "user", "ok")
+    await writer.enqueue("t1", 1, "user", "bad")
+    await writer.close()
+
+    assert attempts[:2] == [["ok", "bad"], ["ok", "bad"]]
+    assert attempts[2:] == [["ok"], ["bad"]]
+    assert writer.written == 1
+    assert writer.dropped == 1
+
+
+@pytest.mark.asyncio
+async def test_flush_waits_only_for_entries_enqueued_before_the_call():
+    gates = {}
+
+    async def write_batch(entries):
+        for e in entries:
+            await gates.setdefault(e.message, asyncio.Event()).wait()
+
+    writer = ChatLogWriter(write_batch, batch_size=1, flush_interval=0)
+    await writer.enqueue("t1", 1, "user", "a")
+    flushing = asyncio.create_task(writer.flush("t1", timeout=1))
+    await asyncio.sleep(0)
+    # 호출 이후에 들어온 메시지(같은 스레드/다른 스레드)는 기다리지 않음
+    await writer.enqueue("t1", 1, "assistant", "b")
+    await writer.enqueue("t2", 2, "user", "c")
+
+    gates.setdefault("a", asyncio.Event()).set()
+    assert await asyncio.wait_for(flushing, 0.5) is True
+    # 다른 스레드의 미기록 메시지가 없으면 바로 반환, 막혀 있으면 timeout 후 False
+    assert await writer.flush("t3", timeout=0.05) is True
+    assert await writer.flush("t2", timeout=0.05) is False
+
+    for key in ("b", "c"):
+        gates.setdefault(key, asyncio.Event()).set()
+    await writer.close()
+    assert writer.written == 3
+
+
+@pytest.mark.asyncio
+async def test_full_queue_applies_backpressure_without_reordering():
+    written = []
+    release = asyncio.Event()
+
+    async def write_batch(entries):
+        await release.wait()
+        written.extend(e.message for e in entries)
+
+    writer = ChatLogWriter(write_batch, batch_size=1, flush_interval=0, max_queue=1)
+    await writer.enqueue("t1", 1, "user", "1")
+    await asyncio.sleep(0)  # 워커가 "1"을 꺼내 기록 대기
+    await writer.enqueue("t1", 1, "assistant", "2")
+    blocked = asyncio.create_task(writer.enqueue("t1", 1, "user", "3"))
+    await asyncio.sleep(0.01)
+    assert not blocked.done()
+
+    release.set()
+    await asyncio.wait_for(blocked, 0.5)
+    await writer.close()
+    assert written == ["1", "2", "3"]
+
+
+@pytest.mark.asyncio
+async def test_entries_get_strictly_increasing_created_at():
+    written = []
+
+    async def write_batch(entries):
+        written.extend(entries)
+
+    writer = ChatLogWriter(write_batch, batch_size=10, flush_interval=0.01)
+    for i in range(20):
+        await writer.enqueue("t1", 1, "user", str(i))
+    await writer.close()
+
+    stamps = [e.created_at for e in written]
+    assert all(s is not None and s.tzinfo is not None for s in stamps)
+    # 한 배치(한 트랜잭션)로 기록돼도 메시지마다 다른 시각을 enqueue 순서대로 가짐
+    assert stamps == sorted(stamps) and len(set(stamps)) == len(stamps)
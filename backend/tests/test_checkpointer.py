@@ -0,0 +1,71 @@
+import sys
+from pathlib import Path
+from typing import Annotated, TypedDict
+
+import pytest
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.graph import END, START, StateGraph
+from langgraph.graph.message import add_messages
+
+from agent.checkpointer import BoundedMemorySaver, SqliteCheckpointStore
+
+
+class _State(TypedDict):
+    messages: Annotated[list, add_messages]
+
+
+def _build(saver):
+    def reply(state):
+        return {"messages": [AIMessage(content=f"reply {len(state['messages'])}")]}
+
+    graph = StateGraph(_State)
+    graph.add_node("reply", reply)
+    graph.add_edge(START, "reply")
+    graph.add_edge("reply", END)
+    return graph.compile(checkpointer=saver)
+
+
+def _config(thread_id):
+    return {"configurable": {"thread_id": thread_id}}
+
+
+@pytest.mark.asyncio
+async def test_memory_stays_bounded_by_threads_and_history():
+    saver = BoundedMemorySaver(max_threads=2, history_per_thread=2)
+    app = _build(saver)
+
+    for thread_id in ["a", "b", "c"]:
+        for i in range(4):
+            await app.ainvoke({"messages": [HumanMessage(content=str(i))]}, _config(thread_id))
+
+    assert set(saver.storage) == {"b", "c"}
+    assert saver.stats()["evictions"] == 1
+    assert all(len(checkpoints) <= 2 for checkpoints in saver.storage["c"].values())
+    # Pruned history does not lose the current state
+    state = await app.aget_state(_config("c"))
+    assert len(state.values["messages"]) == 8
+
+
+@pytest.mark.asyncio
+async def test_sqlite_store_restores_evicted_threads_and_shares_across_workers(tmp_path):
+    store = SqliteCheckpointStore(str(tmp_path / "checkpoints.sqlite3"))
+    worker1 = _build(BoundedMemorySaver(max_threads=1, store=store))
+    worker2 = _build(BoundedMemorySaver(store=store))
+
+    await worker1.ainvoke({"messages": [HumanMessage(content="hi")]}, _config("t1"))
+    await worker1.ainvoke({"messages": [HumanMessage(content="hi")]}, _config("t2"))
+
+    # t1 was evicted from worker1's memory but comes back from the store
+    restored = await worker1.aget_state(_config("t1"))
+    assert [m.content for m in restored.values["messages"]] == ["hi", "reply 1"]
+
+    # A turn written by another worker is visible on the next read
+    await worker2.ainvoke({"messages": [HumanMessage(content="again")]}, _config("t1"))
+    state = await worker1.aget_state(_config("t1"))
+    assert len(state.values["messages"]) == 4
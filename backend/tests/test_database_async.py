@@ -0,0 +1,225 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def execute(self, sql, params=None):
+        self.conn.executed.append((sql, params))
+
+    def fetchall(self):
+        # rows가 함수면 마지막 SQL에 따라 결과를 돌려줌
+        if callable(self.conn.rows):
+            return self.conn.rows(self.conn.executed[-1][0])
+        return self.conn.rows
+
+    def close(self):
+        pass
+
+
+class FakeConn:
+    def __init__(self, rows=None):
+        self.rows = rows or []
+        self.executed = []
+        self.commits = 0
+        self.released = False
+
+    def cursor(self, cursor_factory=None):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        pass
+
+
+def _install_fake_pool(monkeypatch, db_mod, conn):
+    def release(c):
+        c.released = True
+
+    monkeypatch.setattr(db_mod, "ASYNC_DB_DRIVER", "thread")
+    monkeypatch.setitem(db_mod._SYNC_POOLS, "recom", (lambda: conn, release))
+    monkeypatch.setitem(db_mod._SYNC_POOLS, "perfume", (lambda: conn, release))
+
+
+@pytest.mark.asyncio
+async def test_async_chat_writes_share_sync_statements_in_one_transaction(monkeypatch):
+    from agent import database as db_mod
+
+    conn = FakeConn()
+    _install_fake_pool(monkeypatch, db_mod, conn)
+
+    await db_mod.save_chat_message_async("t-1", 7, "user", "안녕하세요", {"k": "v"})
+
+    assert len(conn.executed) == 2
+    assert "TB_CHAT_THREAD_T" in conn.executed[0][0]
+    # created_at이 없으면 DB의 clock_timestamp()로 기록
+    assert conn.executed[1][1] == ("t-1", 7, "user", "안녕하세요", '{"k": "v"}', None)
+    assert "clock_timestamp()" in conn.executed[1][0]
+    assert conn.commits == 1
+    assert conn.released
+
+
+@pytest.mark.asyncio
+async def test_batch_write_keeps_per_entry_created_at(monkeypatch):
+    from datetime import datetime, timezone
+
+    from agent import database as db_mod
+    from agent.chat_log_writer import ChatLogEntry
+
+    conn = FakeConn()
+    _install_fake_pool(monkeypatch, db_mod, conn)
+    first = datetime(2026, 3, 1, 10, 0, 0, 1, tzinfo=timezone.utc)
+    second = datetime(2026, 3, 1, 10, 0, 0, 2, tzinfo=timezone.utc)
+
+    await db_mod.save_chat_messages_batch_async(
+        [
+            ChatLogEntry("t-1", 7, "user", "질문", created_at=first),
+            ChatLogEntry("t-1", 7, "assistant", "답변", created_at=second),
+        ]
+    )
+
+    message_params = [params for sql, params in conn.executed if "TB_CHAT_MESSAGE_T" in sql]
+    assert [p[-1] for p in message_params] == [first, second]
+    assert conn.commits == 1
+
+
+@pytest.mark.asyncio
+async def test_chat_history_orders_by_resolved_primary_key(monkeypatch):
+    from agent import database as db_mod
+
+    conn = FakeConn(rows=lambda sql: [("message_seq",)] if "pg_index" in sql else [])
+    _install_fake_pool(monkeypatch, db_mod, conn)
+    monkeypatch.setattr(db_mod, "_chat_message_pk", db_mod._UNRESOLVED)
+
+    await db_mod.get_chat_history_async("t-1")
+    await db_mod.get_recent_chat_history_async("t-1", 20)
+
+    # PK는 한 번만 조회하고 모든 정렬에 보조 키로 사용
+    assert sum("pg_index" in sql for sql, _ in conn.executed) == 1
+    history_sql, recent_sql = [sql for sql, _ in conn.executed if "pg_index" not in sql]
+    assert history_sql.endswith('ORDER BY CREATED_DT ASC, "message_seq" ASC')
+    assert 'ORDER BY CREATED_DT DESC, "message_seq" DESC' in recent_sql
+    assert 'ORDER BY CREATED_DT ASC, "message_seq" ASC' in recent_sql
+
+
+@pytest.mark.asyncio
+async def test_chat_history_without_single_primary_key_orders_by_created_dt(monkeypatch):
+    from agent import database as db_mod
+
+    conn = FakeConn(
+        rows=lambda sql: [("thread_id",), ("created_dt",)] if "pg_index" in sql else []
+    )
+    _install_fake_pool(monkeypatch, db_mod, conn)
+    monkeypatch.setattr(db_mod, "_chat_message_pk", db_mod._UNRESOLVED)
+
+    await db_mod.get_chat_history_async("t-1")
+
+    assert conn.executed[-1][0].endswith("ORDER BY CREATED_DT ASC")
+
+
+@pytest.mark.asyncio
+async def test_exact_rerank_sends_pgvector_literal(monkeypatch):
+    from agent import database as db_mod
+
+    conn = FakeConn(rows=[{"perfume_id": 2, "similarity_score": 0.9, "best_review": "좋아요"}])
+    _install_fake_pool(monkeypatch, db_mod, conn)
+    monkeypatch.setattr(db_mod, "RERANK_MODE", "exact")
+
+    candidates = [{"id": 1}, {"id": 2}]
+    result = await db_mod.rerank_perfumes_async(
+        candidates, "", top_k=2, query_vector=[0.5, 0.25]
+    )
+
+    assert [p["id"] for p in result] == [2, 1]
+    _sql, params = conn.executed[0]
+    assert params == ["[0.5,0.25]", "[0.5,0.25]", 1, 2]
+
+
+@pytest.mark.asyncio
+async def test_note_vector_batch_embeds_once_and_runs_one_query(monkeypatch):
+    from types import SimpleNamespace
+
+    from agent import database as db_mod
+    from agent.embedding_cache import EmbeddingCache
+
+    requests = []
+
+    async def fake_create(input, model):
+        requests.append(list(input))
+        return SimpleNamespace(
+            data=[SimpleNamespace(index=i, embedding=[float(i + 1)]) for i in range(len(input))]
+        )
+
+    cache = EmbeddingCache(path=None)
+    cache.set(db_mod.EMBEDDING_NAMESPACE, "비 온 뒤 흙", [9.0])
+    monkeypatch.setattr(db_mod, "embedding_cache", cache)
+    monkeypatch.setattr(
+        db_mod, "async_client", SimpleNamespace(embeddings=SimpleNamespace(create=fake_create))
+    )
+
+    conn = FakeConn(rows=[(1, "Pine"), (1, "Cypress"), (2, "Vetiver"), (3, "Rose")])
+    _install_fake_pool(monkeypatch, db_mod, conn)
+
+    result = await db_mod.lookup_notes_by_vector_async(
+        ["숲의 향", "비 온 뒤 흙", "장미", "숲의 향"], top_k=2
+    )
+
+    # Only cache misses are embedded, in a single request
+    assert requests == [["숲의 향", "장미"]]
+    assert len(conn.executed) == 1
+    assert conn.executed[0][1] == (["[1]", "[9]", "[2]"], 2)
+    assert result == {"숲의 향": ["Pine", "Cypress"], "비 온 뒤 흙": ["Vetiver"], "장미": ["Rose"]}
+
+
+@pytest.mark.asyncio
+async def test_brand_without_local_candidates_falls_back_to_full_list_llm(monkeypatch):
+    from types import SimpleNamespace
+
+    from agent import database as db_mod
+    from agent.brand_matcher import BrandMatcher
+    from agent.cache_utils import LRUCache
+
+    prompts = []
+
+    async def fake_create(model, messages, temperature):
+        prompts.append(messages[-1]["content"])
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="Fendi"))])
+
+    async def fake_vocab():
+        return None
+
+    matcher = BrandMatcher(["Chanel", "Fendi", "Diptyque"], aliases={})
+    monkeypatch.setattr(db_mod, "_brand_matcher", matcher)
+    monkeypatch.setattr(db_mod.catalog_vocab, "get_async", fake_vocab)
+    monkeypatch.setattr(db_mod, "_brand_llm_memo", LRUCache(maxsize=16))
+    monkeypatch.setattr(db_mod, "BRAND_LLM_FALLBACK", True)
+    monkeypatch.setattr(
+        db_mod,
+        "async_client",
+        SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=fake_create))),
+    )
+
+    # Hangul has no trigram overlap with Latin catalog names
+    assert matcher.match("펜디") == []
+    assert await db_mod.match_brand_name_async("펜디") == "Fendi"
+    assert await db_mod.match_brand_name_async("펜디") == "Fendi"
+    # One LLM call with the full brand list, then served from the memo
+    assert len(prompts) == 1
+    assert "Chanel, Fendi, Diptyque" in prompts[0]
+
+    # ASCII input without local candidates also falls back to the LLM
+    assert matcher.match("qxzw") == []
+    assert await db_mod.match_brand_name_async("qxzw") == "Fendi"
+    assert len(prompts) == 2
+    assert "Chanel, Fendi, Diptyque" in prompts[1]
@@ -0,0 +1,57 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from agent.embedding_cache import EmbeddingCache
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_requests_are_computed_once(tmp_path):
+    cache = EmbeddingCache(path=str(tmp_path / "cache.sqlite3"))
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return [0.1, 0.2, 0.3]
+
+    results = await asyncio.gather(
+        *[cache.get_or_compute("embedding:test", "  비 오는  숲 ", compute) for _ in range(5)]
+    )
+
+    assert len(calls) == 1
+    assert all(r == [0.1, 0.2, 0.3] for r in results)
+    # Whitespace-normalized text hits the same entry without recomputing
+    assert await cache.get_or_compute("embedding:test", "비 오는 숲", compute) == [0.1, 0.2, 0.3]
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_persistent_tier_survives_new_instance_and_skips_failures(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    first = EmbeddingCache(path=path)
+    first.set("stylize:test", "query", "warm woody amber")
+    first.set("embedding:test", "broken", [])
+
+    second = EmbeddingCache(path=path)
+    assert second.get("stylize:test", "query") == "warm woody amber"
+    # Namespaces (models) are isolated and failed results are never cached
+    assert second.get("stylize:other", "query") is None
+    assert second.get("embedding:test", "broken") is None
+
+
+def test_memory_only_cache_when_persistence_disabled():
+    cache = EmbeddingCache(path=None, maxsize=2)
+    cache.set("ns", "a", [1.0])
+    cache.set("ns", "b", [2.0])
+    cache.set("ns", "c", [3.0])
+
+    assert cache.get("ns", "a") is None
+    assert cache.get("ns", "c") == [3.0]
@@ -0,0 +1,68 @@
+import os
+import sys
+from pathlib import Path
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from agent import expression_loader as el  # noqa: E402
+
+
+def _write_dicts(root: Path, rose_desc: str):
+    (root / "accord_desc_dictionary.csv").write_text(
+        "accord,desc1,desc2,desc3\nWoody,따뜻한,건조한,차분한\n", encoding="utf-8"
+    )
+    (root / "note_desc_dictionary.csv").write_text(
+        f"노트 (Note),한글 설명\nRose,{rose_desc}\nMusk,포근한 살결\n", encoding="utf-8"
+    )
+
+
+def _fresh_loader(monkeypatch, root: Path):
+    monkeypatch.setenv("PROJECT_ROOT", str(root))
+    monkeypatch.setattr(el.ExpressionLoader, "_instance", None)
+    return el.ExpressionLoader()
+
+
+PERFUME = {
+    "id": 7,
+    "notes": {"top": "Rose, Bergamot", "middle": "N/A", "base": "Musk"},
+    "accord": "Woody, Floral\n[Best Review]: 좋아요",
+}
+
+
+def test_perfume_guide_is_cached_and_formatted(monkeypatch, tmp_path):
+    _write_dicts(tmp_path, "화사한 장미")
+    loader = _fresh_loader(monkeypatch, tmp_path)
+
+    guide = loader.get_perfume_guide(PERFUME)
+
+    assert guide == (
+        "### 노트 표현 가이드\n"
+        "- Rose: 화사한 장미\n"
+        "- Musk: 포근한 살결\n"
+        "\n### 어코드 표현 가이드\n"
+        "- Woody: 따뜻한, 건조한, 차분한"
+    )
+    hits = loader._guide_cache.hits
+    assert loader.get_perfume_guide(PERFUME) == guide
+    assert loader._guide_cache.hits == hits + 1
+
+
+def test_guide_cache_is_invalidated_when_csv_changes(monkeypatch, tmp_path):
+    _write_dicts(tmp_path, "화사한 장미")
+    loader = _fresh_loader(monkeypatch, tmp_path)
+    monkeypatch.setattr(el, "EXPRESSION_DICT_CHECK_INTERVAL", 0)
+    before = loader.get_perfume_guide(PERFUME)
+
+    _write_dicts(tmp_path, "이슬 맺힌 장미 꽃잎")
+    note_path = tmp_path / "note_desc_dictionary.csv"
+    stat = note_path.stat()
+    os.utime(note_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    after = loader.get_perfume_guide(PERFUME)
+
+    assert before != after
+    assert "- Rose: 이슬 맺힌 장미 꽃잎" in after
+    assert loader.version == 2
@@ -0,0 +1,134 @@
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from agent.brand_matcher import BrandMatcher  # noqa: E402
+from agent.info_router import InfoRouter, PerfumeNameIndex  # noqa: E402
+
+
+ROWS = [
+    {"perfume_id": 1, "perfume_brand": "Chanel", "perfume_name": "N°5", "name_kr": "넘버5", "search_keywords": "샤넬 넘버5,No.5"},
+    {"perfume_id": 2, "perfume_brand": "Chanel", "perfume_name": "N°5 L'Eau", "name_kr": "넘버5 로", "search_keywords": None},
+    {"perfume_id": 3, "perfume_brand": "Diptyque", "perfume_name": "Philosykos", "name_kr": "필로시코스", "search_keywords": None},
+    {"perfume_id": 4, "perfume_brand": "Tom Ford", "perfume_name": "Black Orchid", "name_kr": "블랙 오키드", "search_keywords": None},
+    {"perfume_id": 5, "perfume_brand": "Zara", "perfume_name": "Black Orchid", "name_kr": "블랙 오키드", "search_keywords": None},
+    {"perfume_id": 6, "perfume_brand": "Zara", "perfume_name": "Rose", "name_kr": "로즈", "search_keywords": None},
+]
+VOCAB = SimpleNamespace(version=1, notes=("Vetiver", "Rose", "Rosemary"), accords=("Woody", "Citrus"))
+MATCHER = BrandMatcher(["Chanel", "Diptyque", "Tom Ford", "Zara"])
+
+
+def _router(note_vector_lookup=None):
+    index = PerfumeNameIndex(lambda: ROWS, ttl=0)
+
+    async def perfumes():
+        index.ensure_loaded()
+        return index
+
+    async def vocabulary():
+        return VOCAB
+
+    async def mentions(text):
+        return MATCHER.mentions(text)
+
+    return InfoRouter(
+        perfume_index=perfumes,
+        vocabulary=vocabulary,
+        brand_detector=mentions,
+        note_vector_lookup=note_vector_lookup,
+        mode="rules",
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "text, info_type, target",
+    [
+        ("샤넬 넘버5 노트 알려줘", "perfume", "Chanel N°5"),
+        ("넘버5 로 지속력 어때?", "perfume", "Chanel N°5 L'Eau"),
+        ("딥티크 필로시코스랑 비슷한 향수 있어?", "similarity", "Diptyque Philosykos"),
+        ("톰포드 블랙 오키드 알려줘", "perfume", "Tom Ford Black Orchid"),
+        ("베티버가 뭐야?", "note", "Vetiver"),
+        ("로즈마리랑 로즈 차이 알려줘", "note", "Rosemary, Rose"),
+        ("우디 어코드 설명해줘", "accord", "Woody"),
+        ("딥티크 브랜드 설명해줘", "brand", "Diptyque"),
+    ],
+)
+async def test_named_targets_are_routed_locally(text, info_type, target):
+    router = _router()
+
+    decision = await router.route(text)
+
+    assert (decision.info_type, decision.target_name) == (info_type, target)
+    assert decision.confidence >= router.min_confidence
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "text",
+    [
+        "2번째 향수 자세히 알려줘",  # 순번/대명사는 최근 대화 맥락이 필요
+        "이거 지속력 어때?",
+        "블랙 오키드 알려줘",  # 같은 이름의 향수가 여러 브랜드에 있음
+        "우디 계열 비슷한 거 추천해줘",  # 기준 향수가 없는 유사 요청
+        "샤넬 향수 알려줘",
+    ],
+)
+async def test_ambiguous_inputs_fall_back_to_llm(text):
+    router = _router()
+
+    decision = await router.route(text)
+
+    assert decision.info_type is None
+    assert router.counts["llm"] == 1
+
+
+@pytest.mark.asyncio
+async def test_perfume_named_like_a_note_needs_its_brand():
+    router = _router()
+
+    note = await router.route("로즈 향 알려줘")
+    perfume = await router.route("Zara Rose 알려줘")
+
+    assert (note.info_type, note.notes) == ("note", ["Rose"])
+    assert (perfume.info_type, perfume.target_id) == ("perfume", 6)
+
+
+@pytest.mark.asyncio
+async def test_info_supervisor_skips_router_llm_for_local_decisions(monkeypatch):
+    from agent import graph_info
+
+    class FailingLLM:
+        def with_structured_output(self, _schema):
+            raise AssertionError("ROUTER_LLM should not be called")
+
+    monkeypatch.setattr(graph_info, "info_router", _router())
+    monkeypatch.setattr(graph_info, "ROUTER_LLM", FailingLLM())
+
+    update = await graph_info.info_supervisor_node({"user_query": "딥티크 필로시코스 알려줘", "messages": []})
+
+    assert update == {"info_type": "perfume", "target_name": "Diptyque Philosykos", "target_id": 3}
+
+
+@pytest.mark.asyncio
+async def test_resolve_notes_batches_only_unknown_keywords():
+    calls = []
+
+    async def note_vectors(keywords):
+        calls.append(list(keywords))
+        return {"숲의 향": ["Cedar"], "이상한 향": []}
+
+    router = _router(note_vectors)
+
+    resolved = await router.resolve_notes(["베티버", "Rose", "숲의 향", "이상한 향"])
+
+    # 사전(한글 별칭 포함)에 있는 노트는 벡터 검색 없이 변환, 나머지는 한 번에 조회
+    assert calls == [["숲의 향", "이상한 향"]]
+    assert resolved == {"베티버": "Vetiver", "Rose": "Rose", "숲의 향": "Cedar", "이상한 향": None}
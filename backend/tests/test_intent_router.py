@@ -0,0 +1,120 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from agent.brand_matcher import BrandMatcher  # noqa: E402
+from agent.intent_router import IntentRouter  # noqa: E402
+
+
+MATCHER = BrandMatcher(["Chanel", "Dior", "Jo Malone London", "Clean", "Fresh", "Nest"])
+
+
+async def _mentions(text):
+    return MATCHER.mentions(text)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("디올 쁘아종이랑 비슷한 향수 추천해줘", "info_retrieval"),
+        ("샤넬 넘버5 노트 알려줘", "info_retrieval"),
+        ("상큼한 향수 추천해줘", "interviewer"),
+        ("여름에 뿌릴만한 거 있어?", "interviewer"),
+        ("안녕", "writer"),
+        ("오늘 날씨 어때?", "writer"),
+    ],
+)
+async def test_confident_inputs_are_routed_locally(text, expected):
+    router = IntentRouter(brand_detector=_mentions, mode="rules")
+
+    decision = await router.route(text)
+
+    assert decision.route == expected
+    assert decision.confidence >= router.min_confidence
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "text",
+    [
+        "시트러스 계열 비슷한 거 추천해줘",  # 제품 기준인지 취향 기준인지 모호
+        "샤넬 향수 추천해줘",  # 브랜드 기반 추천
+        "넌 뭘 할 수 있어?",
+        "그거 말고 다른 건?",
+        "클린한 느낌 나는 향수 추천",  # "클린"은 브랜드 언급으로 보지 않음
+        "상큼하고 fresh한 향 비슷한 거 추천해줘",  # "fresh"는 형용사
+        "honestly I want something like this",  # "nest"는 단어 일부
+    ],
+)
+async def test_ambiguous_inputs_fall_back_to_llm(text):
+    router = IntentRouter(brand_detector=_mentions, mode="rules")
+
+    decision = await router.route(text)
+
+    assert decision.route is None
+    assert router.counts["llm"] == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "text",
+    [
+        "데이트할 때 좋은 향수 알려줘",
+        "우디한 향수 알려줘",
+        "베르가못 들어간 향수 알려줘",
+        "지속력 좋은 향수 알려줘",
+        "비 오는 날 향수 알려줘",
+        "출근용 향수 설명해줘",
+    ],
+)
+async def test_preference_phrasings_with_fact_words_are_not_fact_questions(text):
+    router = IntentRouter(brand_detector=_mentions, mode="rules")
+
+    decision = await router.route(text)
+
+    # "알려줘/설명"이 있어도 취향/상황 조건이면 추천(interviewer)이거나 LLM 판단
+    assert decision.route in (None, "interviewer")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("디올 쁘아종 설명해줘", "info_retrieval"),
+        ("탑 노트가 뭐야?", "info_retrieval"),
+        ("향수 노트 구성 알려줘", None),  # 특정 대상이 없으면 LLM
+        ("샤넬 중에 지속력 좋은 향수 알려줘", None),  # 브랜드 기반 추천일 수 있음
+    ],
+)
+async def test_fact_route_requires_a_specific_entity(text, expected):
+    router = IntentRouter(brand_detector=_mentions, mode="rules")
+
+    decision = await router.route(text)
+
+    assert decision.route == expected
+
+
+@pytest.mark.asyncio
+async def test_embedding_stage_uses_nearest_centroid_when_rules_are_unsure():
+    vectors = {"guess": [0.9, 0.1], "a": [1.0, 0.0], "b": [0.0, 1.0]}
+
+    async def embed(texts):
+        return [vectors[t] for t in texts]
+
+    router = IntentRouter(
+        embed=embed,
+        mode="embedding",
+        examples={"interviewer": ["a"], "writer": ["b"]},
+    )
+
+    decision = await router.route("guess")
+
+    assert decision.route == "interviewer"
+    assert decision.method == "embedding"
@@ -0,0 +1,39 @@
+import sys
+from pathlib import Path
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from agent.note_index import NoteDictionary
+
+
+NOTES = ["Bergamot", "Bergamote", "Vanilla", "Vetiver", "Rose", "Amber", "Oud", "Musk"]
+
+
+def test_loader_runs_once_and_exact_lookup_is_case_insensitive():
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return NOTES
+
+    notes = NoteDictionary(loader)
+
+    assert notes.lookup("  vanilla ") == ["Vanilla"]
+    assert notes.lookup("OUD") == ["Oud"]
+    assert notes.lookup("bergamot") == ["Bergamot"]
+    assert len(calls) == 1
+
+
+def test_fuzzy_candidates_match_full_levenshtein_scan():
+    notes = NoteDictionary(lambda: NOTES)
+
+    # Distance <= 2 results, closest first
+    assert notes.lookup("bergamto") == ["Bergamot", "Bergamote"]
+    assert notes.lookup("vetivr") == ["Vetiver"]
+    assert notes.lookup("muskk") == ["Musk"]
+    # Too far away, and short inputs only match exactly
+    assert notes.lookup("patchouli") == []
+    assert notes.lookup("ou") == []
@@ -0,0 +1,132 @@
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+from starlette.requests import Request
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from agent.pagination import (  # noqa: E402
+    InvalidCursor,
+    conditional_json_response,
+    decode_cursor,
+    encode_cursor,
+)
+
+
+def _request(headers=None):
+    raw = [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": raw})
+
+
+def test_cursor_round_trip_and_rejects_garbage():
+    ts = datetime(2026, 3, 1, 12, 30, 15, 123456)
+    assert decode_cursor(encode_cursor(ts, "thread-9")) == (ts, "thread-9")
+    assert decode_cursor(encode_cursor(ts, 42)) == (ts, 42)
+
+    with pytest.raises(InvalidCursor):
+        decode_cursor("not-a-cursor")
+
+
+def test_conditional_response_returns_304_for_matching_etag_or_date():
+    payload = {"rooms": [{"thread_id": "t1"}], "next_cursor": None}
+    modified = datetime(2026, 3, 1, 12, 30, 15, 999999)
+
+    first = conditional_json_response(_request(), payload, modified)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+
+    assert conditional_json_response(_request({"If-None-Match": etag}), payload).status_code == 304
+    assert (
+        conditional_json_response(
+            _request({"If-Modified-Since": first.headers["last-modified"]}), payload, modified
+        ).status_code
+        == 304
+    )
+    changed = {"rooms": [{"thread_id": "t2"}], "next_cursor": None}
+    assert conditional_json_response(_request({"If-None-Match": etag}), changed).status_code == 200
+
+
+class _FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def execute(self, sql, params=None):
+        self.conn.executed.append((sql, params))
+
+    def fetchall(self):
+        return self.conn.rows
+
+    def close(self):
+        pass
+
+
+class _FakeConn:
+    def __init__(self, rows):
+        self.rows = rows
+        self.executed = []
+
+    def cursor(self, cursor_factory=None):
+        return _FakeCursor(self)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_history_page_uses_keyset_and_returns_oldest_first(monkeypatch):
+    from agent import database as db_mod
+
+    rows = [
+        {"id": 30, "role": "assistant", "text": "c", "metadata": None, "created_dt": datetime(2026, 3, 1, 10, 3)},
+        {"id": 29, "role": "user", "text": "b", "metadata": None, "created_dt": datetime(2026, 3, 1, 10, 2)},
+        {"id": 28, "role": "assistant", "text": "a", "metadata": None, "created_dt": datetime(2026, 3, 1, 10, 1)},
+    ]
+    conn = _FakeConn(rows)
+    monkeypatch.setattr(db_mod, "ASYNC_DB_DRIVER", "thread")
+    monkeypatch.setitem(db_mod._SYNC_POOLS, "recom", (lambda: conn, lambda c: None))
+    monkeypatch.setattr(db_mod, "_chat_message_pk", '"message_seq"')
+
+    before = (datetime(2026, 3, 1, 10, 4), 31)
+    page = await db_mod.get_chat_history_page_async("t-1", limit=2, before=before)
+
+    sql, params = conn.executed[0]
+    assert '(CREATED_DT, "message_seq") < (%s, %s)' in sql
+    assert 'ORDER BY CREATED_DT DESC, "message_seq" DESC' in sql
+    assert "OFFSET" not in sql
+    assert params == ("t-1", before[0], 31, 3)
+    # LIMIT+1 행으로 다음 페이지 존재를 판단하고, 페이지 안은 오래된 순
+    assert [m["text"] for m in page["messages"]] == ["b", "c"]
+    assert page["next_key"] == (datetime(2026, 3, 1, 10, 2), 29)
+    assert page["last_modified"] == datetime(2026, 3, 1, 10, 3)
+
+
+@pytest.mark.asyncio
+async def test_history_page_without_primary_key_uses_created_dt_keyset(monkeypatch):
+    from agent import database as db_mod
+
+    rows = [
+        {"id": None, "role": "user", "text": str(i), "metadata": None, "created_dt": datetime(2026, 3, 1, 10, i)}
+        for i in range(5, 2, -1)
+    ]
+    conn = _FakeConn(rows)
+    monkeypatch.setattr(db_mod, "ASYNC_DB_DRIVER", "thread")
+    monkeypatch.setitem(db_mod._SYNC_POOLS, "recom", (lambda: conn, lambda c: None))
+    monkeypatch.setattr(db_mod, "_chat_message_pk", None)
+
+    before = (datetime(2026, 3, 1, 10, 6), None)
+    page = await db_mod.get_chat_history_page_async("t-1", limit=2, before=before)
+
+    # PK 컬럼을 가정하지 않음: CREATED_DT만으로 keyset 조회
+    sql, params = conn.executed[0]
+    assert "NULL as id" in sql and "AND CREATED_DT < %s" in sql
+    assert params == ("t-1", before[0], 3)
+    assert page["next_key"] == (datetime(2026, 3, 1, 10, 4), None)
+    assert "CREATED_DT DESC)" in db_mod.get_chat_index_ddl()[1]
@@ -0,0 +1,59 @@
+import re
+import sys
+from pathlib import Path
+
+import pytest
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from agent.prompt_layout import PromptCacheStats, layout_messages  # noqa: E402
+
+
+def test_static_prefix_is_shared_and_volatile_parts_go_last():
+    from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+    history = [HumanMessage(content="여름 향수 추천"), AIMessage(content="네")]
+    sections = [
+        layout_messages(
+            "SYSTEM",
+            static_blocks=("RULE", ""),
+            history=history,
+            volatile=(f"[참고 데이터]: {p}", f"[섹션 번호]: {p}"),
+        )
+        for p in (1, 2, 3)
+    ]
+
+    for messages in sections:
+        assert isinstance(messages[0], SystemMessage)
+        assert messages[0].content == "SYSTEM\n\nRULE"
+        assert messages[1:3] == history
+        assert isinstance(messages[-1], HumanMessage)
+    assert [m[-1].content for m in sections] == [
+        f"[참고 데이터]: {p}\n[섹션 번호]: {p}" for p in (1, 2, 3)
+    ]
+    assert len(layout_messages("SYSTEM", volatile=("", ""))) == 1
+
+
+def test_researcher_prompt_has_no_unrendered_placeholders():
+    from agent.prompts import RESEARCHER_SYSTEM_PROMPT
+
+    assert not re.search(r"\{[A-Z_]+\}", RESEARCHER_SYSTEM_PROMPT)
+
+
+def test_cache_stats_accumulate_cached_ratio_per_label():
+    stats = PromptCacheStats()
+    stats.record("reco_writer", {"input_tokens": 2000, "input_token_details": {"cache_read": 1536}})
+    stats.record("reco_writer", {"input_tokens": 2000, "input_token_details": {}})
+    stats.record("reco_writer", None)
+    stats.record("info", {"input_tokens": 0})
+
+    snap = stats.snapshot()
+
+    assert snap["reco_writer"]["calls"] == 2
+    assert snap["reco_writer"]["cached_ratio"] == pytest.approx(0.384)
+    assert snap["info"]["cached_ratio"] == 0.0
+    stats.reset()
+    assert stats.snapshot() == {}
@@ -0,0 +1,174 @@
+import asyncio
+import re
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+
+def _format(priority, chunks):
+    from agent.graph import SectionStreamFormatter
+
+    formatter = SectionStreamFormatter(priority)
+    out = "".join(formatter.feed(c) for c in chunks) + formatter.finish()
+    assert out == formatter.text
+    return out
+
+
+def test_section_formatter_matches_post_processing_while_streaming():
+    # 2번 섹션: 도입부 제거 + 헤더 번호 정규화 + 끝 '---' 보장 ('#'이 청크 경계에서 나뉘어도 동일)
+    assert _format(2, ["네, 추천", "드릴게요.\n#", "# 5. 시트", "러스\n본문", "  \n"]) == "## 2. 시트러스\n본문\n---"
+    # 1번 섹션의 도입부는 유지
+    assert _format(1, ["좋아요!\n", "## 1. 첫 향수\n", "---\n\n"]) == "좋아요!\n## 1. 첫 향수\n---"
+    assert _format(3, ["##3", "\n내용"]) == "## 3.\n내용\n---"
+    assert _format(2, ["   "]) == ""
+
+
+@pytest.mark.asyncio
+async def test_sections_generate_concurrently_but_stream_in_priority_order(monkeypatch):
+    from agent import graph as graph_mod
+    from agent.schemas import HardFilters, SearchStrategyPlan, StrategyFilters
+    from langchain_core.messages import AIMessage, AIMessageChunk
+
+    async def noop_log(**_):
+        return None
+
+    async def fake_search(h_filters, s_filters, exclude_ids=None, query_text=""):
+        section = 2 if "보완" in query_text else 3 if "반전" in query_text else 1
+        return ([{"id": 100 + section, "name": f"P{section}", "brand": "B"}], "ok")
+
+    class FakePlanner:
+        async def ainvoke(self, messages, config=None):
+            user = messages[-1].content
+            name = re.search(r"전략 이름: (.+)", user).group(1)
+            return SearchStrategyPlan(
+                priority=1,
+                strategy_name=name,
+                reason=f"{name} 이유",
+                hard_filters=HardFilters(gender="Unisex"),
+                strategy_filters=StrategyFilters(),
+                strategy_keyword=[name],
+            )
+
+    class FakeSmart:
+        def with_structured_output(self, _schema):
+            return FakePlanner()
+
+        async def ainvoke(self, *args, **kwargs):
+            return AIMessage(content="")
+
+    started = []
+
+    class FakeWriter:
+        async def astream(self, messages, config=None):
+            assert config == {"tags": ["internal_helper"]}
+            section = int(re.search(r"\[섹션 번호\]: (\d)", messages[-1].content).group(1))
+            started.append(section)
+            # 뒤 섹션일수록 빨리 끝나도록 해서 순서 보장을 확인
+            for i in range(4):
+                await asyncio.sleep(0.02 * (4 - section))
+                yield AIMessageChunk(content=f"## {section}.\n" if i == 0 else f"s{section}-{i} ")
+
+    emitted = []
+
+    async def collect(content):
+        emitted.append(content)
+
+    monkeypatch.setattr(graph_mod, "save_recommendation_log_async", noop_log)
+    monkeypatch.setattr(graph_mod, "smart_search_with_retry_async", fake_search)
+    monkeypatch.setattr(graph_mod, "SMART_LLM", FakeSmart())
+    monkeypatch.setattr(graph_mod, "SUPER_SMART_LLM", FakeWriter())
+    monkeypatch.setattr(graph_mod, "_emit_reco_chunk", collect)
+
+    begin = time.perf_counter()
+    out = await graph_mod.parallel_reco_node(
+        {"messages": [], "member_id": 0, "user_preferences": {}}
+    )
+    elapsed = time.perf_counter() - begin
+
+    text = out["messages"][0].content
+    assert "".join(emitted) == text
+    assert text.index("## 1.") < text.index("## 2.") < text.index("## 3.")
+    assert "s1-3 \n---" not in text and "s1-3\n---\n\n## 2." in text
+    # 순차 생성이면 0.48s(=0.24+0.16+0.08), 동시 생성이면 가장 긴 섹션(0.24s) 수준
+    assert elapsed < 0.36
+    assert sorted(started) == [1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_combined_plan_mode_uses_one_call_and_falls_back_for_missing_strategy(monkeypatch):
+    from agent import graph as graph_mod
+    from agent.schemas import (
+        HardFilters,
+        ResearchActionPlan,
+        SearchStrategyPlan,
+        StrategyFilters,
+    )
+    from agent.strategy_plan_cache import StrategyPlanCache
+
+    def plan(priority, name):
+        return SearchStrategyPlan(
+            priority=priority,
+            strategy_name=name,
+            reason=f"{name} 이유",
+            hard_filters=HardFilters(gender="Unisex"),
+            strategy_filters=StrategyFilters(),
+            strategy_keyword=[name],
+        )
+
+    calls = []
+
+    class CombinedPlanner:
+        async def ainvoke(self, messages, config=None):
+            calls.append("combined")
+            assert "전략 목록: 1. 이미지 강조, 2. 이미지 보완, 3. 이미지 반전" in messages[-1].content
+            # 3번 전략은 누락된 응답
+            return ResearchActionPlan(plans=[plan(2, "이미지 보완"), plan(1, "이미지 강조")])
+
+    class SinglePlanner:
+        async def ainvoke(self, messages, config=None):
+            name = re.search(r"전략 이름: (.+)", messages[-1].content).group(1)
+            calls.append(name)
+            return plan(3, name)
+
+    class FakeSmart:
+        def with_structured_output(self, schema):
+            return CombinedPlanner() if schema is ResearchActionPlan else SinglePlanner()
+
+    searched = []
+
+    async def fake_search(h_filters, s_filters, exclude_ids=None, query_text=""):
+        searched.append(query_text)
+        return ([{"id": len(searched), "name": "P", "brand": "B"}], "ok")
+
+    class FakeWriter:
+        async def astream(self, messages, config=None):
+            from langchain_core.messages import AIMessageChunk
+
+            section = re.search(r"\[섹션 번호\]: (\d)", messages[-1].content).group(1)
+            yield AIMessageChunk(content=f"## {section}.\n")
+
+    async def noop(*_args, **_kwargs):
+        return None
+
+    monkeypatch.setattr(graph_mod, "RECO_PLAN_MODE", "combined")
+    monkeypatch.setattr(graph_mod, "strategy_plan_cache", StrategyPlanCache(version="t", ttl=0))
+    monkeypatch.setattr(graph_mod, "SMART_LLM", FakeSmart())
+    monkeypatch.setattr(graph_mod, "smart_search_with_retry_async", fake_search)
+    monkeypatch.setattr(graph_mod, "save_recommendation_log_async", noop)
+    monkeypatch.setattr(graph_mod, "_emit_reco_chunk", noop)
+    monkeypatch.setattr(graph_mod, "SUPER_SMART_LLM", FakeWriter())
+
+    out = await graph_mod.parallel_reco_node(
+        {"messages": [], "member_id": 0, "user_preferences": {"gender": "Unisex"}}
+    )
+
+    assert sorted(calls) == ["combined", "이미지 반전"]
+    assert sorted(searched) == ["이미지 강조 이유", "이미지 반전 이유", "이미지 보완 이유"]
+    assert out["messages"][0].content.index("## 1.") < out["messages"][0].content.index("## 3.")
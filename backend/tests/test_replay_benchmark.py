@@ -0,0 +1,36 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from benchmarks import replay  # noqa: E402
+
+
+@pytest.mark.asyncio
+async def test_recorded_sessions_replay_through_graph_without_misses():
+    corpus = json.loads(replay.DEFAULT_CORPUS.read_text(encoding="utf-8"))
+    fixture = json.loads(replay.DEFAULT_FIXTURE.read_text(encoding="utf-8"))
+
+    report = await replay.run_benchmark(corpus, fixture, repeat=1, speed=0)
+
+    assert report["errors"] == []
+    assert report["route_mismatches"] == []
+    expected = {t["expect_route"] for s in corpus["sessions"] for t in s["turns"]}
+    assert set(report["routes"]) == expected
+    reco = report["routes"]["parallel_reco"]
+    # 인터뷰 1회 + 전략 수립 3회 + 섹션 생성 3회
+    assert reco["llm_calls_per_request"] == 7
+    assert reco["ttft_p50_s"] is not None and reco["total_p95_s"] >= reco["ttft_p50_s"]
+
+
+def test_compare_reports_flags_only_regressions_beyond_threshold():
+    baseline = {"routes": {"parallel_reco": {"ttft_p95_s": 1.0, "total_p95_s": 3.0, "llm_calls_per_request": 7}}}
+    current = {"routes": {"parallel_reco": {"ttft_p95_s": 1.1, "total_p95_s": 4.0, "llm_calls_per_request": 4}}}
+
+    assert replay.compare_reports(baseline, current, max_regression=0.2) == ["parallel_reco.total_p95_s: 3.0 -> 4.0"]
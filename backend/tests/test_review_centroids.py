@@ -0,0 +1,89 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from agent.review_centroids import (
+    CentroidIndex,
+    compute_centroid,
+    parse_pgvector,
+    save_centroid_file,
+    to_pgvector_literal,
+)
+
+
+def test_compute_centroid_orders_representative_reviews():
+    embeddings = np.array([[1.0, 0.0], [0.9, 0.1], [0.0, 1.0]])
+    centroid, top_ids = compute_centroid(embeddings, [10, 11, 12], top_n=2)
+
+    assert np.isclose(np.linalg.norm(centroid), 1.0)
+    assert top_ids == [11, 10]
+
+
+def test_numpy_index_scores_only_known_candidates(tmp_path):
+    path = str(tmp_path / "centroids.npz")
+    save_centroid_file(
+        path,
+        [1, 2],
+        np.array([[1.0, 0.0], [0.0, 2.0]]),
+        ["citrus review", "woody review"],
+    )
+    index = CentroidIndex(path=path)
+
+    scores = index.score([0.0, 1.0], [1, 2, 3])
+
+    assert set(scores) == {1, 2}
+    assert np.isclose(scores[2]["similarity_score"], 1.0)
+    assert np.isclose(scores[1]["similarity_score"], 0.0)
+    assert scores[2]["best_review"] == "woody review"
+
+
+def test_missing_centroid_file_reports_unavailable(tmp_path):
+    index = CentroidIndex(path=str(tmp_path / "missing.npz"))
+    assert index.score([1.0, 0.0], [1]) is None
+
+
+def test_pgvector_literal_round_trip():
+    literal = to_pgvector_literal([0.25, -1.5, 3.0])
+    assert literal == "[0.25,-1.5,3]"
+    assert parse_pgvector(literal).tolist() == [0.25, -1.5, 3.0]
+
+
+class _PgError(Exception):
+    def __init__(self, pgcode):
+        super().__init__(pgcode)
+        self.pgcode = pgcode
+
+
+def _centroid_run(monkeypatch, error):
+    from agent import database
+
+    async def failing_run(*args, **kwargs):
+        raise error
+
+    monkeypatch.setattr(database, "_centroid_sql_available", True)
+    monkeypatch.setattr(database, "_run_async", failing_run)
+    monkeypatch.setattr(database.centroid_index, "score", lambda vector, ids: {"numpy": True})
+    return database
+
+
+@pytest.mark.asyncio
+async def test_transient_centroid_sql_error_falls_back_for_one_call(monkeypatch):
+    database = _centroid_run(monkeypatch, TimeoutError("pool timeout"))
+
+    assert await database._score_by_centroid([1.0, 0.0], [1]) == {"numpy": True}
+    assert database._centroid_sql_available is True
+
+
+@pytest.mark.asyncio
+async def test_missing_centroid_table_disables_sql_path(monkeypatch):
+    database = _centroid_run(monkeypatch, _PgError("42P01"))
+
+    assert await database._score_by_centroid([1.0, 0.0], [1]) == {"numpy": True}
+    assert database._centroid_sql_available is False
@@ -0,0 +1,90 @@
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from agent.sse import encode_event, stream_sse  # noqa: E402
+
+
+def _decode(frames):
+    out = []
+    for frame in frames:
+        assert frame.startswith(b"data: ") and frame.endswith(b"\n\n")
+        out.append(json.loads(frame[6:-2]))
+    return out
+
+
+async def _collect(stream):
+    return [frame async for frame in stream]
+
+
+def test_encode_event_keeps_non_ascii():
+    assert encode_event({"type": "answer", "content": "장미"}) == (
+        'data: {"type":"answer","content":"장미"}\n\n'.encode("utf-8")
+    )
+
+
+@pytest.mark.asyncio
+async def test_tokens_are_coalesced_without_reordering_other_events():
+    async def events():
+        yield {"type": "log", "content": "검색 중"}
+        for token in ["첫", "번", "째", " 답"]:
+            yield {"type": "answer", "content": token}
+        yield {"type": "log", "content": "완료"}
+        yield {"type": "answer", "content": "끝"}
+
+    frames = await _collect(stream_sse(events(), max_delay=10, max_bytes=1024))
+
+    assert _decode(frames) == [
+        {"type": "log", "content": "검색 중"},
+        {"type": "answer", "content": "첫"},  # 첫 답변 프레임은 지연 없이 전송
+        {"type": "answer", "content": "번째 답"},
+        {"type": "log", "content": "완료"},
+        {"type": "answer", "content": "끝"},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_flushes_on_size_and_time_budget():
+    async def events():
+        for _ in range(5):
+            yield {"type": "answer", "content": "abcd"}
+        await asyncio.sleep(0.1)
+        yield {"type": "answer", "content": "late"}
+        await asyncio.sleep(0.1)
+
+    frames = _decode(await _collect(stream_sse(events(), max_delay=0.02, max_bytes=8)))
+
+    assert [f["content"] for f in frames] == ["abcd", "abcdabcd", "abcdabcd", "late"]
+
+
+@pytest.mark.asyncio
+async def test_disconnect_cancels_the_event_source():
+    cancelled = asyncio.Event()
+    disconnected = False
+
+    async def events():
+        try:
+            yield {"type": "answer", "content": "시작"}
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    async def is_disconnected():
+        return disconnected
+
+    frames = []
+    async for frame in stream_sse(events(), is_disconnected=is_disconnected, poll_interval=0.01):
+        frames.append(frame)
+        disconnected = True
+
+    assert len(frames) == 1
+    assert cancelled.is_set()
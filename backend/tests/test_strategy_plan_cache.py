@@ -0,0 +1,89 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from agent.schemas import HardFilters, SearchStrategyPlan, StrategyFilters  # noqa: E402
+from agent.strategy_plan_cache import StrategyPlanCache, canonicalize_preferences  # noqa: E402
+
+
+def _plan(name):
+    return SearchStrategyPlan(
+        priority=1,
+        strategy_name=name,
+        reason="이유",
+        hard_filters=HardFilters(gender="Women"),
+        strategy_filters=StrategyFilters(accord=["Floral"]),
+        strategy_keyword=[name],
+    )
+
+
+def test_equivalent_preferences_share_a_key():
+    a = {"gender": "Women", "note": "Rose, Musk", "style": "  청순한  느낌", "brand": None}
+    b = {"style": "청순한 느낌", "note": "musk,rose", "gender": "women", "season": ""}
+    assert canonicalize_preferences(a) == canonicalize_preferences(b)
+
+    cache = StrategyPlanCache(version="v1", ttl=60)
+    assert cache.key(a, "이미지 강조", 1) == cache.key(b, "이미지 강조", 1)
+    assert cache.key(a, "이미지 강조", 1) != cache.key(a, "이미지 보완", 2)
+    assert cache.key(a, "이미지 강조", 1) != StrategyPlanCache(version="v2", ttl=60).key(a, "이미지 강조", 1)
+
+
+@pytest.mark.asyncio
+async def test_repeat_profiles_reuse_the_plan_and_concurrent_misses_call_once():
+    cache = StrategyPlanCache(version="v1", ttl=60)
+    calls = 0
+
+    async def planner():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return _plan("이미지 강조")
+
+    prefs = {"gender": "Women", "note": "Rose"}
+    first, second = await asyncio.gather(
+        cache.get_or_plan(prefs, "이미지 강조", 1, planner),
+        cache.get_or_plan(dict(prefs), "이미지 강조", 1, planner),
+    )
+    third = await cache.get_or_plan({"note": "rose", "gender": "women"}, "이미지 강조", 1, planner)
+
+    assert calls == 1
+    assert first == second == third
+    # 호출자가 결과를 수정해도 캐시된 계획은 그대로 유지
+    third.strategy_keyword.append("변경")
+    again = await cache.get_or_plan(prefs, "이미지 강조", 1, planner)
+    assert again.strategy_keyword == ["이미지 강조"]
+
+
+@pytest.mark.asyncio
+async def test_failures_are_not_cached_and_zero_ttl_disables_cache():
+    cache = StrategyPlanCache(version="v1", ttl=60)
+
+    async def broken():
+        raise ValueError("parse error")
+
+    with pytest.raises(ValueError):
+        await cache.get_or_plan({}, "이미지 반전", 3, broken)
+
+    async def ok():
+        return _plan("이미지 반전")
+
+    assert (await cache.get_or_plan({}, "이미지 반전", 3, ok)).strategy_name == "이미지 반전"
+
+    disabled = StrategyPlanCache(version="v1", ttl=0)
+    calls = 0
+
+    async def counting():
+        nonlocal calls
+        calls += 1
+        return _plan("x")
+
+    await disabled.get_or_plan({}, "x", 1, counting)
+    await disabled.get_or_plan({}, "x", 1, counting)
+    assert calls == 2
@@ -0,0 +1,95 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+
+class SlowThenFast:
+    """첫 호출은 timeout보다 오래 걸리고, 두 번째 호출은 바로 반환."""
+
+    def __init__(self, result):
+        self.result = result
+        self.calls = 0
+
+    async def ainvoke(self, _messages):
+        self.calls += 1
+        if self.calls == 1:
+            await asyncio.sleep(10)
+        return self.result
+
+
+@pytest.mark.asyncio
+async def test_timed_out_llm_call_is_retried_without_blocking_loop():
+    from agent import graph as graph_mod
+    from agent.schemas import RoutingDecision
+    from langchain_core.messages import HumanMessage
+
+    llm = SlowThenFast(RoutingDecision(next_step="info_retrieval"))
+
+    ticks = 0
+
+    async def heartbeat():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    beat = asyncio.create_task(heartbeat())
+    try:
+        result = await graph_mod.ainvoke_with_retry(
+            llm, [HumanMessage(content="?")], "Supervisor", timeout=0.1, retries=1, backoff=0
+        )
+    finally:
+        beat.cancel()
+
+    assert result.next_step == "info_retrieval"
+    assert llm.calls == 2
+    # 대기 중에도 이벤트 루프가 다른 작업을 계속 처리
+    assert ticks >= 5
+
+
+@pytest.mark.asyncio
+async def test_supervisor_call_is_cancelled_with_the_request(monkeypatch):
+    from agent import graph as graph_mod
+    from langchain_core.messages import HumanMessage
+
+    started = asyncio.Event()
+    cancelled = asyncio.Event()
+
+    class Hanging:
+        async def ainvoke(self, _messages):
+            started.set()
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+    monkeypatch.setattr(graph_mod, "SUPERVISOR_LLM", Hanging())
+    monkeypatch.setattr(graph_mod.intent_router, "mode", "off")
+
+    task = asyncio.create_task(
+        graph_mod.supervisor_node({"messages": [HumanMessage(content="?")]})
+    )
+    await started.wait()
+    task.cancel()
+
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert cancelled.is_set()
+
+
+def test_router_llms_leave_retries_to_ainvoke_with_retry():
+    from agent import graph as graph_mod
+
+    # 클라이언트 내부 재시도가 겹치면 최악 시도 횟수/지연이 곱해지므로 0으로 고정
+    for runnable in (graph_mod.SUPERVISOR_LLM, graph_mod.INTERVIEWER_LLM):
+        assert runnable.first.bound is graph_mod.ROUTER_CALL_LLM
+    assert graph_mod.ROUTER_CALL_LLM.max_retries == 0
+    assert graph_mod.ROUTER_CALL_LLM.async_client._client.max_retries == 0
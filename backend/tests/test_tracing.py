@@ -0,0 +1,71 @@
+import json
+import sys
+from pathlib import Path
+from typing import List, TypedDict
+
+import pytest
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from agent import tracing  # noqa: E402
+
+
+@pytest.mark.asyncio
+async def test_trace_collects_nodes_llm_db_and_cache_from_graph_events(tmp_path):
+    from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+    from langchain_core.messages import AIMessage
+    from langgraph.graph import END, START, StateGraph
+
+    class State(TypedDict):
+        answer: str
+
+    llm = GenericFakeChatModel(messages=iter([AIMessage(content="장미 향이에요")]))
+
+    async def lookup(state: State):
+        tracing.record_db_query("perfume", 0.05)
+        tracing.record_cache_lookup("embedding", True)
+        tracing.record_cache_lookup("embedding", False)
+        return {}
+
+    async def writer(state: State):
+        chunks: List[str] = []
+        async for chunk in llm.astream("?"):
+            chunks.append(chunk.content)
+        return {"answer": "".join(chunks)}
+
+    builder = StateGraph(State)
+    builder.add_node("lookup", lookup)
+    builder.add_node("writer", writer)
+    builder.add_edge(START, "lookup")
+    builder.add_edge("lookup", "writer")
+    builder.add_edge("writer", END)
+    graph = builder.compile()
+
+    trace = tracing.RequestTrace("thread/1")
+
+    async def events():
+        async for event in graph.astream_events({"answer": ""}, version="v2"):
+            trace.on_event(event)
+            if event["event"] == "on_chat_model_stream":
+                yield {"type": "answer", "content": event["data"]["chunk"].content}
+
+    payloads = [p async for p in tracing.trace_stream(events(), trace)]
+    await trace.write_json(str(tmp_path))
+
+    assert "".join(p["content"] for p in payloads) == "장미 향이에요"
+    assert [n["node"] for n in trace.nodes] == ["lookup", "writer"]
+    assert trace.route == "writer"
+    assert len(trace.llm_calls) == 1 and trace.llm_calls[0]["node"] == "writer"
+    assert trace.llm_calls[0]["ttft"] is not None
+    assert trace.db == {"queries": 1, "seconds": 0.05}
+    assert dict(trace.cache) == {"embedding": {"hit": 1, "miss": 1}}
+    assert trace.ttft is not None and trace.total >= trace.ttft
+    # 요청이 끝나면 컨텍스트에서 해제되어 이후 기록은 trace에 합쳐지지 않음
+    tracing.record_db_query("perfume", 1.0)
+    assert trace.db["queries"] == 1
+
+    saved = json.loads((tmp_path / "thread_1.jsonl").read_text(encoding="utf-8"))
+    assert saved["thread_id"] == "thread/1" and saved["route"] == "writer"